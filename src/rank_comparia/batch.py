@@ -0,0 +1,263 @@
+# SPDX-FileCopyrightText: 2025 Pôle d'Expertise de la Régulation Numérique <contact@peren.gouv.fr>
+#
+# SPDX-License-Identifier: MIT
+
+"""Batch runner executing several ranking pipelines over a single data ingestion."""
+
+import argparse
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Literal
+
+import polars as pl
+
+from rank_comparia.pipeline import RankingPipeline
+
+
+@dataclass
+class BatchJob:
+    """
+    Configuration of a single ranking job.
+    """
+
+    method: Literal["elo_ordered", "elo_random", "ml", "rank_centrality"]  # score computation method used
+    include_votes: bool = True  # whether to include votes dataset in raw match data
+    include_reactions: bool = True  # whether to include reactions dataset in raw match data
+    category: str | None = None  # optional conversation category
+    bootstrap_samples: int = 100  # number of bootstrap samples
+    mean_how: Literal["match", "token"] = "token"  # Precise how to mean
+    solver: Literal["lbfgs", "sparse"] = "lbfgs"  # optimizer used by the "ml" method
+    split_components: bool = False  # whether the "ml" method fits each component of the comparison graph separately
+    name: str | None = None  # name of the output directory, derived from the configuration if None
+
+    @property
+    def sources(self) -> list[str]:
+        """
+        Sources of raw match data used by the job.
+
+        Returns:
+            list[str]: Subset of ["votes", "reactions"].
+        """
+        return [
+            source for source, used in (("votes", self.include_votes), ("reactions", self.include_reactions)) if used
+        ]
+
+    @property
+    def directory_name(self) -> str:
+        """
+        Name of the job output directory.
+
+        Returns:
+            str: Directory name.
+        """
+        if self.name is not None:
+            return self.name
+        return f"{self.method}_{'_'.join(self.sources)}_{self.category or 'all'}"
+
+
+def load_jobs(config_path: Path) -> list[BatchJob]:
+    """
+    Load jobs from a JSON configuration file, either a list of jobs or an object with a "jobs" key.
+
+    Args:
+        config_path (Path): Path to the configuration file.
+
+    Returns:
+        list[BatchJob]: Jobs.
+    """
+    config = json.loads(config_path.read_text())
+    if isinstance(config, dict):
+        config = config["jobs"]
+    jobs = [BatchJob(**job) for job in config]
+    names = [job.directory_name for job in jobs]
+    if len(set(names)) != len(names):
+        raise ValueError("Several jobs share the same output directory, set a distinct `name` for each of them.")
+    return jobs
+
+
+def load_matches(
+    jobs: list[BatchJob],
+    token: str | None = None,
+    data_dir: Path | None = None,
+    streaming: bool = False,
+    memory_budget: int | None = None,
+    preferences: bool = False,
+) -> tuple[pl.DataFrame, dict[str, pl.DataFrame]]:
+    """
+    Load and process raw data once for all jobs.
+
+    Args:
+        jobs (list[BatchJob]): Jobs.
+        token (str | None): Token to download datasets from HuggingFace.
+        data_dir (Path | None): Local Parquet copy of the datasets, see `utils.scan_comparia`.
+        streaming (bool): Whether to process raw data on polars' streaming engine.
+        memory_budget (int | None): Approximate memory budget in bytes of the streaming engine.
+        preferences (bool): Whether to also load the datasets of unused sources, for exported preferences.
+
+    Returns:
+        tuple[pl.DataFrame, dict[str, pl.DataFrame]]: Processed matches of all sources used by the
+            jobs, and preferences by model of each raw dataset, see `RankingPipeline.raw_preferences`.
+    """
+    ingestion = RankingPipeline(
+        method="ml",
+        include_votes=any(job.include_votes for job in jobs),
+        include_reactions=any(job.include_reactions for job in jobs),
+        bootstrap_samples=0,
+        mean_how="token",
+        token=token,
+        data_dir=data_dir,
+        streaming=streaming,
+        memory_budget=memory_budget,
+    )
+    if preferences:
+        ingestion.preferences()
+    return ingestion.matches, ingestion.raw_preferences
+
+
+def run_job(
+    job: BatchJob,
+    matches: pl.DataFrame,
+    output_dir: Path,
+    export_plots: bool = True,
+    checkpoint_dir: Path | None = None,
+    raw_preferences: dict[str, pl.DataFrame] | None = None,
+) -> pl.DataFrame:
+    """
+    Run a single job on already processed matches.
+
+    Args:
+        job (BatchJob): Job.
+        matches (pl.DataFrame): Processed matches.
+        output_dir (Path): Root output directory, results are written in a sub-directory per job.
+        export_plots (bool): Whether to export plots along with scores.
+        checkpoint_dir (Path | None): Bootstrap checkpoints, see `RankingPipeline.checkpoint_dir`.
+        raw_preferences (dict[str, pl.DataFrame] | None): Preferences by model of each raw dataset,
+            exported with plots, see `RankingPipeline.raw_preferences`.
+
+    Returns:
+        pl.DataFrame: Bootstrap scores.
+    """
+    job_dir = output_dir / job.directory_name
+    job_dir.mkdir(parents=True, exist_ok=True)
+    (job_dir / "job.json").write_text(json.dumps(asdict(job), indent=2))
+
+    pipeline = RankingPipeline(
+        method=job.method,
+        include_votes=job.include_votes,
+        include_reactions=job.include_reactions,
+        bootstrap_samples=job.bootstrap_samples,
+        mean_how=job.mean_how,
+        solver=job.solver,
+        split_components=job.split_components,
+        export_path=job_dir if export_plots or job.category is not None else None,
+        checkpoint_dir=checkpoint_dir,
+        raw_preferences=dict(raw_preferences or {}),
+        processed_matches=matches,
+    )
+    if job.category is not None:
+        return pipeline.run_category(job.category)
+
+    scores = pipeline.run()
+    if not export_plots:
+        scores.write_csv(file=job_dir / f"{job.method}_scores.csv", separator=";")
+    return scores
+
+
+def run_batch(
+    jobs: list[BatchJob],
+    output_dir: Path,
+    token: str | None = None,
+    max_workers: int | None = None,
+    export_plots: bool = True,
+    data_dir: Path | None = None,
+    streaming: bool = False,
+    memory_budget: int | None = None,
+    checkpoint_dir: Path | None = None,
+) -> dict[str, pl.DataFrame]:
+    """
+    Run several jobs concurrently over a single data ingestion.
+
+    Args:
+        jobs (list[BatchJob]): Jobs.
+        output_dir (Path): Root output directory.
+        token (str | None): Token to download datasets from HuggingFace.
+        max_workers (int | None): Number of worker processes, defaults to the number of cores.
+        export_plots (bool): Whether to export plots along with scores.
+        data_dir (Path | None): Local Parquet copy of the datasets, see `utils.scan_comparia`.
+        streaming (bool): Whether to process raw data on polars' streaming engine.
+        memory_budget (int | None): Approximate memory budget in bytes of the streaming engine.
+        checkpoint_dir (Path | None): Bootstrap checkpoints, from which an interrupted batch resumes.
+
+    Returns:
+        dict[str, pl.DataFrame]: Bootstrap scores by job directory name.
+    """
+    # jobs never load raw data, preferences of all datasets are computed here when plots are exported
+    matches, raw_preferences = load_matches(
+        jobs,
+        token=token,
+        data_dir=data_dir,
+        streaming=streaming,
+        memory_budget=memory_budget,
+        preferences=export_plots and any(job.category is None for job in jobs),
+    )
+    print(f"Running {len(jobs)} jobs on {len(matches)} matches.")
+
+    # polars is not fork-safe
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=context) as executor:
+        futures = {
+            job.directory_name: executor.submit(
+                run_job,
+                job,
+                matches.filter(pl.col("source").is_in(job.sources)),
+                output_dir,
+                export_plots,
+                checkpoint_dir,
+                raw_preferences,
+            )
+            for job in jobs
+        }
+        return {name: future.result() for name, future in futures.items()}
+
+
+def main(argv: list[str] | None = None) -> None:
+    """
+    Command line entry point.
+
+    Args:
+        argv (list[str] | None): Command line arguments, defaults to `sys.argv`.
+    """
+    parser = argparse.ArgumentParser(description="Run several ranking pipelines over a single data ingestion.")
+    parser.add_argument("config", type=Path, help="JSON file listing the jobs to run.")
+    parser.add_argument("-o", "--output", type=Path, default=Path("output"), help="Root output directory.")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="Number of worker processes.")
+    parser.add_argument("--no-plots", action="store_true", help="Only export scores, without plots.")
+    parser.add_argument("--data-dir", type=Path, default=None, help="Local Parquet copy of the datasets.")
+    parser.add_argument("--streaming", action="store_true", help="Process raw data on the streaming engine.")
+    parser.add_argument(
+        "--memory-budget", type=int, default=None, help="Memory budget of the streaming engine, in megabytes."
+    )
+    parser.add_argument(
+        "--checkpoint-dir", type=Path, default=None, help="Bootstrap checkpoints, resumed when invoked again."
+    )
+    args = parser.parse_args(argv)
+
+    run_batch(
+        load_jobs(args.config),
+        output_dir=args.output,
+        token=os.environ.get("HF_TOKEN"),
+        max_workers=args.workers,
+        export_plots=not args.no_plots,
+        data_dir=args.data_dir,
+        streaming=args.streaming or args.memory_budget is not None,
+        memory_budget=None if args.memory_budget is None else args.memory_budget * 1024**2,
+        checkpoint_dir=args.checkpoint_dir,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+# SPDX-FileCopyrightText: 2025 Pôle d'Expertise de la Régulation Numérique <contact@peren.gouv.fr>
+#
+# SPDX-License-Identifier: MIT
+
+"""Bootstrap distributed over several processes or machines through a file-based work queue."""
+
+import argparse
+import multiprocessing
+import os
+import pickle
+import shutil
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import suppress
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from rank_comparia.ranker import Match, MatchScore
+
+
+if TYPE_CHECKING:
+    from rank_comparia.ranker import Ranker
+
+
+def encode_matches(matches: list[Match]) -> dict[str, np.ndarray]:
+    """
+    Encode matches as integer arrays.
+
+    Args:
+        matches (list[Match]): List of matches.
+
+    Returns:
+        dict[str, np.ndarray]: Model names ("models"), and model indices ("model_a", "model_b") and
+            score ("score") of each match.
+    """
+    names = [match.model_a for match in matches] + [match.model_b for match in matches]
+    models, codes = np.unique(np.array(names, dtype=str), return_inverse=True)
+    return {
+        "models": models,
+        "model_a": codes[: len(matches)].astype(np.int32),
+        "model_b": codes[len(matches) :].astype(np.int32),
+        "score": np.array([match.score.value for match in matches], dtype=np.int8),
+    }
+
+
+def decode_matches(encoded: dict[str, np.ndarray]) -> list[Match]:
+    """
+    Decode matches encoded by `encode_matches`.
+
+    Args:
+        encoded (dict[str, np.ndarray]): Encoded matches.
+
+    Returns:
+        list[Match]: List of matches.
+    """
+    models = encoded["models"].tolist()
+    return [
+        Match(models[a], models[b], MatchScore(int(score)))
+        for a, b, score in zip(encoded["model_a"], encoded["model_b"], encoded["score"])
+    ]
+
+
+def _claim(job_dir: Path) -> Path | None:
+    """
+    Atomically move one work item from the queue to the claimed items.
+    """
+    for item in sorted((job_dir / "queue").iterdir()):
+        claimed = job_dir / "claimed" / item.name
+        try:
+            os.rename(item, claimed)
+        except (FileNotFoundError, PermissionError):
+            # claimed by another worker
+            continue
+        # claim time, used to detect stale items
+        os.utime(claimed)
+        return claimed
+    return None
+
+
+def process_job(job_dir: Path) -> int:
+    """
+    Compute replicate blocks of a job until its queue is empty.
+
+    Args:
+        job_dir (Path): Job directory written by `BootstrapQueue`.
+
+    Returns:
+        int: Number of blocks computed.
+    """
+    ranker: "Ranker" = pickle.loads((job_dir / "ranker.pkl").read_bytes())
+    with np.load(job_dir / "matches.npz") as encoded:
+        models = encoded["models"]
+        matches = decode_matches(dict(encoded))
+    index = {model: position for position, model in enumerate(models.tolist())}
+    seed = int((job_dir / "seed").read_text())
+
+    n_blocks = 0
+    while (item := _claim(job_dir)) is not None:
+        start, end = (int(bound) for bound in item.name.split("-"))
+        block = np.full((end - start, len(models)), np.nan)
+        for row, replicate in enumerate(range(start, end)):
+            for model, score in ranker.bootstrap_replicate(matches, replicate, seed).items():
+                block[row, index[model]] = score
+            # heartbeat, so that the coordinator only requeues items of dead workers
+            with suppress(FileNotFoundError):
+                os.utime(item)
+        temporary = job_dir / "results" / f".{item.name}.{uuid.uuid4().hex}.tmp"
+        with open(temporary, "wb") as file:
+            np.save(file, block)
+        os.replace(temporary, job_dir / "results" / f"{item.name}.npy")
+        n_blocks += 1
+    return n_blocks
+
+
+def run_worker(directory: Path, watch: bool = False, poll_interval: float = 1.0) -> int:
+    """
+    Process the jobs of a queue directory, possibly shared between machines.
+
+    Args:
+        directory (Path): Queue directory.
+        watch (bool): Whether to keep waiting for new jobs once all queues are empty.
+        poll_interval (float): Interval in seconds between two scans of the directory when watching.
+
+    Returns:
+        int: Number of blocks computed.
+    """
+    n_blocks = 0
+    while True:
+        # jobs are renamed to their final name only once fully written
+        for job_dir in sorted(path for path in directory.iterdir() if path.is_dir() and not path.name.startswith(".")):
+            try:
+                n_blocks += process_job(job_dir)
+            except FileNotFoundError:
+                # job merged and removed by its coordinator meanwhile
+                continue
+        if not watch:
+            return n_blocks
+        time.sleep(poll_interval)
+
+
+@dataclass
+class BootstrapQueue:
+    """
+    File-based work queue distributing bootstrap replicates.
+
+    The coordinator writes the encoded matches, the ranker and one work item per block of
+    replicates in a job directory of `directory`, which may be on storage shared with other
+    machines running `rank-comparia-bootstrap-worker`. Workers claim items by atomic renames and
+    write one score block per item. Each replicate draws its sample from a generator derived from
+    the seed and its index, so the merged result is the same as a single-node run with the same seed.
+    """
+
+    directory: Path  # queue directory
+    n_workers: int = 0  # number of local worker processes, 0 to only rely on external workers
+    block_size: int = 10  # number of replicates per work item
+    poll_interval: float = 0.5  # interval in seconds between two checks of finished blocks
+    stale_after: float | None = 600.0  # seconds without heartbeat after which claimed items are requeued
+    timeout: float | None = 3600.0  # seconds without any finished block after which the run fails
+
+    def _prepare(self, ranker: "Ranker", matches: list[Match], seed: int) -> Path:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        name = uuid.uuid4().hex
+        temporary = self.directory / f".{name}"
+        for sub_directory in ("queue", "claimed", "results"):
+            (temporary / sub_directory).mkdir(parents=True)
+        np.savez(temporary / "matches.npz", **encode_matches(matches))  # type: ignore
+        (temporary / "ranker.pkl").write_bytes(pickle.dumps(ranker))
+        (temporary / "seed").write_text(str(seed))
+        for start in range(0, ranker.bootstrap_samples, self.block_size):
+            end = min(start + self.block_size, ranker.bootstrap_samples)
+            (temporary / "queue" / f"{start:08d}-{end:08d}").touch()
+        job_dir = self.directory / name
+        os.rename(temporary, job_dir)
+        return job_dir
+
+    def _requeue_stale(self, job_dir: Path) -> None:
+        now = time.time()
+        for item in (job_dir / "claimed").iterdir():
+            if (job_dir / "results" / f"{item.name}.npy").exists():
+                continue
+            if now - item.stat().st_mtime > self.stale_after:  # type: ignore
+                try:
+                    os.rename(item, job_dir / "queue" / item.name)
+                except FileNotFoundError:
+                    continue
+
+    def run(self, ranker: "Ranker", matches: list[Match], seed: int) -> list[dict[str, float]]:
+        """
+        Compute the scores of all bootstrap replicates through the queue.
+
+        Items claimed by workers which stopped updating them for `stale_after` seconds are put back
+        in the queue, and the run fails if no block finishes for `timeout` seconds (e.g. without
+        any running worker).
+
+        Args:
+            ranker (Ranker): Ranker, its `bootstrap_samples` sets the number of replicates.
+            matches (list[Match]): List of matches.
+            seed (int): Seed of the bootstrap.
+
+        Returns:
+            list[dict[str, float]]: Scores of each replicate, in replicate order.
+
+        Raises:
+            TimeoutError: If no block finished for `timeout` seconds.
+        """
+        job_dir = self._prepare(ranker, matches, seed)
+        n_items = len(range(0, ranker.bootstrap_samples, self.block_size))
+        print(f"Distributing {ranker.bootstrap_samples} bootstrap samples in {n_items} blocks ({job_dir}).")
+
+        executor = None
+        if self.n_workers > 0:
+            # polars is not fork-safe
+            executor = ProcessPoolExecutor(self.n_workers, mp_context=multiprocessing.get_context("spawn"))
+            futures = [executor.submit(process_job, job_dir) for _ in range(self.n_workers)]
+        n_finished, progress_time = 0, time.monotonic()
+        try:
+            while (finished := len(list((job_dir / "results").glob("*.npy")))) < n_items:
+                if finished > n_finished:
+                    n_finished, progress_time = finished, time.monotonic()
+                elif self.timeout is not None and time.monotonic() - progress_time > self.timeout:
+                    # workers drop jobs removed from the queue
+                    shutil.rmtree(job_dir, ignore_errors=True)
+                    raise TimeoutError(
+                        f"No bootstrap block finished in {self.timeout} seconds, "
+                        f"{finished} of {n_items} blocks done ({job_dir})."
+                    )
+                if executor is not None:
+                    for future in futures:
+                        if future.done() and future.exception() is not None:
+                            raise future.exception()  # type: ignore
+                if self.stale_after is not None:
+                    self._requeue_stale(job_dir)
+                time.sleep(self.poll_interval)
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+
+        models = np.load(job_dir / "matches.npz")["models"].tolist()
+        blocks = np.concatenate([np.load(path) for path in sorted((job_dir / "results").glob("*.npy"))])
+        shutil.rmtree(job_dir)
+        return [{model: float(score) for model, score in zip(models, row) if not np.isnan(score)} for row in blocks]
+
+
+def main(argv: list[str] | None = None) -> None:
+    """
+    Command line entry point of bootstrap workers.
+
+    Args:
+        argv (list[str] | None): Command line arguments, defaults to `sys.argv`.
+    """
+    parser = argparse.ArgumentParser(description="Compute bootstrap replicates from a shared work queue.")
+    parser.add_argument("directory", type=Path, help="Queue directory shared with the coordinator.")
+    parser.add_argument("--watch", action="store_true", help="Keep waiting for new jobs.")
+    parser.add_argument("--poll", type=float, default=1.0, help="Polling interval in seconds when watching.")
+    args = parser.parse_args(argv)
+
+    n_blocks = run_worker(args.directory, watch=args.watch, poll_interval=args.poll)
+    print(f"Computed {n_blocks} blocks.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+# SPDX-FileCopyrightText: 2025 Pôle d'Expertise de la Régulation Numérique <contact@peren.gouv.fr>
+#
+# SPDX-License-Identifier: MIT
+
+"""Checkpoints of bootstrap computations, so that interrupted runs resume where they stopped."""
+
+import json
+import os
+import pickle
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import polars as pl
+
+
+def _replace(path: Path, write) -> None:
+    """
+    Write a file atomically: `write` receives a temporary path which is then renamed to `path`.
+    """
+    temporary = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    write(temporary)
+    os.replace(temporary, path)
+
+
+@dataclass
+class BootstrapCheckpoint:
+    """
+    Checkpoint directory of one bootstrap computation.
+
+    Scores of completed replicates are written in blocks, each followed by the state of the random
+    generator drawing unseeded samples. Once the computation is finished, its summary and
+    replicates are written and later runs reuse them as they are.
+    """
+
+    directory: Path  # checkpoint directory of this computation
+    every: int = 10  # number of replicates per block
+
+    def _blocks(self) -> list[Path]:
+        return sorted(self.directory.glob("block-*.parquet"))
+
+    def resolve_seed(self, seed: int | None) -> int:
+        """
+        Seed of the computation, drawn at random on its first run if `seed` is None and kept so
+        that resumed runs draw the same samples.
+
+        Args:
+            seed (int | None): Seed of the bootstrap samples.
+
+        Returns:
+            int: Seed.
+        """
+        if seed is not None:
+            return seed
+        path = self.directory / "seed.json"
+        if path.exists():
+            return json.loads(path.read_text())
+        seed = int(np.random.SeedSequence().entropy)  # type: ignore
+        self.directory.mkdir(parents=True, exist_ok=True)
+        _replace(path, lambda temporary: temporary.write_text(json.dumps(seed)))
+        return seed
+
+    def load_rows(self) -> tuple[list[dict[str, float]], Any]:
+        """
+        Scores of the replicates completed so far.
+
+        Returns:
+            tuple[list[dict[str, float]], Any]: Scores of each completed replicate, and the state of
+                the random generator after the last of them (None without completed replicates).
+        """
+        state_path = self.directory / "random_state.pkl"
+        if not state_path.exists():
+            return [], None
+        n_rows, state = pickle.loads(state_path.read_bytes())
+        rows = []
+        for path in self._blocks():
+            rows.extend(
+                {model: score for model, score in row.items() if score is not None}
+                for row in pl.read_parquet(path).to_dicts()
+            )
+        # blocks written after the last saved state are computed again
+        return rows[:n_rows], state
+
+    def save_block(self, rows: list[dict[str, float]], start: int, random_state: Any) -> None:
+        """
+        Persist a block of replicates and the random generator state that follows it.
+
+        Args:
+            rows (list[dict[str, float]]): Scores of replicates `start` to `start + len(rows)`.
+            start (int): Index of the first replicate of the block.
+            random_state (Any): State of the random generator after the block.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        block = pl.from_dicts(rows, infer_schema_length=None)
+        _replace(self.directory / f"block-{start:08d}.parquet", block.write_parquet)
+        _replace(
+            self.directory / "random_state.pkl",
+            lambda path: path.write_bytes(pickle.dumps((start + len(rows), random_state))),
+        )
+
+    def load_result(self) -> tuple[pl.DataFrame, pl.DataFrame] | None:
+        """
+        Result of a finished computation.
+
+        Returns:
+            tuple[pl.DataFrame, pl.DataFrame] | None: Bootstrap scores and replicates, None if the
+                computation did not finish.
+        """
+        scores_path = self.directory / "scores.parquet"
+        if not scores_path.exists():
+            return None
+        return pl.read_parquet(scores_path), pl.read_parquet(self.directory / "replicates.parquet")
+
+    def save_result(self, scores: pl.DataFrame, replicates: pl.DataFrame) -> None:
+        """
+        Persist the result of a finished computation and drop its blocks.
+
+        Args:
+            scores (pl.DataFrame): Bootstrap scores.
+            replicates (pl.DataFrame): Bootstrap replicates.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        _replace(self.directory / "replicates.parquet", replicates.write_parquet)
+        # written last, marks the computation as finished
+        _replace(self.directory / "scores.parquet", scores.write_parquet)
+        for path in self._blocks():
+            path.unlink()
+        (self.directory / "random_state.pkl").unlink(missing_ok=True)
@@ -0,0 +1,108 @@
+# SPDX-FileCopyrightText: 2025 Pôle d'Expertise de la Régulation Numérique <contact@peren.gouv.fr>
+#
+# SPDX-License-Identifier: MIT
+
+"""Bootstrap of several rankers on the same samples, to compare their rankings."""
+
+from itertools import combinations
+
+import numpy as np
+import polars as pl
+
+from rank_comparia.bootstrap import encode_matches
+from rank_comparia.ranker import Match, Ranker
+
+
+def bootstrap_rankers(
+    rankers: dict[str, Ranker],
+    matches: list[Match] | dict[str, np.ndarray],
+    seed: int | None = None,
+    bootstrap_samples: int | None = None,
+) -> pl.DataFrame:
+    """
+    Compute the bootstrap scores of several rankers on the same samples.
+
+    Matches are encoded once, and each sample is drawn once and fed to every ranker through
+    `Ranker.compute_encoded_scores` (ordered by `Ranker.order_sample`). As rankers see the same
+    samples, the difference of the ranks a model gets from two rankers is computed on each sample,
+    which gives much tighter intervals than comparing the intervals of two separate bootstraps.
+
+    Args:
+        rankers (dict[str, Ranker]): Rankers by name, each keeping its replicates in
+            `bootstrap_replicates`.
+        matches (list[Match] | dict[str, np.ndarray]): List of matches, in the order they were played
+            if a ranker replays them in order, or matches encoded as by `bootstrap.encode_matches`.
+        seed (int | None): Seed of the bootstrap samples, drawn at random if None.
+        bootstrap_samples (int | None): Number of bootstrap samples, that of the rankers if None
+            (which must then agree).
+
+    Returns:
+        pl.DataFrame: One row per model with the "median", "p2.5", "p97.5", "rank", "rank_p2.5" and
+            "rank_p97.5" columns of each ranker prefixed by "{name}_", and, for each pair of rankers,
+            the median and 95% interval of the paired rank differences "rank_diff_{first}_{second}",
+            "rank_diff_{first}_{second}_p2.5" and "rank_diff_{first}_{second}_p97.5", sorted by the
+            rank of the first ranker.
+    """
+    from tqdm import tqdm
+
+    if bootstrap_samples is None:
+        counts = {ranker.bootstrap_samples for ranker in rankers.values()}
+        if len(counts) != 1:
+            raise ValueError(f"Rankers use different numbers of bootstrap samples {sorted(counts)}.")
+        bootstrap_samples = counts.pop()
+    if seed is None:
+        seed = int(np.random.SeedSequence().entropy)  # type: ignore
+    encoded = encode_matches(matches) if isinstance(matches, list) else matches
+    models = [str(model) for model in encoded["models"]]
+    model_a, model_b, score = encoded["model_a"], encoded["model_b"], encoded["score"]
+    n_matches = len(score)
+    print(f"Computing bootstrap scores of {len(rankers)} rankers from a sample of {n_matches} matches.")
+
+    rows: dict[str, list[dict[str, float]]] = {name: [] for name in rankers}
+    for replicate in tqdm(range(bootstrap_samples), desc="Processing bootstrap samples"):
+        drawn = np.random.default_rng([seed, replicate]).integers(0, n_matches, size=n_matches)
+        for name, ranker in rankers.items():
+            indices = ranker.order_sample(drawn)
+            rows[name].append(ranker.compute_encoded_scores(models, model_a[indices], model_b[indices], score[indices]))
+
+    summaries = {name: ranker.summarize_bootstrap(rows[name]) for name, ranker in rankers.items()}
+    # ranks of each model on each sample, for models seen by any ranker
+    names = sorted(set().union(*(ranker.bootstrap_replicates.columns for ranker in rankers.values())))
+    ranks = {name: _sample_ranks(ranker, names) for name, ranker in rankers.items()}
+
+    combined = pl.DataFrame({"model_name": names})
+    for name, summary in summaries.items():
+        combined = combined.join(
+            summary.select("model_name", pl.exclude("model_name").name.prefix(f"{name}_")), on="model_name", how="left"
+        )
+    for first, second in combinations(rankers, 2):
+        differences = ranks[first] - ranks[second]
+        column = f"rank_diff_{first}_{second}"
+        combined = combined.with_columns(
+            pl.Series(column, np.median(differences, axis=0)),
+            pl.Series(f"{column}_p2.5", np.quantile(differences, 0.025, axis=0, method="closest_observation")),
+            pl.Series(f"{column}_p97.5", np.quantile(differences, 0.975, axis=0, method="closest_observation")),
+        )
+    return combined.sort(f"{next(iter(rankers))}_rank", nulls_last=True)
+
+
+def _sample_ranks(ranker: Ranker, names: list[str]) -> np.ndarray:
+    """
+    Ordinal ranks (1 is best) of models on each sample of a ranker, models it did not see getting
+    the default score as in `Ranker.summarize_bootstrap`.
+    """
+    replicates = ranker.bootstrap_replicates
+    scores = np.column_stack(
+        [
+            (
+                replicates[name].to_numpy()
+                if name in replicates.columns
+                else np.full(len(replicates), ranker.default_score)
+            )
+            for name in names
+        ]
+    )
+    order = np.argsort(-scores, axis=1, kind="stable")
+    ranks = np.empty_like(order)
+    np.put_along_axis(ranks, order, np.arange(1, len(names) + 1)[None, :], axis=1)
+    return ranks
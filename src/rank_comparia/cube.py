@@ -0,0 +1,146 @@
+# SPDX-FileCopyrightText: 2025 Pôle d'Expertise de la Régulation Numérique <contact@peren.gouv.fr>
+#
+# SPDX-License-Identifier: MIT
+
+"""Pre-aggregated outcome counts by day, source, categories and pair of models."""
+
+from datetime import date
+from pathlib import Path
+
+import polars as pl
+
+from rank_comparia.model_statistics import PREFERENCES
+from rank_comparia.ranker import MatchScore
+from rank_comparia.utils import decode_model_names, has_categories, mask_categories
+
+
+KEYS = ["day", "source", "category_mask", "model_a", "model_b"]
+OUTCOMES = {"a_wins": MatchScore.A, "b_wins": MatchScore.B, "draws": MatchScore.Draw}
+# columns summed in each cell of the cube, named as in processed matches
+SUMS = [
+    *[f"total_conv_{side}_{column}" for side in ("a", "b") for column in ("output_tokens", "kwh")],
+    *[f"{reaction}_{side}" for side in ("a", "b") for reaction in PREFERENCES],
+]
+
+
+def build_cube(matches: pl.DataFrame) -> pl.DataFrame:
+    """
+    Reduce processed matches to outcome counts and consumption sums keyed by (day, source,
+    category_mask, model_a, model_b), sorted by these keys.
+
+    Args:
+        matches (pl.DataFrame): Processed matches, with a "category_mask" column.
+
+    Returns:
+        pl.DataFrame: Cube with "a_wins", "b_wins" and "draws" counts, the active parameters of
+            both models, and token, energy and preference sums.
+    """
+    sums = [column for column in SUMS if column in matches.columns]
+    return (
+        decode_model_names(matches)
+        .lazy()
+        .group_by(pl.col("timestamp").dt.date().alias("day"), *KEYS[1:])
+        .agg(
+            *[(pl.col("score") == score).sum().cast(pl.UInt32).alias(outcome) for outcome, score in OUTCOMES.items()],
+            pl.col("model_a_active_params", "model_b_active_params").drop_nulls().first(),
+            *[pl.sum(column) for column in sums],
+        )
+        .sort(KEYS)
+        .collect()
+    )
+
+
+def write_cube(cube: pl.DataFrame, path: Path) -> None:
+    """
+    Persist a cube as Parquet, with row groups small enough for filters on the sorted keys to
+    skip most of the file.
+
+    Args:
+        cube (pl.DataFrame): Cube built by `build_cube`.
+        path (Path): Parquet file path.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    cube.write_parquet(path, statistics=True, row_group_size=64_000)
+
+
+def scan_cube(
+    path: Path,
+    start: date | None = None,
+    end: date | None = None,
+    sources: list[str] | None = None,
+    categories: str | list[str] | None = None,
+) -> pl.LazyFrame:
+    """
+    Lazily read a slice of a persisted cube.
+
+    Args:
+        path (Path): Parquet file path.
+        start (date | None): First day, from the first day if None.
+        end (date | None): Exclusive last day, up to the last day if None.
+        sources (list[str] | None): Sources to keep ("votes", "reactions"), all if None.
+        categories (str | list[str] | None): Keep matches having any of these categories, all if None.
+
+    Returns:
+        pl.LazyFrame: Cube slice.
+    """
+    cube = pl.scan_parquet(path)
+    if start is not None:
+        cube = cube.filter(pl.col("day") >= start)
+    if end is not None:
+        cube = cube.filter(pl.col("day") < end)
+    if sources is not None:
+        cube = cube.filter(pl.col("source").is_in(sources))
+    if categories is not None:
+        cube = cube.filter(has_categories(categories))
+    return cube
+
+
+def expand_cube(cube: pl.DataFrame | pl.LazyFrame) -> pl.DataFrame:
+    """
+    Expand a cube back to one row per match, in the processed matches format used by `RankingPipeline`.
+
+    Each cell gives one row per counted outcome. The sums of a cell are spread evenly over its rows,
+    so that per model totals are preserved and resampled rows carry the same weight. Matches get no
+    conversation pair id, are timestamped at midnight of their day, and only keep the categories of
+    the vocabulary.
+
+    Args:
+        cube (pl.DataFrame | pl.LazyFrame): Cube or cube slice.
+
+    Returns:
+        pl.DataFrame: Processed matches.
+    """
+    cube = cube.lazy()
+    schema = cube.collect_schema()
+    sums = [column for column in SUMS if column in schema.names()]
+    return (
+        cube.with_columns(n_cell=pl.sum_horizontal(*OUTCOMES))
+        .unpivot(
+            index=[column for column in schema.names() if column not in OUTCOMES] + ["n_cell"],
+            on=list(OUTCOMES),
+            variable_name="outcome",
+            value_name="count",
+        )
+        # cells without an outcome would explode into a null row
+        .filter(pl.col("count") > 0)
+        .sort(*KEYS, "outcome")
+        .with_columns(index=pl.int_ranges(0, pl.col("count")))
+        .explode("index")
+        .with_columns(*[(pl.col(column) / pl.col("n_cell")).alias(column) for column in sums])
+        .select(
+            pl.lit(None, dtype=pl.String).alias("conversation_pair_id"),
+            pl.col("day").cast(pl.Datetime("us")).alias("timestamp"),
+            "source",
+            "model_a",
+            "model_b",
+            pl.col("outcome")
+            .replace_strict({outcome: score.value for outcome, score in OUTCOMES.items()}, return_dtype=pl.Int32)
+            .alias("score"),
+            mask_categories(),
+            "model_a_active_params",
+            "model_b_active_params",
+            *sums,
+            "category_mask",
+        )
+        .collect()
+    )
@@ -7,23 +7,26 @@ Legacy functions for data transformation.
 
 import polars as pl
 
+from rank_comparia.utils import Frame
+
 
 POSITIVE_COLUMNS = ["liked", "useful", "creative", "clear_formatting"]
 NEGATIVE_COLUMNS = ["disliked", "incorrect", "superficial", "instructions_not_followed"]
 
 
-def get_matches_with_score(reactions: pl.DataFrame) -> pl.DataFrame:
+def get_matches_with_score(reactions: Frame) -> Frame:
     """
     Compute a 'reactions score' (number of positive reactions - number
     of negative reactions) per model for each match in the reactions data.
 
     Args:
-        reactions (pl.DataFrame): Reactions data.
+        reactions (pl.DataFrame | pl.LazyFrame): Reactions data.
 
     Returns:
-        pl.DataFrame: A DataFrame with the reactions score for each match.
+        pl.DataFrame | pl.LazyFrame: A DataFrame with the reactions score for each match.
     """
-    comparia_reactions = reactions.sort("timestamp").with_columns(
+    # scores are sums over each match, so reactions do not need to be ordered
+    comparia_reactions = reactions.with_columns(
         *[pl.col(bool_to_zero).fill_null(value=False).cast(int) for bool_to_zero in POSITIVE_COLUMNS + NEGATIVE_COLUMNS]
     )
     likability_score = pl.sum_horizontal(*POSITIVE_COLUMNS) - pl.sum_horizontal(*NEGATIVE_COLUMNS)
@@ -31,21 +34,22 @@ def get_matches_with_score(reactions: pl.DataFrame) -> pl.DataFrame:
         comparia_reactions.with_columns(
             score_a=pl.when(model_pos="a").then(likability_score).otherwise(0),
             score_b=pl.when(model_pos="b").then(likability_score).otherwise(0),
-        )["model_a_name", "model_b_name", "score_a", "score_b", "conversation_pair_id"]
+        )
+        .select("model_a_name", "model_b_name", "score_a", "score_b", "conversation_pair_id")
         .group_by(["model_a_name", "model_b_name", "conversation_pair_id"])
         .sum()
     )
 
 
-def get_winners(matches: pl.DataFrame) -> pl.DataFrame:
+def get_winners(matches: Frame) -> Frame:
     """
     Get winner model for each match in the reactions data.
 
     Args:
-        matches (pl.DataFrame): Match data with model scores coming from the reactions data.
+        matches (pl.DataFrame | pl.LazyFrame): Match data with model scores coming from the reactions data.
 
     Returns:
-        pl.DataFrame: A DataFrame with the winner model for each match.
+        pl.DataFrame | pl.LazyFrame: A DataFrame with the winner model for each match.
     """
     return matches.with_columns(
         model_name=pl.when(pl.col("score_a") > pl.col("score_b"))
@@ -56,16 +60,16 @@ def get_winners(matches: pl.DataFrame) -> pl.DataFrame:
     ).filter(pl.col("model_name").is_not_null())
 
 
-def get_winrates(winners: pl.DataFrame) -> pl.DataFrame:
+def get_winrates(winners: Frame) -> Frame:
     """
     Compute winrate per model from a DataFrame with the winning model for
     each match.
 
     Args:
-        winners (pl.DataFrame): DataFrame with match winners.
+        winners (pl.DataFrame | pl.LazyFrame): DataFrame with match winners.
 
     Returns:
-        pl.DataFrame: Winrates DataFrame.
+        pl.DataFrame | pl.LazyFrame: Winrates DataFrame.
     """
     winners_len = winners.group_by("model_name").len().rename({"len": "wins"})
 
@@ -2,12 +2,17 @@
 #
 # SPDX-License-Identifier: MIT
 
+from datetime import datetime
+from itertools import product
 from typing import Literal
 
+import numpy as np
+import polars as pl
+
 from rank_comparia.ranker import Match, Ranker
 
 
-def reciprocal_function(score_difference: float):
+def reciprocal_function(score_difference: float, scale: float = 400):
     """
     Computes the expected score for a player based on the Elo rating system.
 
@@ -17,11 +22,12 @@ def reciprocal_function(score_difference: float):
     Args:
         score_difference (float): The rating difference between two players (A - B),
             where a positive value indicates player A is stronger.
+        scale (float): Scale parameter, a difference of `scale` gives 10:1 odds.
 
     Returns:
         float: The expected score (win probability) for the player with the higher rating.
     """
-    return 1 / (1 + 10 ** (-score_difference / 400))
+    return 1 / (1 + 10 ** (-score_difference / scale))
 
 
 class ELORanker(Ranker):
@@ -29,18 +35,30 @@ class ELORanker(Ranker):
     Elo Ranker.
     """
 
-    def __init__(self, scale: int = 400, default_score: float = 1000.0, bootstrap_samples: int = 100, K: int = 40):
+    def __init__(
+        self,
+        scale: int = 400,
+        default_score: float = 1000.0,
+        bootstrap_samples: int = 100,
+        K: int = 40,
+        high_score: float = 2400,
+        experienced_matches: int = 30,
+    ):
         """
         Constructor.
 
         Args:
-            scale (int): Scale parameter.
+            scale (int): Scale parameter, also bounding the score difference used in updates.
             default_score (float): Base score used.
             bootstrap_samples (int): Number of bootstrap samples.
             K (int): Elo K-factor.
+            high_score (float): Score above which matches of a model use K / 4.
+            experienced_matches (int): Number of matches played by both models above which matches use K / 2.
         """
         super().__init__(scale, default_score, bootstrap_samples)
         self.K = K
+        self.high_score = high_score
+        self.experienced_matches = experienced_matches
         # initialize scores
         self.players = {}
         self.played_matches = {}
@@ -98,7 +116,7 @@ class ELORanker(Ranker):
         """
         return self.played_matches[name]
 
-    def add_match(self, player_a: str, player_b: str, score: Literal[0, 1, 2], K: float = 40.0) -> None:
+    def add_match(self, player_a: str, player_b: str, score: Literal[0, 1, 2], K: float | None = None) -> None:
         """
         Update Elo scores based on a match result.
 
@@ -106,13 +124,14 @@ class ELORanker(Ranker):
             player_a (str): Player A.
             player_b (str): Player B.
             score (Literal[0, 1, 2]): Match score. 0 -> b wins, 2 -> a wins, 1 -> draw.
-            K (float): Elo K-factor.
+            K (float | None): Elo K-factor, the ranker K-factor if None.
         """
+        K = self.K if K is None else K
         W = score / 2.0
-        D = min(max(self.player_score(player_a) - self.player_score(player_b), -400), 400)
-        pd = reciprocal_function(D)
-        self.players[player_a] += self.K * (W - pd)
-        self.players[player_b] += self.K * (pd - W)
+        D = min(max(self.player_score(player_a) - self.player_score(player_b), -self.scale), self.scale)
+        pd = reciprocal_function(D, self.scale)
+        self.players[player_a] += K * (W - pd)
+        self.players[player_b] += K * (pd - W)
         self.played_matches[player_a] += 1
         self.played_matches[player_b] += 1
 
@@ -136,9 +155,9 @@ class ELORanker(Ranker):
             self.player_number_of_matches(model_b_name),
         )
         max_elo = max(self.player_score(model_a_name), self.player_score(model_b_name))
-        if max_elo > 2400:
+        if max_elo > self.high_score:
             K = self.K / 4
-        elif min_number_of_parties > 30:
+        elif min_number_of_parties > self.experienced_matches:
             K = self.K / 2
         else:
             K = self.K
@@ -163,6 +182,31 @@ class ELORanker(Ranker):
         # compute scores
         return self.update_scores(matches)
 
+    def compute_encoded_scores(
+        self, models: list[str], model_a: np.ndarray, model_b: np.ndarray, score: np.ndarray
+    ) -> dict[str, float]:
+        """
+        Compute scores starting at the default score from encoded matches, replayed in the given
+        order with `replay_elo`.
+
+        Args:
+            models (list[str]): Model names.
+            model_a (np.ndarray): Index in `models` of model a of each match.
+            model_b (np.ndarray): Index in `models` of model b of each match.
+            score (np.ndarray): Score of each match (0 -> b wins, 2 -> a wins, 1 -> draw).
+
+        Returns:
+            dict[str, float]: Dictionary mapping model names to float scores, for models playing
+                at least one match.
+        """
+        ratings, _ = replay_elo(model_a, model_b, score, len(models), **elo_settings(self))
+        played = np.bincount(np.concatenate([model_a, model_b]), minlength=len(models))
+        self.players = {model: float(ratings[position]) for position, model in enumerate(models) if played[position]}
+        self.played_matches = {
+            model: int(played[position]) for position, model in enumerate(models) if played[position]
+        }
+        return self.get_scores()
+
     def update_scores(self, matches: list[Match]) -> dict[str, float]:
         """
         Update scores from a list of matches.
@@ -176,3 +220,266 @@ class ELORanker(Ranker):
         for match in matches:
             self._add_match(match.model_a, match.model_b, score=match.score.value)
         return self.get_scores()
+
+
+def elo_settings(ranker: ELORanker) -> dict[str, float]:
+    """
+    Settings of an Elo ranker, as keyword arguments of `replay_elo`.
+
+    Args:
+        ranker (ELORanker): Elo ranker.
+
+    Returns:
+        dict[str, float]: Settings.
+    """
+    return {
+        "default_score": ranker.default_score,
+        "K": ranker.K,
+        "scale": ranker.scale,
+        "high_score": ranker.high_score,
+        "experienced_matches": ranker.experienced_matches,
+    }
+
+
+def replay_elo(
+    model_a: np.ndarray,
+    model_b: np.ndarray,
+    score: np.ndarray,
+    n_models: int,
+    default_score: float = 1000.0,
+    K: float = 40.0,
+    scale: float = 400,
+    high_score: float = 2400,
+    experienced_matches: int = 30,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Replay encoded matches in the given order, with the update rule and K-factor schedule of `ELORanker`.
+
+    Args:
+        model_a (np.ndarray): Index of model a of each match.
+        model_b (np.ndarray): Index of model b of each match.
+        score (np.ndarray): Score of each match (0 -> b wins, 2 -> a wins, 1 -> draw).
+        n_models (int): Number of models.
+        default_score (float): Initial score of all models.
+        K (float): Elo K-factor.
+        scale (float): Scale parameter.
+        high_score (float): Score above which matches of a model use K / 4.
+        experienced_matches (int): Number of matches played by both models above which matches use K / 2.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Final scores of shape (n_models,), and scores of models a and
+            b after each match of shape (n_matches, 2).
+    """
+    ratings = [default_score] * n_models
+    played = [0] * n_models
+    after = []
+    # plain Python scalars are much faster than numpy scalars in this sequential loop
+    for a, b, points in zip(model_a.tolist(), model_b.tolist(), score.tolist()):
+        if max(ratings[a], ratings[b]) > high_score:
+            k = K / 4
+        elif min(played[a], played[b]) > experienced_matches:
+            k = K / 2
+        else:
+            k = K
+        difference = min(max(ratings[a] - ratings[b], -scale), scale)
+        delta = k * (points / 2 - 1 / (1 + 10 ** (-difference / scale)))
+        ratings[a] += delta
+        ratings[b] -= delta
+        played[a] += 1
+        played[b] += 1
+        after.append((ratings[a], ratings[b]))
+    return np.array(ratings), np.array(after, dtype=float).reshape(-1, 2)
+
+
+def replay_elo_grid(
+    model_a: np.ndarray,
+    model_b: np.ndarray,
+    score: np.ndarray,
+    n_models: int,
+    K: np.ndarray,
+    scale: np.ndarray,
+    high_score: np.ndarray,
+    experienced_matches: np.ndarray,
+    default_score: float = 1000.0,
+) -> np.ndarray:
+    """
+    Replay encoded matches once for a whole grid of settings, see `replay_elo`. Each setting is a
+    column of the rating matrix, so that every match is a single vectorized update.
+
+    Args:
+        model_a (np.ndarray): Index of model a of each match.
+        model_b (np.ndarray): Index of model b of each match.
+        score (np.ndarray): Score of each match (0 -> b wins, 2 -> a wins, 1 -> draw).
+        n_models (int): Number of models.
+        K (np.ndarray): K-factor of each setting.
+        scale (np.ndarray): Scale parameter of each setting.
+        high_score (np.ndarray): High score threshold of each setting.
+        experienced_matches (np.ndarray): Experienced matches threshold of each setting.
+        default_score (float): Initial score of all models.
+
+    Returns:
+        np.ndarray: Final scores of shape (n_models, n_settings).
+    """
+    K, scale, high_score, experienced_matches = (
+        np.asarray(values, dtype=float) for values in (K, scale, high_score, experienced_matches)
+    )
+    ratings = np.full((n_models, len(K)), default_score)
+    played = [0] * n_models
+    for a, b, points in zip(model_a.tolist(), model_b.tolist(), score.tolist()):
+        rating_a, rating_b = ratings[a], ratings[b]
+        k = np.where(
+            np.maximum(rating_a, rating_b) > high_score,
+            K / 4,
+            np.where(min(played[a], played[b]) > experienced_matches, K / 2, K),
+        )
+        difference = np.clip(rating_a - rating_b, -scale, scale)
+        delta = k * (points / 2 - 1 / (1 + 10 ** (-difference / scale)))
+        ratings[a] += delta
+        ratings[b] -= delta
+        played[a] += 1
+        played[b] += 1
+    return ratings
+
+
+def rating_trajectories(matches: pl.DataFrame, every: str = "1d", ranker: ELORanker | None = None) -> pl.DataFrame:
+    """
+    Replay processed matches in conversation order and keep the score of each model at the end of
+    each period in which it played, so that a trajectory has one point per change instead of one
+    per match.
+
+    Args:
+        matches (pl.DataFrame): Processed matches with encoded model names (see `utils.encode_model_names`).
+        every (str): Period of the change points, as a polars interval (e.g. "1d", "1w").
+        ranker (ELORanker | None): Ranker whose settings are used, default settings if None.
+
+    Returns:
+        pl.DataFrame: Columns "period_start", "model_name", "score" and "n_match" (matches played in
+            the period), sorted by period and model.
+    """
+    ranker = ranker or ELORanker()
+    matches = matches.sort("timestamp", "conversation_pair_id")
+    dtype: pl.Enum = matches.schema["model_a"]  # type: ignore
+    _, after = replay_elo(
+        matches["model_a"].to_physical().to_numpy(),
+        matches["model_b"].to_physical().to_numpy(),
+        matches["score"].to_numpy(),
+        n_models=len(dtype.categories),
+        **elo_settings(ranker),
+    )
+    order = pl.int_range(len(matches), eager=True).alias("order")
+    updates = pl.concat(
+        [
+            matches.select("timestamp", order, pl.col(f"model_{side}").alias("model_name")).with_columns(
+                score=pl.Series(after[:, column])
+            )
+            for column, side in enumerate(("a", "b"))
+        ]
+    )
+    return (
+        updates.group_by(pl.col("timestamp").dt.truncate(every).alias("period_start"), "model_name")
+        .agg(pl.col("score").sort_by("order").last(), pl.len().alias("n_match"))
+        .sort("period_start", pl.col("model_name").cast(pl.String))
+    )
+
+
+class OrderedELORanker(ELORanker):
+    """
+    Elo Ranker replaying matches in the order they are given, which should be the order in which
+    they were played.
+
+    Bootstrap samples keep the order of the matches they draw.
+    """
+
+    def compute_scores(self, matches: list[Match]) -> dict[str, float]:
+        """
+        Compute scores starting at the default score from a chronological list of matches.
+
+        Args:
+            matches (list[Match]): List of matches, in the order they were played.
+
+        Returns:
+            dict[str, float]: Dictionary mapping model names to float scores.
+        """
+        index: dict[str, int] = {}
+        model_a = np.array([index.setdefault(match.model_a, len(index)) for match in matches], dtype=np.int64)
+        model_b = np.array([index.setdefault(match.model_b, len(index)) for match in matches], dtype=np.int64)
+        score = np.array([match.score.value for match in matches], dtype=np.int64)
+        return self.compute_encoded_scores(list(index), model_a, model_b, score)
+
+    def order_sample(self, indices: np.ndarray) -> np.ndarray:
+        """
+        Sort the indices of a bootstrap sample, so that samples are replayed in chronological order.
+
+        Args:
+            indices (np.ndarray): Indices of the sampled matches, in a list of matches in the order
+                they were played.
+
+        Returns:
+            np.ndarray: Sorted indices.
+        """
+        return np.sort(indices)
+
+
+def sweep_elo(
+    matches: pl.DataFrame,
+    grid: dict[str, list[float]],
+    holdout_fraction: float = 0.2,
+    holdout_start: datetime | None = None,
+    default_score: float = 1000.0,
+) -> pl.DataFrame:
+    """
+    Evaluate a grid of Elo settings on a chronological train / holdout split.
+
+    Training matches are replayed in conversation order once for all settings (see
+    `replay_elo_grid`), then holdout matches are predicted with the final training scores.
+
+    Args:
+        matches (pl.DataFrame): Processed matches with encoded model names (see `utils.encode_model_names`).
+        grid (dict[str, list[float]]): Values of "K", "scale", "high_score" and "experienced_matches"
+            (see `ELORanker`), all combinations are evaluated. Missing settings keep their default value.
+        holdout_fraction (float): Fraction of the most recent matches held out, if `holdout_start` is None.
+        holdout_start (datetime | None): Start of the holdout period.
+        default_score (float): Initial score of all models.
+
+    Returns:
+        pl.DataFrame: One row per setting with the settings, the holdout "log_loss", "brier" and
+            "accuracy" (on matches that are not draws), "n_train" and "n_holdout", sorted by log loss.
+    """
+    defaults = elo_settings(ELORanker())
+    unknown = set(grid) - {"K", "scale", "high_score", "experienced_matches"}
+    if unknown:
+        raise ValueError(f"Unknown Elo settings {sorted(unknown)}.")
+    values = {name: grid.get(name, [defaults[name]]) for name in ("K", "scale", "high_score", "experienced_matches")}
+    settings = pl.DataFrame(list(product(*values.values())), schema=list(values), orient="row")
+
+    matches = matches.sort("timestamp", "conversation_pair_id")
+    if holdout_start is None:
+        n_train = int(len(matches) * (1 - holdout_fraction))
+    else:
+        n_train = int((matches["timestamp"] < holdout_start).sum())
+    if n_train == 0 or n_train == len(matches):
+        raise ValueError("Both the training and holdout periods must contain matches.")
+    dtype: pl.Enum = matches.schema["model_a"]  # type: ignore
+    model_a = matches["model_a"].to_physical().to_numpy()
+    model_b = matches["model_b"].to_physical().to_numpy()
+    score = matches["score"].to_numpy()
+
+    ratings = replay_elo_grid(
+        model_a[:n_train],
+        model_b[:n_train],
+        score[:n_train],
+        n_models=len(dtype.categories),
+        default_score=default_score,
+        **{name: settings[name].to_numpy() for name in settings.columns},
+    )
+    # evaluation imports the rankers of this module
+    from rank_comparia.evaluation import prediction_metrics
+
+    # (n_holdout, n_settings) predictions
+    scale = settings["scale"].to_numpy()
+    probabilities = 1 / (1 + 10 ** (-(ratings[model_a[n_train:]] - ratings[model_b[n_train:]]) / scale))
+    return settings.with_columns(
+        **prediction_metrics(probabilities, score[n_train:]),
+        n_train=pl.lit(n_train),
+        n_holdout=pl.lit(len(matches) - n_train),
+    ).sort("log_loss")
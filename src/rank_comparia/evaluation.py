@@ -0,0 +1,248 @@
+# SPDX-FileCopyrightText: 2025 Pôle d'Expertise de la Régulation Numérique <contact@peren.gouv.fr>
+#
+# SPDX-License-Identifier: MIT
+
+"""Predictive accuracy of rankers on future matches, with rolling-origin time splits."""
+
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+import numpy as np
+import polars as pl
+
+from rank_comparia.elo import ELORanker, OrderedELORanker
+from rank_comparia.maximum_likelihood import MaximumLikelihoodRanker
+from rank_comparia.rank_centrality import RankCentralityRanker
+from rank_comparia.ranker import Match, MatchScore, Ranker
+
+
+def default_rankers() -> dict[str, Ranker]:
+    """
+    Rankers of the pipeline methods, and the sparse solver of the maximum likelihood ranker.
+
+    Returns:
+        dict[str, Ranker]: Rankers by name.
+    """
+    return {
+        "elo_random": ELORanker(),
+        "elo_ordered": OrderedELORanker(),
+        "ml": MaximumLikelihoodRanker(),
+        "ml_sparse": MaximumLikelihoodRanker(solver="sparse"),
+        "rank_centrality": RankCentralityRanker(),
+    }
+
+
+def rolling_origin_splits(
+    matches: pl.DataFrame, every: str = "1w", n_splits: int | None = None, window_days: int | None = None
+) -> list[tuple[date | None, date, date]]:
+    """
+    List rolling-origin splits: each period of the data is predicted by rankers fitted on the
+    matches played before it.
+
+    Args:
+        matches (pl.DataFrame): Matches with a "timestamp" column.
+        every (str): Length of test periods, as a polars interval (e.g. "1w", "1mo").
+        n_splits (int | None): Only keep the last splits, all splits if None.
+        window_days (int | None): Length of training windows in days, None for all previous matches.
+
+    Returns:
+        list[tuple[date | None, date, date]]: (training start, origin, exclusive test end) of each split.
+    """
+    days = matches["timestamp"].dt.date()
+    first_day, end_day = days.min(), days.max() + timedelta(days=1)  # type: ignore
+    origins = pl.date_range(
+        pl.lit(first_day).dt.truncate(every).dt.offset_by(every), pl.lit(end_day), interval=every, eager=True
+    ).to_list()
+    bounds = [origin for origin in origins if origin < end_day] + [end_day]
+    splits = [
+        (None if window_days is None else origin - timedelta(days=window_days), origin, test_end)
+        for origin, test_end in zip(bounds[:-1], bounds[1:])
+    ]
+    return splits if n_splits is None else splits[-n_splits:]
+
+
+def win_probabilities(
+    scores: dict[str, float],
+    models: list[str],
+    model_a: np.ndarray,
+    model_b: np.ndarray,
+    scale: float = 400,
+    default_score: float = 1000.0,
+) -> np.ndarray:
+    """
+    Probability that model a wins each match, from the scores of a ranker.
+
+    Args:
+        scores (dict[str, float]): Scores by model, models without score get `default_score`.
+        models (list[str]): Model names.
+        model_a (np.ndarray): Index in `models` of model a of each match.
+        model_b (np.ndarray): Index in `models` of model b of each match.
+        scale (float): Scale parameter of the scores.
+        default_score (float): Score of models without score.
+
+    Returns:
+        np.ndarray: Probabilities of shape (n_matches,).
+    """
+    table = np.array([scores.get(model, default_score) for model in models], dtype=float)
+    return 1 / (1 + 10 ** ((table[model_b] - table[model_a]) / scale))
+
+
+def prediction_metrics(probabilities: np.ndarray, score: np.ndarray) -> dict[str, np.ndarray]:
+    """
+    Log loss, Brier score and accuracy of win probabilities, a draw counting as half a win.
+
+    Args:
+        probabilities (np.ndarray): Probability that model a wins, of shape (n_matches,) or
+            (n_matches, n_predictors).
+        score (np.ndarray): Score of each match (0 -> b wins, 2 -> a wins, 1 -> draw).
+
+    Returns:
+        dict[str, np.ndarray]: "log_loss", "brier" and "accuracy" (on matches that are not draws,
+            NaN without any), averaged over matches.
+    """
+    outcomes = (score / 2).reshape(-1, *([1] * (probabilities.ndim - 1)))
+    clipped = np.clip(probabilities, 1e-15, 1 - 1e-15)
+    decisive = score != MatchScore.Draw
+    return {
+        "log_loss": -(outcomes * np.log(clipped) + (1 - outcomes) * np.log(1 - clipped)).mean(axis=0),
+        "brier": ((probabilities - outcomes) ** 2).mean(axis=0),
+        "accuracy": (
+            ((probabilities[decisive] > 0.5) == (outcomes[decisive] == 1)).mean(axis=0)
+            if decisive.any()
+            else np.full(probabilities.shape[1:], np.nan)
+        ),
+    }
+
+
+def _match_list(matches: pl.DataFrame) -> list[Match]:
+    return [
+        Match(model_a, model_b, MatchScore(score))
+        for model_a, model_b, score in matches.select("model_a", "model_b", "score").iter_rows()
+    ]
+
+
+def _fit(ranker: Ranker, matches: list[Match], measure_memory: bool) -> tuple[dict[str, float], float, float | None]:
+    """
+    Fit a ranker, timed without memory tracing, which slows allocations down.
+    """
+    start = time.perf_counter()
+    scores = ranker.compute_scores(matches)
+    seconds = time.perf_counter() - start
+    peak = None
+    if measure_memory:
+        tracemalloc.start()
+        try:
+            ranker.compute_scores(matches)
+            peak = tracemalloc.get_traced_memory()[1] / 1024**2
+        finally:
+            tracemalloc.stop()
+    return scores, seconds, peak
+
+
+def evaluate_rankers(
+    matches: pl.DataFrame,
+    rankers: dict[str, Ranker] | None = None,
+    every: str = "1w",
+    n_splits: int | None = None,
+    window_days: int | None = None,
+    measure_memory: bool = True,
+) -> pl.DataFrame:
+    """
+    Fit each ranker on the training window of each rolling-origin split, and score its predictions
+    of the following period.
+
+    Args:
+        matches (pl.DataFrame): Processed matches, see `RankingPipeline`.
+        rankers (dict[str, Ranker] | None): Rankers by name, `default_rankers` if None.
+        every (str): Length of test periods, as a polars interval (e.g. "1w", "1mo").
+        n_splits (int | None): Only evaluate the last splits, all splits if None.
+        window_days (int | None): Length of training windows in days, None for all previous matches.
+        measure_memory (bool): Whether to fit each ranker a second time to measure its peak Python
+            memory allocations (numpy included) with `tracemalloc`.
+
+    Returns:
+        pl.DataFrame: One row per ranker and split with columns "ranker", "train_start", "origin",
+            "test_end", "n_train", "n_test", "log_loss", "brier", "accuracy", "fit_seconds" and
+            "peak_memory_mb".
+    """
+    rankers = rankers or default_rankers()
+    # chronological order, replayed by ordered rankers
+    matches = matches.sort("timestamp", "conversation_pair_id").with_columns(
+        pl.col("model_a", "model_b").cast(pl.String), day=pl.col("timestamp").dt.date()
+    )
+    models = pl.concat([matches["model_a"], matches["model_b"]]).unique().sort().to_list()
+    index = pl.Enum(models)
+
+    rows = []
+    for train_start, origin, test_end in rolling_origin_splits(matches, every, n_splits, window_days):
+        in_train = pl.col("day") < origin
+        if train_start is not None:
+            in_train &= pl.col("day") >= train_start
+        train = _match_list(matches.filter(in_train))
+        test = matches.filter((pl.col("day") >= origin) & (pl.col("day") < test_end))
+        if not train or test.is_empty():
+            continue
+        model_a = test["model_a"].cast(index).to_physical().to_numpy()
+        model_b = test["model_b"].cast(index).to_physical().to_numpy()
+        for name, ranker in rankers.items():
+            scores, seconds, peak = _fit(ranker, train, measure_memory)
+            probabilities = win_probabilities(
+                scores, models, model_a, model_b, scale=ranker.scale, default_score=ranker.default_score
+            )
+            metrics = prediction_metrics(probabilities, test["score"].to_numpy())
+            rows.append(
+                {
+                    "ranker": name,
+                    "train_start": train_start,
+                    "origin": origin,
+                    "test_end": test_end,
+                    "n_train": len(train),
+                    "n_test": len(test),
+                    **{metric: float(value) for metric, value in metrics.items()},
+                    "fit_seconds": seconds,
+                    "peak_memory_mb": peak,
+                }
+            )
+    return pl.DataFrame(
+        rows,
+        schema={
+            "ranker": pl.String,
+            "train_start": pl.Date,
+            "origin": pl.Date,
+            "test_end": pl.Date,
+            "n_train": pl.Int64,
+            "n_test": pl.Int64,
+            "log_loss": pl.Float64,
+            "brier": pl.Float64,
+            "accuracy": pl.Float64,
+            "fit_seconds": pl.Float64,
+            "peak_memory_mb": pl.Float64,
+        },
+    )
+
+
+def summarize_evaluation(results: pl.DataFrame) -> pl.DataFrame:
+    """
+    Average the metrics of each ranker over splits, weighting quality metrics by test matches.
+
+    Args:
+        results (pl.DataFrame): Results of `evaluate_rankers`.
+
+    Returns:
+        pl.DataFrame: One row per ranker, sorted by log loss.
+    """
+    weight = pl.col("n_test") / pl.col("n_test").sum()
+    return (
+        results.group_by("ranker")
+        .agg(
+            pl.len().alias("n_splits"),
+            pl.sum("n_test"),
+            *[(pl.col(metric) * weight).sum().alias(metric) for metric in ("log_loss", "brier")],
+            # accuracy is NaN on splits without decisive matches
+            pl.col("accuracy").fill_nan(None).mean(),
+            pl.mean("fit_seconds"),
+            pl.max("peak_memory_mb"),
+        )
+        .sort("log_loss")
+    )
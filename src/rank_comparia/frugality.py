@@ -6,16 +6,18 @@ from typing import Literal, Optional
 
 import polars as pl
 
+from rank_comparia.utils import Frame
 
-def get_model_params(conversations: pl.DataFrame) -> pl.DataFrame:
+
+def get_model_params(conversations: Frame) -> Frame:
     """
     Select infos about number of parameters of models
 
     Args:
-        conversations (pl.DataFrame) : Conversations data.
+        conversations (pl.DataFrame | pl.LazyFrame) : Conversations data.
 
     Returns:
-        pl.DataFrame with number of parameters per model
+        pl.DataFrame | pl.LazyFrame with number of parameters per model
     """
     return (
         pl.concat(
@@ -29,15 +31,15 @@ def get_model_params(conversations: pl.DataFrame) -> pl.DataFrame:
     )
 
 
-def get_models_output_tokens(conversations: pl.DataFrame) -> pl.DataFrame:
+def get_models_output_tokens(conversations: Frame) -> Frame:
     """
     Calculates all output tokens generated by a model
 
     Args:
-        conversations (pl.DataFrame) : Conversations data.
+        conversations (pl.DataFrame | pl.LazyFrame) : Conversations data.
 
     Returns:
-        pl.DataFrame with number of output tokens generated by model
+        pl.DataFrame | pl.LazyFrame with number of output tokens generated by model
     """
     return (
         pl.concat(
@@ -57,15 +59,15 @@ def get_models_output_tokens(conversations: pl.DataFrame) -> pl.DataFrame:
     )
 
 
-def get_n_match(data: pl.DataFrame) -> pl.DataFrame:
+def get_n_match(data: Frame) -> Frame:
     """
     Build a DataFrame to map the number of matches played by models
 
     Args :
-        data : polars DataFrame with matches to calculate consumption
+        data : polars DataFrame or LazyFrame with matches to calculate consumption
 
     Returns:
-        polars DataFrame with 2 columns (model_name, number of matches played)
+        polars DataFrame or LazyFrame with 2 columns (model_name, number of matches played)
     """
 
     comparia_model_a = data.group_by(["model_a"]).len(name="n_match").with_columns(model_name="model_a").drop("model_a")
@@ -73,16 +75,17 @@ def get_n_match(data: pl.DataFrame) -> pl.DataFrame:
     return pl.concat([comparia_model_a, comparia_model_b]).group_by("model_name").sum().sort("model_name")
 
 
-def calculate_frugality_score(conversations: pl.DataFrame, n_match: Optional[pl.DataFrame]) -> pl.DataFrame:
+def calculate_frugality_score(conversations: Frame, n_match: Optional[Frame]) -> Frame:
     """
     Calculate a frugality score by model from conversations data.
 
     Args:
-        conversations (pl.DataFrame): Conversations data.
-        n_match (pl.DataFrame): Data with the number of matches by model.
+        conversations (pl.DataFrame | pl.LazyFrame): Conversations data.
+        n_match (pl.DataFrame | pl.LazyFrame | None): Data with the number of matches by model,
+            of the same kind as `conversations`.
 
     Returns:
-        pl.DataFrame: DataFrame with frugality scores.
+        pl.DataFrame | pl.LazyFrame: DataFrame with frugality scores.
     """
 
     frugal_score = (
@@ -0,0 +1,228 @@
+# SPDX-FileCopyrightText: 2025 Pôle d'Expertise de la Régulation Numérique <contact@peren.gouv.fr>
+#
+# SPDX-License-Identifier: MIT
+
+"""Append-only history of leaderboards, stored as Parquet files partitioned by run date, method and category."""
+
+import json
+import os
+import uuid
+from dataclasses import dataclass
+from datetime import date, datetime
+from pathlib import Path
+from urllib.parse import quote
+
+import polars as pl
+
+
+ALL = "all"  # category of leaderboards computed on all matches
+TABLES = ("scores", "replicates", "runs")
+
+
+def new_run_id() -> str:
+    """
+    Generate a run identifier, sortable by creation time.
+
+    Returns:
+        str: Run identifier.
+    """
+    return f"{datetime.now():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"
+
+
+@dataclass
+class RunHistory:
+    """
+    Store of past runs.
+
+    Each table is written under `root/{table}/run_date=.../method=.../category=.../{run_id}.parquet`,
+    files are never overwritten and the tables of a run only appear once all of them are written.
+    Partition values are also stored as columns, so that queries only list the partitions they need
+    and then read them as a single lazy frame.
+    """
+
+    root: Path  # root directory of the store
+
+    def _partition(self, table: str, run_date: date | str, method: str, category: str) -> Path:
+        return (
+            self.root
+            / table
+            / f"run_date={run_date}"
+            / f"method={quote(method, safe='')}"
+            / f"category={quote(category, safe='')}"
+        )
+
+    def append(
+        self,
+        scores: pl.DataFrame,
+        method: str,
+        category: str = ALL,
+        replicates: pl.DataFrame | None = None,
+        config: dict | None = None,
+        run_id: str | None = None,
+        run_date: date | None = None,
+    ) -> str:
+        """
+        Add the leaderboard of a run.
+
+        Args:
+            scores (pl.DataFrame): Bootstrap scores.
+            method (str): Ranking method.
+            category (str): Conversation category, "all" for the overall leaderboard.
+            replicates (pl.DataFrame | None): Bootstrap replicates, one column per model and one row per sample.
+            config (dict | None): JSON serializable configuration of the run.
+            run_id (str | None): Run identifier, generated if None.
+            run_date (date | None): Run date, today if None.
+
+        Returns:
+            str: Run identifier.
+        """
+        run_id = run_id or new_run_id()
+        run_date = run_date or date.today()
+        keys = {"run_date": run_date, "method": method, "category": category, "run_id": run_id}
+        tables = {
+            "scores": scores,
+            "runs": pl.DataFrame(
+                {"created_at": [datetime.now()], "config": [json.dumps(config or {}, sort_keys=True, default=str)]}
+            ),
+        }
+        if replicates is not None and not replicates.is_empty():
+            tables["replicates"] = replicates.with_row_index("sample").unpivot(
+                index="sample", variable_name="model_name", value_name="score"
+            )
+
+        paths = {table: self._partition(table, run_date, method, category) / f"{run_id}.parquet" for table in tables}
+        for path in paths.values():
+            if path.exists():
+                raise FileExistsError(f"Run {run_id} is already stored in {path.parent}.")
+        # all tables are fully written before any of them is visible to `scan`
+        temporaries = {}
+        try:
+            for table, data in tables.items():
+                paths[table].parent.mkdir(parents=True, exist_ok=True)
+                temporaries[table] = paths[table].parent / f".{run_id}.{uuid.uuid4().hex}.tmp"
+                data.select(*[pl.lit(value).alias(key) for key, value in keys.items()], *data.columns).write_parquet(
+                    temporaries[table]
+                )
+        except BaseException:
+            for temporary in temporaries.values():
+                temporary.unlink(missing_ok=True)
+            raise
+        for table, temporary in temporaries.items():
+            os.replace(temporary, paths[table])
+        return run_id
+
+    def scan(
+        self,
+        table: str = "scores",
+        method: str | None = None,
+        category: str | None = None,
+        start: date | None = None,
+        end: date | None = None,
+        run_ids: list[str] | None = None,
+    ) -> pl.LazyFrame:
+        """
+        Lazily read a table, only listing the files of the selected partitions.
+
+        Args:
+            table (str): One of "scores", "replicates" and "runs".
+            method (str | None): Ranking method, all methods if None.
+            category (str | None): Category, all categories if None.
+            start (date | None): First run date, from the first run if None.
+            end (date | None): Last run date (included), up to the last run if None.
+            run_ids (list[str] | None): Runs to read, all runs if None.
+
+        Returns:
+            pl.LazyFrame: Table rows with "run_date", "method", "category" and "run_id" columns.
+        """
+        if table not in TABLES:
+            raise ValueError(f"Unknown table {table}, expected one of {TABLES}.")
+        pattern = self._partition(table, "*", method or "", category or "").relative_to(self.root)
+        # wildcards for partitions that are not selected
+        pattern = Path(*[part + "*" if part.endswith("=") else part for part in pattern.parts])
+        paths = []
+        for path in sorted(self.root.glob(str(pattern / "*.parquet"))):
+            run_date = date.fromisoformat(path.parts[-4].removeprefix("run_date="))
+            if (start is not None and run_date < start) or (end is not None and run_date > end):
+                continue
+            if run_ids is not None and path.stem not in run_ids:
+                continue
+            paths.append(path)
+        if not paths:
+            return pl.LazyFrame(
+                schema={"run_date": pl.Date, "method": pl.String, "category": pl.String, "run_id": pl.String}
+            )
+        # scores columns may differ between runs (e.g. frugality or component columns)
+        return pl.concat([pl.scan_parquet(path) for path in paths], how="diagonal_relaxed")
+
+    def runs(self, method: str | None = None, category: str | None = None) -> pl.DataFrame:
+        """
+        List stored runs with their configuration.
+
+        Args:
+            method (str | None): Ranking method, all methods if None.
+            category (str | None): Category, all categories if None.
+
+        Returns:
+            pl.DataFrame: One row per run and category.
+        """
+        return self.scan("runs", method=method, category=category).sort("run_id", "category").collect()
+
+    def trend(
+        self,
+        method: str,
+        category: str = ALL,
+        models: list[str] | None = None,
+        start: date | None = None,
+        end: date | None = None,
+    ) -> pl.DataFrame:
+        """
+        Score and rank of models across runs.
+
+        Args:
+            method (str): Ranking method.
+            category (str): Category.
+            models (list[str] | None): Models to follow, all models if None.
+            start (date | None): First run date.
+            end (date | None): Last run date (included).
+
+        Returns:
+            pl.DataFrame: Columns "run_date", "run_id", "model_name", "median", "p2.5", "p97.5" and "rank".
+        """
+        scores = self.scan("scores", method=method, category=category, start=start, end=end)
+        if models is not None:
+            scores = scores.filter(pl.col("model_name").is_in(models))
+        return (
+            scores.select("run_date", "run_id", "model_name", "median", "p2.5", "p97.5", "rank")
+            .sort("run_id", "rank")
+            .collect()
+        )
+
+    def diff(self, run_a: str, run_b: str, method: str, category: str = ALL) -> pl.DataFrame:
+        """
+        Score and rank changes of each model between two runs.
+
+        Args:
+            run_a (str): Identifier of the reference run.
+            run_b (str): Identifier of the compared run.
+            method (str): Ranking method.
+            category (str): Category.
+
+        Returns:
+            pl.DataFrame: Median and rank in both runs, "median_change" and "rank_change" (positive
+                when a model moved up), sorted by rank in run b.
+        """
+        scores = self.scan("scores", method=method, category=category, run_ids=[run_a, run_b]).select(
+            "run_id", "model_name", "median", "rank"
+        )
+        before = scores.filter(pl.col("run_id") == run_a).drop("run_id")
+        after = scores.filter(pl.col("run_id") == run_b).drop("run_id")
+        return (
+            before.join(after, on="model_name", how="full", coalesce=True, suffix="_b")
+            .rename({"median": "median_a", "rank": "rank_a"})
+            .with_columns(
+                median_change=pl.col("median_b") - pl.col("median_a"),
+                rank_change=pl.col("rank_a").cast(pl.Int64) - pl.col("rank_b").cast(pl.Int64),
+            )
+            .sort("rank_b", nulls_last=True)
+            .collect()
+        )
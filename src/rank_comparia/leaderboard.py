@@ -0,0 +1,182 @@
+# SPDX-FileCopyrightText: 2025 Pôle d'Expertise de la Régulation Numérique <contact@peren.gouv.fr>
+#
+# SPDX-License-Identifier: MIT
+
+"""Confidence intervals of every leaderboard column, from the bootstrap samples of the scores."""
+
+from typing import Iterable
+
+import numpy as np
+import polars as pl
+
+from rank_comparia.model_statistics import PREFERENCES
+from rank_comparia.preferences import POSITIVE_REACTIONS
+from rank_comparia.ranker import MatchScore
+
+
+# per model sums, named as in `get_model_statistics`
+SUMS = ["n_match", "total_output_tokens", "conso_all_conv", *PREFERENCES]
+STATISTICS = [
+    *SUMS,
+    "mean_conso_per_match",
+    "mean_conso_per_token",
+    "total_prefs",
+    "positive_prefs_ratio",
+    "win_rate",
+    "mean_win_prob",
+]
+
+
+def _side_sums(matches: pl.DataFrame, side: str) -> np.ndarray:
+    """
+    Values summed by model for one side of each match, in the order of `SUMS`.
+    """
+    return (
+        matches.select(
+            pl.lit(1, dtype=pl.Float64),
+            f"total_conv_{side}_output_tokens",
+            f"total_conv_{side}_kwh",
+            *[
+                f"{reaction}_{side}" if f"{reaction}_{side}" in matches.columns else pl.lit(0)
+                for reaction in PREFERENCES
+            ],
+        )
+        .cast(pl.Float64)
+        .fill_null(0)
+        .to_numpy()
+    )
+
+
+def bootstrap_statistics(matches: pl.DataFrame, samples: Iterable[np.ndarray]) -> pl.DataFrame:
+    """
+    Per model statistics of each bootstrap sample: the statistics of `get_model_statistics` and the
+    win rate of `plot.format_matches_for_winrate_count` (without rounding pairwise win ratios).
+
+    Matches are sorted once by model and by pair of models, so that each sample only takes its
+    match counts and one `np.add.reduceat` over the sorted count-weighted values.
+
+    Args:
+        matches (pl.DataFrame): Processed matches, with encoded model names.
+        samples (Iterable[np.ndarray]): Indices in `matches` of the matches of each sample, e.g.
+            from `Ranker.bootstrap_indices` so that statistics are resampled along with scores.
+
+    Returns:
+        pl.DataFrame: One row per sample and model with columns "replicate", "model_name" and the
+            statistics of `STATISTICS` except "mean_win_prob" (see `mean_win_probabilities`), NaN
+            ratios being null.
+    """
+    n_matches = len(matches)
+    model_names = matches.schema["model_a"].categories.to_list()  # type: ignore
+    n_models = len(model_names)
+    model_a = matches["model_a"].to_physical().to_numpy().astype(np.int64)
+    model_b = matches["model_b"].to_physical().to_numpy().astype(np.int64)
+    score = matches["score"].to_numpy()
+
+    # each match counts once for each of its models
+    match = np.concatenate([np.arange(n_matches), np.arange(n_matches)])
+    model = np.concatenate([model_a, model_b])
+    values = np.concatenate([_side_sums(matches, "a"), _side_sums(matches, "b")])
+    wins = np.concatenate([score == MatchScore.A, score == MatchScore.B]).astype(np.float64)
+    decisive = np.concatenate([score != MatchScore.Draw, score != MatchScore.Draw]).astype(np.float64)
+    pair = model * n_models + np.concatenate([model_b, model_a])
+
+    by_model = np.argsort(model, kind="stable")
+    models, model_starts = np.unique(model[by_model], return_index=True)
+    by_pair = np.argsort(pair, kind="stable")
+    pairs, pair_starts = np.unique(pair[by_pair], return_index=True)
+    pair_model = np.searchsorted(models, pairs // n_models)
+    pair_values = np.column_stack([np.ones(len(pair)), wins, decisive])[by_pair]
+    values = values[by_model]
+
+    frames = []
+    for replicate, sample in enumerate(samples):
+        counts = np.bincount(sample, minlength=n_matches).astype(np.float64)[match]
+        sums = np.add.reduceat(values * counts[by_model, None], model_starts, axis=0)
+        pair_count, pair_wins, pair_decisive = np.add.reduceat(
+            pair_values * counts[by_pair, None], pair_starts, axis=0
+        ).T
+        # pairs without decisive matches have no win ratio, as in `format_matches_for_winrate_count`
+        rated = pair_decisive > 0
+        ratio = np.divide(pair_wins, pair_decisive, out=np.zeros_like(pair_wins), where=rated)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            win_rate = np.bincount(pair_model, weights=rated * pair_count * ratio, minlength=len(models)) / np.bincount(
+                pair_model, weights=rated * pair_count, minlength=len(models)
+            )
+        frames.append(
+            pl.DataFrame(
+                {
+                    "replicate": np.full(len(models), replicate),
+                    "model_name": [model_names[index] for index in models],
+                    **{name: sums[:, column] for column, name in enumerate(SUMS)},
+                    "win_rate": win_rate,
+                }
+            )
+        )
+
+    total_prefs = pl.sum_horizontal(*PREFERENCES)
+    return (
+        pl.concat(frames)
+        .with_columns(
+            mean_conso_per_match=pl.col("conso_all_conv") / pl.col("n_match"),
+            mean_conso_per_token=pl.col("conso_all_conv") / pl.col("total_output_tokens"),
+            total_prefs=total_prefs,
+            positive_prefs_ratio=pl.sum_horizontal(*POSITIVE_REACTIONS) / total_prefs,
+        )
+        .with_columns(pl.col(pl.Float64).fill_nan(None))
+        .select("replicate", "model_name", *STATISTICS[:-1])
+    )
+
+
+def mean_win_probabilities(replicates: pl.DataFrame, scale: float = 400) -> pl.DataFrame:
+    """
+    Mean probability of each model to win against all other models, for each bootstrap sample,
+    as in `plot.format_scores_for_mean_win_proba`.
+
+    Args:
+        replicates (pl.DataFrame): Scores of each bootstrap sample, one column per model, see
+            `Ranker.bootstrap_replicates`.
+        scale (float): Scale parameter of the scores.
+
+    Returns:
+        pl.DataFrame: One row per sample and model with columns "replicate", "model_name" and
+            "mean_win_prob".
+    """
+    scores = replicates.to_numpy().astype(np.float64)
+    n_replicates, n_models = scores.shape
+    mean_win_prob = np.empty((n_replicates, n_models))
+    # one sample at a time, so that memory grows with the square of the number of models only
+    for replicate, sample in enumerate(scores):
+        probabilities = 1 / (1 + 10 ** ((sample[None, :] - sample[:, None]) / scale))
+        # the diagonal holds the probability of 1/2 of each model to beat itself
+        mean_win_prob[replicate] = (probabilities.sum(axis=1) - 0.5) / max(n_models - 1, 1)
+    return pl.DataFrame(
+        {
+            "replicate": np.repeat(np.arange(n_replicates), n_models),
+            "model_name": replicates.columns * n_replicates,
+            "mean_win_prob": mean_win_prob.ravel(),
+        }
+    )
+
+
+def summarize_statistics(replicates: pl.DataFrame) -> pl.DataFrame:
+    """
+    95% confidence intervals of statistics from their bootstrap samples.
+
+    Args:
+        replicates (pl.DataFrame): Statistics of each sample, with "replicate" and "model_name" columns.
+
+    Returns:
+        pl.DataFrame: One row per model with columns "{statistic}_p2.5" and "{statistic}_p97.5".
+    """
+    statistics = [column for column in replicates.columns if column not in ("replicate", "model_name")]
+    return (
+        replicates.group_by("model_name")
+        .agg(
+            *[
+                pl.col(statistic).quantile(quantile, interpolation="nearest").alias(f"{statistic}_{name}")
+                for statistic in statistics
+                for quantile, name in ((0.025, "p2.5"), (0.975, "p97.5"))
+            ]
+        )
+        .sort("model_name")
+    )
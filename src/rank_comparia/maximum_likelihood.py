@@ -5,14 +5,295 @@
 """Alternative maximum likelihood ranker."""
 
 import math
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Literal
 
 import numpy as np
 import polars as pl
-from sklearn.linear_model import LogisticRegression
 
 from rank_comparia.ranker import Match, Ranker
 
 
+if TYPE_CHECKING:
+    from rank_comparia.bootstrap import BootstrapQueue
+    from rank_comparia.checkpoint import BootstrapCheckpoint
+
+
+def fit_bradley_terry(
+    wins: np.ndarray, init: np.ndarray | None = None, max_iter: int = 300, tol: float = 1e-6
+) -> np.ndarray:
+    """
+    Fit Bradley-Terry coefficients from a matrix of pairwise points.
+
+    This solves the same problem as `MaximumLikelihoodRanker.compute_scores` (LBFGS on the
+    weighted logistic loss) but works directly on aggregated counts, which allows warm starts.
+
+    Args:
+        wins (np.ndarray): Square matrix, `wins[i, j]` is the number of points of model i against
+            model j (2 for a win, 1 for a draw).
+        init (np.ndarray | None): Optional starting coefficients (warm start).
+        max_iter (int): Max number of iterations for the LBFGS optimizer.
+        tol (float): Tolerance on the projected gradient.
+
+    Returns:
+        np.ndarray: Coefficients centered on 0, such that P(i beats j) = 1 / (1 + 10 ** (coef[j] - coef[i])).
+    """
+    from scipy.optimize import minimize
+
+    n_models = wins.shape[0]
+    total = wins.sum()
+    if n_models == 0 or total == 0:
+        return np.zeros(n_models)
+    base_log = math.log(MaximumLikelihoodRanker.BASE)
+
+    def loss_and_grad(coef: np.ndarray) -> tuple[float, np.ndarray]:
+        diff = base_log * (coef[:, None] - coef[None, :])
+        # weighted log-loss of observed points: -log(sigmoid(diff)) = logaddexp(0, -diff)
+        loss = (wins * np.logaddexp(0, -diff)).sum() / total
+        weighted = wins * np.exp(-np.logaddexp(0, diff)) * base_log
+        grad = (weighted.sum(axis=0) - weighted.sum(axis=1)) / total
+        return loss, grad
+
+    x0 = np.zeros(n_models) if init is None else np.asarray(init, dtype=float)
+    result = minimize(
+        loss_and_grad,
+        x0,
+        jac=True,
+        method="L-BFGS-B",
+        options={"maxiter": max_iter, "gtol": tol, "ftol": 64 * np.finfo(float).eps},
+    )
+    return result.x - result.x.mean()
+
+
+def aggregate_pairs(
+    model_a: np.ndarray, model_b: np.ndarray, score: np.ndarray, n_models: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Aggregate encoded matches into pairwise points, one row per observed pair of models.
+
+    Args:
+        model_a (np.ndarray): Index of model a in each match.
+        model_b (np.ndarray): Index of model b in each match.
+        score (np.ndarray): Score value of each match (2 if a wins, 1 for a draw, 0 if b wins).
+        n_models (int): Number of models.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Pairs of model indices (i < j) with shape (n_pairs, 2), and
+            points of i and j against each other with the same shape.
+    """
+    model_a, model_b, score = (np.asarray(array, dtype=np.int64) for array in (model_a, model_b, score))
+    keep = model_a != model_b
+    model_a, model_b, score = model_a[keep], model_b[keep], score[keep]
+    # order each pair so that i < j, swapping points accordingly
+    swap = model_a > model_b
+    first = np.where(swap, model_b, model_a)
+    second = np.where(swap, model_a, model_b)
+    points_first = np.where(swap, 2 - score, score)
+
+    keys, inverse = np.unique(first * n_models + second, return_inverse=True)
+    n_matches = np.bincount(inverse, minlength=len(keys))
+    points = np.bincount(inverse, weights=points_first, minlength=len(keys))
+    pairs = np.column_stack([keys // n_models, keys % n_models])
+    return pairs, np.column_stack([points, 2 * n_matches - points])
+
+
+def fit_bradley_terry_sparse(
+    pairs: np.ndarray,
+    points: np.ndarray,
+    n_models: int,
+    init: np.ndarray | None = None,
+    max_iter: int = 100,
+    tol: float = 1e-6,
+) -> np.ndarray:
+    """
+    Fit Bradley-Terry coefficients from observed pairs with a Newton method.
+
+    The Hessian of the log-loss is a weighted Laplacian of the comparison graph, stored as a sparse
+    matrix and solved with conjugate gradients, so that memory grows with the number of observed
+    pairs instead of the square of the number of models.
+
+    Args:
+        pairs (np.ndarray): Pairs of model indices with shape (n_pairs, 2).
+        points (np.ndarray): Points of each model of the pair against the other, same shape as `pairs`.
+        n_models (int): Number of models.
+        init (np.ndarray | None): Optional starting coefficients (warm start).
+        max_iter (int): Max number of Newton iterations.
+        tol (float): Tolerance on the gradient.
+
+    Returns:
+        np.ndarray: Coefficients centered on 0, such that P(i beats j) = 1 / (1 + 10 ** (coef[j] - coef[i])).
+    """
+    from scipy import sparse
+    from scipy.sparse.linalg import cg
+
+    coef = np.zeros(n_models) if init is None else np.asarray(init, dtype=float).copy()
+    total = points.sum()
+    if n_models == 0 or total == 0:
+        return coef - coef.mean() if n_models else coef
+    base_log = math.log(MaximumLikelihoodRanker.BASE)
+    first, second = pairs[:, 0], pairs[:, 1]
+    points_first, points_second = points[:, 0], points[:, 1]
+    n_points = points_first + points_second
+
+    def loss(coef: np.ndarray) -> float:
+        diff = base_log * (coef[first] - coef[second])
+        return (points_first * np.logaddexp(0, -diff) + points_second * np.logaddexp(0, diff)).sum() / total
+
+    current_loss = loss(coef)
+    for _ in range(max_iter):
+        diff = base_log * (coef[first] - coef[second])
+        proba = np.exp(-np.logaddexp(0, -diff))
+        residual = base_log * (n_points * proba - points_first) / total
+        grad = np.bincount(first, weights=residual, minlength=n_models) - np.bincount(
+            second, weights=residual, minlength=n_models
+        )
+        if np.abs(grad).max() <= tol:
+            break
+
+        weights = base_log**2 * n_points * proba * (1 - proba) / total
+        off_diagonal = sparse.coo_matrix((-weights, (first, second)), shape=(n_models, n_models))
+        degree = np.bincount(first, weights=weights, minlength=n_models) + np.bincount(
+            second, weights=weights, minlength=n_models
+        )
+        hessian = (off_diagonal + off_diagonal.T + sparse.diags(degree)).tocsr()
+        # the Laplacian is singular (scores are defined up to a constant) but the gradient is
+        # orthogonal to its null space, so conjugate gradients started from 0 stay well defined
+        step, _ = cg(hessian, -grad, rtol=1e-10, maxiter=10 * n_models)
+
+        # backtracking line search
+        length = 1.0
+        while length > 1e-10:
+            candidate = coef + length * step
+            candidate_loss = loss(candidate)
+            if candidate_loss <= current_loss + 1e-4 * length * grad @ step:
+                break
+            length /= 2
+        else:
+            break
+        coef, current_loss = candidate, candidate_loss
+    return coef - coef.mean()
+
+
+def prune_pairs(pairs: np.ndarray, points: np.ndarray, min_matches: int = 1) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Drop pairs of models compared in fewer than `min_matches` matches.
+
+    Args:
+        pairs (np.ndarray): Pairs of model indices with shape (n_pairs, 2).
+        points (np.ndarray): Points of each model of the pair against the other, same shape as `pairs`.
+        min_matches (int): Minimum number of matches between two models to keep their pair.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Kept pairs and points.
+    """
+    # 2 points are distributed per match
+    keep = points.sum(axis=1) >= 2 * min_matches
+    return pairs[keep], points[keep]
+
+
+def _relabel_by_size(labels: np.ndarray) -> np.ndarray:
+    """
+    Renumber component labels by decreasing component size, ties broken by smallest member.
+    """
+    sizes = np.bincount(labels)
+    first_member = np.full(len(sizes), len(labels))
+    np.minimum.at(first_member, labels, np.arange(len(labels)))
+    order = np.lexsort((first_member, -sizes))
+    new_labels = np.empty_like(order)
+    new_labels[order] = np.arange(len(order))
+    return new_labels[labels]
+
+
+def comparison_components(pairs: np.ndarray, points: np.ndarray, n_models: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Compute the connected structure of the comparison graph.
+
+    Weakly connected components group models that were compared, directly or not; scores of
+    different components cannot be compared. Strongly connected components follow the "scored
+    points against" relation: the maximum likelihood estimate is finite only inside a strongly
+    connected component, a component that only wins (or only loses) against the others has an
+    infinite score gap with them.
+
+    Args:
+        pairs (np.ndarray): Pairs of model indices with shape (n_pairs, 2).
+        points (np.ndarray): Points of each model of the pair against the other, same shape as `pairs`.
+        n_models (int): Number of models.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Weak and strong component label of each model, numbered by
+            decreasing component size.
+    """
+    from scipy import sparse
+    from scipy.sparse.csgraph import connected_components
+
+    if n_models == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    first, second = pairs[:, 0], pairs[:, 1]
+    # edge i -> j when i scored points against j
+    sources = np.concatenate([first[points[:, 0] > 0], second[points[:, 1] > 0]])
+    targets = np.concatenate([second[points[:, 0] > 0], first[points[:, 1] > 0]])
+    graph = sparse.coo_matrix((np.ones(len(sources)), (sources, targets)), shape=(n_models, n_models)).tocsr()
+    _, weak = connected_components(graph, directed=True, connection="weak")
+    _, strong = connected_components(graph, directed=True, connection="strong")
+    return _relabel_by_size(weak), _relabel_by_size(strong)
+
+
+def fit_bradley_terry_components(
+    pairs: np.ndarray,
+    points: np.ndarray,
+    labels: np.ndarray,
+    solver: Literal["lbfgs", "sparse"] = "sparse",
+    max_iter: int = 300,
+    max_newton_iter: int = 100,
+    max_workers: int | None = None,
+) -> np.ndarray:
+    """
+    Fit Bradley-Terry coefficients independently on each component, in parallel.
+
+    Args:
+        pairs (np.ndarray): Pairs of model indices with shape (n_pairs, 2).
+        points (np.ndarray): Points of each model of the pair against the other, same shape as `pairs`.
+        labels (np.ndarray): Component label of each model.
+        solver (Literal["lbfgs", "sparse"]): "lbfgs" fits a dense matrix of counts per component,
+            "sparse" runs the sparse Newton method.
+        max_iter (int): Max number of iterations of the LBFGS optimizer, used by the "lbfgs" solver.
+        max_newton_iter (int): Max number of Newton iterations, used by the "sparse" solver.
+        max_workers (int | None): Number of threads, defaults to the executor default.
+
+    Returns:
+        np.ndarray: Coefficients, centered on 0 inside each component.
+    """
+    coef = np.zeros(len(labels))
+    # pairs across components carry no information once components are fitted separately
+    same_component = labels[pairs[:, 0]] == labels[pairs[:, 1]]
+    pairs, points = pairs[same_component], points[same_component]
+    pair_labels = labels[pairs[:, 0]]
+    order = np.argsort(pair_labels, kind="stable")
+    bounds = np.searchsorted(pair_labels[order], np.arange(labels.max(initial=-1) + 2))
+
+    def fit(component: int) -> None:
+        members = np.flatnonzero(labels == component)
+        if len(members) < 2:
+            return
+        local = np.empty(len(labels), dtype=np.int64)
+        local[members] = np.arange(len(members))
+        selected = order[bounds[component] : bounds[component + 1]]
+        component_pairs, component_points = local[pairs[selected]], points[selected]
+        if solver == "sparse":
+            coef[members] = fit_bradley_terry_sparse(
+                component_pairs, component_points, len(members), max_iter=max_newton_iter
+            )
+        else:
+            wins = np.zeros((len(members), len(members)))
+            wins[component_pairs[:, 0], component_pairs[:, 1]] = component_points[:, 0]
+            wins[component_pairs[:, 1], component_pairs[:, 0]] = component_points[:, 1]
+            coef[members] = fit_bradley_terry(wins, max_iter=max_iter)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        list(executor.map(fit, range(labels.max(initial=-1) + 1)))
+    return coef
+
+
 class MaximumLikelihoodRanker(Ranker):
     """
     Maximum Likelihood Ranker.
@@ -21,7 +302,15 @@ class MaximumLikelihoodRanker(Ranker):
     BASE = 10
 
     def __init__(
-        self, scale: int = 400, default_score: float = 1000.0, bootstrap_samples: int = 100, max_iter: int = 300
+        self,
+        scale: int = 400,
+        default_score: float = 1000.0,
+        bootstrap_samples: int = 100,
+        max_iter: int = 300,
+        solver: Literal["lbfgs", "sparse"] = "lbfgs",
+        max_newton_iter: int = 100,
+        split_components: bool = False,
+        min_pair_matches: int = 1,
     ):
         """
         Constructor.
@@ -30,11 +319,24 @@ class MaximumLikelihoodRanker(Ranker):
             scale (int): Scale parameter.
             default_score (float): Base score used.
             bootstrap_samples (int): Number of bootstrap samples.
-            max_iter (int): Max number of iterations for the LBFGS optimizer.
+            max_iter (int): Max number of iterations of the LBFGS optimizer, used by the "lbfgs" solver.
+            solver (Literal["lbfgs", "sparse"]): "lbfgs" fits a logistic regression on a dense design
+                matrix, "sparse" runs a Newton method on the sparse comparison graph, which scales to
+                thousands of models.
+            max_newton_iter (int): Max number of Newton iterations, used by the "sparse" solver.
+            split_components (bool): Whether to fit each strongly connected component of the
+                comparison graph independently, see `comparison_components`.
+            min_pair_matches (int): Pairs of models compared less often are dropped before the
+                component analysis, only used when `split_components` is True.
         """
         super().__init__(scale, default_score, bootstrap_samples)
         self.max_iter = max_iter
+        self.solver = solver
+        self.max_newton_iter = max_newton_iter
+        self.split_components = split_components
+        self.min_pair_matches = min_pair_matches
         self.scores = {}
+        self.components: dict[str, tuple[int, int]] = {}
 
     @staticmethod
     def aggregate_matches(matches: list[Match]) -> pl.DataFrame:
@@ -82,6 +384,10 @@ class MaximumLikelihoodRanker(Ranker):
         Returns:
             dict[str, float]: Dictionary mapping model names to float scores.
         """
+        if self.split_components:
+            return self._compute_component_scores(matches)
+        if self.solver == "sparse":
+            return self._compute_sparse_scores(matches)
         all_counts = self.aggregate_matches(matches=matches)
         # models list
         models = all_counts["model_a_name"].unique().to_list()
@@ -108,6 +414,8 @@ class MaximumLikelihoodRanker(Ranker):
             sample_weights.append(b_wins * 2 + draws)
 
         # fit logistic regression
+        from sklearn.linear_model import LogisticRegression
+
         lr = LogisticRegression(fit_intercept=False, penalty=None, tol=1e-6, max_iter=self.max_iter)  # type: ignore
         lr.fit(X, Y, sample_weight=sample_weights)
         scores = self.scale * lr.coef_[0] + self.default_score
@@ -115,6 +423,138 @@ class MaximumLikelihoodRanker(Ranker):
         self.scores = {m: s for m, s in zip(models, scores)}
         return self.get_scores()
 
+    def compute_encoded_scores(
+        self, models: list[str], model_a: np.ndarray, model_b: np.ndarray, score: np.ndarray
+    ) -> dict[str, float]:
+        """
+        Compute scores from encoded matches. The "lbfgs" solver fits aggregated points with
+        `fit_bradley_terry`, which solves the same problem as `compute_scores`.
+
+        Args:
+            models (list[str]): Model names.
+            model_a (np.ndarray): Index in `models` of model a of each match.
+            model_b (np.ndarray): Index in `models` of model b of each match.
+            score (np.ndarray): Score of each match (0 -> b wins, 2 -> a wins, 1 -> draw).
+
+        Returns:
+            dict[str, float]: Dictionary mapping model names to float scores, for models playing
+                at least one match against another model.
+        """
+        if self.split_components:
+            return super().compute_encoded_scores(models, model_a, model_b, score)
+        keep = model_a != model_b
+        # only models of the sample are fitted
+        present, codes = np.unique(np.concatenate([model_a[keep], model_b[keep]]), return_inverse=True)
+        n_matches = int(keep.sum())
+        pairs, points = aggregate_pairs(codes[:n_matches], codes[n_matches:], score[keep], len(present))
+        if self.solver == "sparse":
+            coef = fit_bradley_terry_sparse(pairs, points, len(present), max_iter=self.max_newton_iter)
+        else:
+            wins = np.zeros((len(present), len(present)))
+            wins[pairs[:, 0], pairs[:, 1]] = points[:, 0]
+            wins[pairs[:, 1], pairs[:, 0]] = points[:, 1]
+            coef = fit_bradley_terry(wins, max_iter=self.max_iter)
+
+        self.scores = {models[index]: self.scale * value + self.default_score for index, value in zip(present, coef)}
+        return self.get_scores()
+
+    @staticmethod
+    def encode_pairs(matches: list[Match]) -> tuple[list[str], np.ndarray, np.ndarray]:
+        """
+        Encode a list of matches as pairwise points, see `aggregate_pairs`.
+
+        Args:
+            matches (list[Match]): List of matches.
+
+        Returns:
+            tuple[list[str], np.ndarray, np.ndarray]: Model names, pairs of model indices and points.
+        """
+        matches = [match for match in matches if match.model_a != match.model_b]
+        if not matches:
+            return [], np.zeros((0, 2), dtype=np.int64), np.zeros((0, 2))
+        model_a, model_b, score = zip(*((match.model_a, match.model_b, match.score.value) for match in matches))
+        models, codes = np.unique(np.array(model_a + model_b), return_inverse=True)
+        pairs, points = aggregate_pairs(codes[: len(matches)], codes[len(matches) :], np.array(score), len(models))
+        return models.tolist(), pairs, points
+
+    def _compute_sparse_scores(self, matches: list[Match]) -> dict[str, float]:
+        """
+        Compute scores from a list of matches without building a design matrix.
+
+        Args:
+            matches (list[Match]): List of matches.
+
+        Returns:
+            dict[str, float]: Dictionary mapping model names to float scores.
+        """
+        models, pairs, points = self.encode_pairs(matches)
+        coef = fit_bradley_terry_sparse(pairs, points, len(models), max_iter=self.max_newton_iter)
+
+        self.scores = {model: self.scale * value + self.default_score for model, value in zip(models, coef)}
+        return self.get_scores()
+
+    def _compute_component_scores(self, matches: list[Match]) -> dict[str, float]:
+        """
+        Compute scores independently on each strongly connected component of the comparison graph.
+
+        Args:
+            matches (list[Match]): List of matches.
+
+        Returns:
+            dict[str, float]: Dictionary mapping model names to float scores.
+        """
+        models, pairs, points = self.encode_pairs(matches)
+        pairs, points = prune_pairs(pairs, points, self.min_pair_matches)
+        weak, strong = comparison_components(pairs, points, len(models))
+        coef = fit_bradley_terry_components(
+            pairs, points, strong, solver=self.solver, max_iter=self.max_iter, max_newton_iter=self.max_newton_iter
+        )
+
+        self.components = {model: (int(w), int(c)) for model, w, c in zip(models, weak, strong)}
+        self.scores = {model: self.scale * value + self.default_score for model, value in zip(models, coef)}
+        return self.get_scores()
+
+    def compute_bootstrap_scores(
+        self,
+        matches: list[Match],
+        seed: int | None = None,
+        queue: "BootstrapQueue | None" = None,
+        checkpoint: "BootstrapCheckpoint | None" = None,
+    ) -> pl.DataFrame:
+        """
+        Compute bootstrap scores from a list of matches, with the component membership of each
+        model on the full sample when `split_components` is True.
+
+        Args:
+            matches (list[Match]): List of matches.
+            seed (int | None): Seed of the bootstrap samples, see `Ranker.bootstrap_replicate`.
+            queue (BootstrapQueue | None): Optional work queue distributing replicates.
+            checkpoint (BootstrapCheckpoint | None): Optional checkpoint of completed replicates.
+
+        Returns:
+            pl.DataFrame: DataFrame containing bootstrap scores and confidence intervals.
+        """
+        if not self.split_components:
+            return super().compute_bootstrap_scores(matches, seed=seed, queue=queue, checkpoint=checkpoint)
+        self._compute_component_scores(matches)
+        components = self.components
+        n_components = len({weak for weak, _ in components.values()})
+        n_strong = len({strong for _, strong in components.values()})
+        print(f"Comparison graph has {n_components} connected and {n_strong} strongly connected components.")
+        scores = super().compute_bootstrap_scores(matches, seed=seed, queue=queue, checkpoint=checkpoint)
+        self.components = components
+        return scores.join(
+            pl.DataFrame(
+                {
+                    "model_name": list(components),
+                    "component": [weak for weak, _ in components.values()],
+                    "strong_component": [strong for _, strong in components.values()],
+                }
+            ),
+            on="model_name",
+            how="left",
+        ).sort("rank")
+
     def get_scores(self) -> dict[str, float]:
         """
         Return computed scores.
@@ -0,0 +1,129 @@
+# SPDX-FileCopyrightText: 2025 Pôle d'Expertise de la Régulation Numérique <contact@peren.gouv.fr>
+#
+# SPDX-License-Identifier: MIT
+
+"""Registry of model metadata (display name, organization, license), loaded once and shared."""
+
+import threading
+from dataclasses import dataclass, field
+from importlib.resources import files
+from pathlib import Path
+
+import polars as pl
+
+
+DATA_DIR = Path(str(files("rank_comparia") / "data"))  # data shipped with the package
+MODELS_DATA = DATA_DIR / "models_data.json"
+MODELS_DATA_AUGMENTED = DATA_DIR / "models_data_augmented.json"
+SCHEMA = {"name": pl.String, "model_name": pl.String, "organization": pl.String, "license": pl.String}
+
+
+def read_models_data(path: Path) -> pl.DataFrame:
+    """
+    Read and validate a model metadata file.
+
+    Args:
+        path (Path): JSON file with one record per model.
+
+    Returns:
+        pl.DataFrame: Metadata with the columns of `SCHEMA`.
+    """
+    data = pl.read_json(path)
+    missing = set(SCHEMA) - set(data.columns)
+    if missing:
+        raise ValueError(f"Model metadata {path} is missing columns {sorted(missing)}.")
+    data = data.select([pl.col(column).cast(dtype) for column, dtype in SCHEMA.items()])
+    if data["model_name"].null_count():
+        raise ValueError(f"Model metadata {path} has records without model_name.")
+    duplicated = data.filter(pl.col("model_name").is_duplicated())["model_name"].unique().sort().to_list()
+    if duplicated:
+        raise ValueError(f"Model metadata {path} has duplicated models {duplicated}.")
+    return data
+
+
+@dataclass
+class ModelRegistry:
+    """
+    Model metadata indexed by model name.
+
+    The file is read on first access and read again only when its modification time changes.
+    """
+
+    path: Path  # JSON metadata file
+    _frame: pl.DataFrame = field(init=False, repr=False, default_factory=pl.DataFrame)
+    _index: dict[str, dict] = field(init=False, repr=False, default_factory=dict)
+    _mtime: int | None = field(init=False, repr=False, default=None)
+    _lock: threading.Lock = field(init=False, repr=False, default_factory=threading.Lock)
+
+    def _refresh(self) -> None:
+        mtime = self.path.stat().st_mtime_ns
+        if mtime == self._mtime:
+            return
+        with self._lock:
+            if mtime == self._mtime:
+                return
+            frame = read_models_data(self.path)
+            self._index = {row["model_name"]: row for row in frame.to_dicts()}
+            self._frame = frame
+            self._mtime = mtime
+
+    @property
+    def frame(self) -> pl.DataFrame:
+        """
+        Metadata of all models, to join on "model_name".
+
+        Returns:
+            pl.DataFrame: Metadata with the columns of `SCHEMA`.
+        """
+        self._refresh()
+        return self._frame
+
+    def get(self, model_name: str) -> dict | None:
+        """
+        Metadata of a model.
+
+        Args:
+            model_name (str): Model name.
+
+        Returns:
+            dict | None: Metadata record, None for unknown models.
+        """
+        self._refresh()
+        return self._index.get(model_name)
+
+    def __contains__(self, model_name: str) -> bool:
+        return self.get(model_name) is not None
+
+    def join(self, data: pl.DataFrame, how: str = "inner") -> pl.DataFrame:
+        """
+        Add metadata columns to data with a "model_name" column.
+
+        Args:
+            data (pl.DataFrame): Data by model.
+            how (str): Join strategy, "inner" drops models without metadata.
+
+        Returns:
+            pl.DataFrame: Data with metadata columns.
+        """
+        return data.join(self.frame, on="model_name", how=how)  # type: ignore
+
+
+_registries: dict[Path, ModelRegistry] = {}
+_registries_lock = threading.Lock()
+
+
+def model_registry(path: Path | None = None) -> ModelRegistry:
+    """
+    Registry shared by all callers reading the same file.
+
+    Args:
+        path (Path | None): JSON metadata file, `MODELS_DATA` if None.
+
+    Returns:
+        ModelRegistry: Registry.
+    """
+    path = (path or MODELS_DATA).resolve()
+    with _registries_lock:
+        if path not in _registries:
+            _registries[path] = ModelRegistry(path)
+        return _registries[path]
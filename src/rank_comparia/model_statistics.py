@@ -0,0 +1,91 @@
+# SPDX-FileCopyrightText: 2025 Pôle d'Expertise de la Régulation Numérique <contact@peren.gouv.fr>
+#
+# SPDX-License-Identifier: MIT
+
+"""Per model statistics computed in a single pass over processed matches."""
+
+import polars as pl
+
+from rank_comparia.preferences import NEGATIVE_REACTIONS, POSITIVE_REACTIONS
+from rank_comparia.utils import collect
+
+
+PREFERENCES = POSITIVE_REACTIONS + NEGATIVE_REACTIONS
+
+
+def _model_side(matches: pl.LazyFrame, side: str, keys: list[str]) -> pl.LazyFrame:
+    """
+    Select the columns describing one side of each match, with side-independent names.
+
+    Args:
+        matches (pl.LazyFrame): Processed matches.
+        side (str): "a" or "b".
+        keys (list[str]): Extra grouping columns to keep.
+
+    Returns:
+        pl.LazyFrame: One row per match for the given side.
+    """
+    columns = matches.collect_schema().names()
+    return matches.select(
+        *keys,
+        model_name=pl.col(f"model_{side}"),
+        n_param=pl.col(f"model_{side}_active_params"),
+        total_output_tokens=pl.col(f"total_conv_{side}_output_tokens"),
+        conso_all_conv=pl.col(f"total_conv_{side}_kwh"),
+        **{
+            reaction: pl.col(f"{reaction}_{side}") if f"{reaction}_{side}" in columns else pl.lit(0, dtype=pl.UInt32)
+            for reaction in PREFERENCES
+        },
+    )
+
+
+def get_model_statistics(
+    matches: pl.DataFrame | pl.LazyFrame,
+    by_category: bool = False,
+    streaming: bool = False,
+    memory_budget: int | None = None,
+) -> pl.DataFrame:
+    """
+    Compute all per model statistics in a single aggregation: number of matches, output tokens,
+    energy consumption, active parameters, mean consumption per match and per token, and
+    preference counters.
+
+    Args:
+        matches (pl.DataFrame | pl.LazyFrame): Processed matches.
+        by_category (bool): Whether to also group by conversation category.
+        streaming (bool): Whether to use the streaming engine.
+        memory_budget (int | None): Approximate memory budget of the streaming engine, see `utils.collect`.
+
+    Returns:
+        pl.DataFrame: Statistics by model (and category).
+    """
+    matches = matches.lazy()
+    keys = []
+    if by_category:
+        matches = matches.explode("categories").rename({"categories": "category"})
+        keys = ["category"]
+
+    sides = pl.concat([_model_side(matches, "a", keys), _model_side(matches, "b", keys)])
+    if by_category:
+        sides = sides.filter(pl.col("category").is_not_null())
+
+    total_prefs = pl.sum_horizontal(*PREFERENCES)
+    statistics = (
+        sides.filter(pl.col("model_name").is_not_null())
+        .group_by(*keys, "model_name")
+        .agg(
+            pl.len().alias("n_match"),
+            pl.col("n_param").drop_nulls().first(),
+            pl.sum("total_output_tokens"),
+            pl.sum("conso_all_conv"),
+            *[pl.sum(reaction) for reaction in PREFERENCES],
+        )
+        .with_columns(
+            mean_conso_per_match=pl.col("conso_all_conv") / pl.col("n_match"),
+            mean_conso_per_token=(pl.col("conso_all_conv") / pl.col("total_output_tokens")).fill_nan(None),
+            total_prefs=total_prefs,
+            positive_prefs_ratio=(pl.sum_horizontal(*POSITIVE_REACTIONS) / total_prefs).fill_nan(None),
+        )
+        .sort(*keys, "model_name")
+    )
+    return collect(statistics, streaming=streaming, memory_budget=memory_budget)
@@ -4,32 +4,52 @@
 
 """Ranking pipeline."""
 
-from dataclasses import dataclass, field
-from datetime import datetime
+import hashlib
+import json
+from dataclasses import InitVar, dataclass, field
+from datetime import date, datetime
 from pathlib import Path
 from typing import Literal
 
-import json
+import numpy as np
 import polars as pl
 
-from rank_comparia.elo import ELORanker
-from rank_comparia.frugality import calculate_frugality_score, get_n_match, get_normalized_log_cost
+from rank_comparia.bootstrap import BootstrapQueue
+from rank_comparia.checkpoint import BootstrapCheckpoint
+from rank_comparia.comparison import bootstrap_rankers
+from rank_comparia.cube import build_cube, expand_cube, scan_cube, write_cube
+from rank_comparia.elo import ELORanker, OrderedELORanker, rating_trajectories
+from rank_comparia.evaluation import evaluate_rankers
+from rank_comparia.frugality import get_normalized_log_cost
+from rank_comparia.history import ALL, RunHistory, new_run_id
+from rank_comparia.leaderboard import bootstrap_statistics, mean_win_probabilities, summarize_statistics
 from rank_comparia.maximum_likelihood import MaximumLikelihoodRanker
-from rank_comparia.plot import (
-    draw_frugality_chart,
-    format_matches_for_heatmap,
-    format_matches_for_winrate_count,
-    format_scores_for_mean_win_proba,
-    plot_elo_against_frugal_elo,
-    plot_match_counts,
-    plot_score_mean_win_proba,
-    plot_scores_with_confidence,
-    plot_winrate_heatmap,
-    plot_winrate_count,
+from rank_comparia.metadata import model_registry
+from rank_comparia.model_statistics import PREFERENCES, get_model_statistics
+from rank_comparia.preferences import (
+    NEGATIVE_REACTIONS,
+    POSITIVE_REACTIONS,
+    combine_preferences,
+    get_reactions_preferences,
+    get_votes_preferences,
+    votes_preference_counts,
 )
-from rank_comparia.preferences import get_preferences_data
+from rank_comparia.rank_centrality import RankCentralityRanker
 from rank_comparia.ranker import Match, MatchScore, Ranker
-from rank_comparia.utils import categories, load_comparia
+from rank_comparia.reactions import score_reactions
+from rank_comparia.scheduler import PairScheduler
+from rank_comparia.temporal import build_count_cube, period_windows, rank_windows
+from rank_comparia.utils import (
+    build_category_index,
+    categories,
+    category_mask,
+    collect,
+    decode_model_names,
+    encode_model_names,
+    has_categories,
+    load_comparia,
+    scan_comparia,
+)
 
 
 @dataclass
@@ -38,26 +58,215 @@ class RankingPipeline:
     Ranking pipeline class.
     """
 
-    method: Literal["elo_ordered", "elo_random", "ml"]  # score computation method used
+    method: Literal["elo_ordered", "elo_random", "ml", "rank_centrality"]  # score computation method used
     include_votes: bool  # whether to include votes dataset in raw match data
     include_reactions: bool  # whether to include reactions dataset in raw match data
     bootstrap_samples: int  # number of bootstrap samples
     mean_how: Literal["match", "token"]  # Precise how to mean
     token: str | None = None  # token to download datasets from HuggingFace
     export_path: Path | None = None  # path to export graphs, if None does not export
+    solver: Literal["lbfgs", "sparse"] = "lbfgs"  # optimizer used by the "ml" method
+    split_components: bool = False  # whether the "ml" method fits each component of the comparison graph separately
+    data_dir: Path | None = None  # local Parquet copy of the datasets to scan, downloaded from HuggingFace if None
+    raw_data: dict[str, pl.DataFrame] | None = field(default=None, repr=False)  # preloaded raw data by repository
+    raw_preferences: dict[str, pl.DataFrame] = field(
+        default_factory=dict, repr=False
+    )  # preferences by model of each raw repository, computed at ingestion
+    streaming: bool = False  # whether aggregations run on polars' streaming engine
+    memory_budget: int | None = None  # approximate memory budget in bytes of the streaming engine
+    seed: int | None = None  # seed of the bootstrap samples, unseeded if None
+    bootstrap_queue: BootstrapQueue | None = None  # work queue distributing bootstrap samples, local if None
+    history: RunHistory | None = None  # store keeping the leaderboards of all runs, not kept if None
+    models_data: Path | None = None  # model metadata file used in charts, `metadata.MODELS_DATA` if None
+    checkpoint_dir: Path | None = None  # bootstrap checkpoints, resumed by runs with the same configuration
+    processed_matches: InitVar[pl.DataFrame | None] = None  # already processed matches, loaded if None
     ranker: Ranker = field(init=False)  # ranker
-
-    def __post_init__(self):
+    run_id: str = field(init=False, default_factory=new_run_id)  # identifier in `history` of the last run
+    matches: pl.DataFrame = field(init=False, repr=False)  # processed matches
+    matches_digest: str = field(init=False, repr=False)  # hash of the processed matches, keying checkpoints
+    ingested: bool = field(init=False, repr=False, default=False)  # whether matches were processed from raw data
+    category_index: dict[str, np.ndarray] = field(init=False, repr=False)  # row indices of matches by category
+    statistics: dict[bool, pl.DataFrame] = field(init=False, repr=False, default_factory=dict)  # per model statistics
+    statistics_replicates: pl.DataFrame = field(
+        init=False, repr=False, default_factory=pl.DataFrame
+    )  # per model statistics of each bootstrap sample of the last computation
+
+    def __post_init__(self, processed_matches: pl.DataFrame | None):
         if not (self.include_votes | self.include_reactions):
             raise ValueError("At least one of votes or reactions data must be used.")
-        if self.method == "elo_random":
-            self.ranker = ELORanker(bootstrap_samples=self.bootstrap_samples)
-        elif self.method == "ml":
-            self.ranker = MaximumLikelihoodRanker(bootstrap_samples=self.bootstrap_samples)
-        else:
-            raise NotImplementedError()
+        self.ranker = self._make_ranker(self.method)
         # matches
-        self.matches = self._process_data()
+        if processed_matches is None:
+            self.matches = self._process_data()
+            self.ingested = True
+        else:
+            # matches shared between several pipelines, only keep the sources used
+            self.matches = processed_matches.filter(pl.col("source").is_in(self.sources))
+            if not isinstance(self.matches.schema["model_a"], pl.Enum):
+                self.matches = encode_model_names(self.matches)
+            if "category_mask" not in self.matches.columns:
+                self.matches = self.matches.with_columns(category_mask())
+        if self.method == "elo_ordered":
+            # match lists are built in conversation order
+            self.matches = self.matches.sort("timestamp", "conversation_pair_id")
+        self.category_index = build_category_index(self.matches["category_mask"].to_numpy())
+        # same number of matches is not enough to reuse checkpoints, the matches themselves must be the same
+        row_hashes = self.matches.select(
+            "conversation_pair_id", pl.col("model_a", "model_b").cast(pl.String), "score"
+        ).hash_rows(seed=0)
+        self.matches_digest = hashlib.sha256(row_hashes.to_numpy().tobytes()).hexdigest()[:16]
+
+    def _make_ranker(self, method: str) -> Ranker:
+        if method == "elo_random":
+            return ELORanker(bootstrap_samples=self.bootstrap_samples)
+        if method == "elo_ordered":
+            return OrderedELORanker(bootstrap_samples=self.bootstrap_samples)
+        if method == "ml":
+            return MaximumLikelihoodRanker(
+                bootstrap_samples=self.bootstrap_samples, solver=self.solver, split_components=self.split_components
+            )
+        if method == "rank_centrality":
+            return RankCentralityRanker(bootstrap_samples=self.bootstrap_samples)
+        raise NotImplementedError()
+
+    @classmethod
+    def from_cube(
+        cls,
+        cube_path: Path,
+        start: date | None = None,
+        end: date | None = None,
+        categories: str | list[str] | None = None,
+        **kwargs,
+    ) -> "RankingPipeline":
+        """
+        Build a pipeline on a slice of a materialised outcome cube instead of the raw datasets.
+
+        Args:
+            cube_path (Path): Parquet file written by `materialize_cube`.
+            start (date | None): First day of matches, from the first day if None.
+            end (date | None): Exclusive last day of matches, up to the last day if None.
+            categories (str | list[str] | None): Only expand the cells of matches having any of these
+                categories, all cells if None.
+            **kwargs: Pipeline parameters.
+
+        Returns:
+            RankingPipeline: Pipeline.
+        """
+        sources = [
+            source
+            for source, used in (("votes", kwargs["include_votes"]), ("reactions", kwargs["include_reactions"]))
+            if used
+        ]
+        matches = expand_cube(scan_cube(cube_path, start=start, end=end, sources=sources, categories=categories))
+        return cls(processed_matches=matches, **kwargs)
+
+    def materialize_cube(self, cube_path: Path) -> pl.DataFrame:
+        """
+        Reduce processed matches to an outcome cube and persist it, see `cube.build_cube`.
+
+        Args:
+            cube_path (Path): Parquet file path.
+
+        Returns:
+            pl.DataFrame: Cube.
+        """
+        cube = build_cube(self.matches)
+        write_cube(cube, cube_path)
+        print(f"Materialised {len(self.matches)} matches in a cube of {len(cube)} cells.")
+        return cube
+
+    @property
+    def sources(self) -> list[str]:
+        """
+        Sources of raw match data used by the pipeline.
+
+        Returns:
+            list[str]: Subset of ["votes", "reactions"].
+        """
+        return [
+            source for source, used in (("votes", self.include_votes), ("reactions", self.include_reactions)) if used
+        ]
+
+    @property
+    def model_dtype(self) -> pl.Enum:
+        """
+        Model names dictionary built at ingestion, shared by all frames derived from the matches.
+
+        Returns:
+            pl.Enum: Model names data type.
+        """
+        return self.matches.schema["model_a"]  # type: ignore
+
+    def model_statistics(self, by_category: bool = False) -> pl.DataFrame:
+        """
+        Per model statistics (matches, tokens, energy, parameters, preferences), computed once
+        and shared by all outputs.
+
+        Args:
+            by_category (bool): Whether to compute statistics by conversation category.
+
+        Returns:
+            pl.DataFrame: Statistics by model (and category), with encoded model names.
+        """
+        if by_category not in self.statistics:
+            self.statistics[by_category] = get_model_statistics(
+                self.matches, by_category=by_category, streaming=self.streaming, memory_budget=self.memory_budget
+            )
+        return self.statistics[by_category]
+
+    def preferences(self) -> pl.DataFrame:
+        """
+        Preference counters of each model over all raw votes and reactions, whichever sources are
+        scored, including rows dropped when building matches, as exported in `preferences.json`.
+
+        Preferences of the scored sources are computed at ingestion, and those of the other sources
+        are loaded once when first needed. Pipelines built from processed matches never load raw
+        data: they use the `raw_preferences` they are given, or the preferences carried by their
+        matches without any.
+
+        Returns:
+            pl.DataFrame: Preferences by model, with model names.
+        """
+        if self.ingested:
+            for repository in ("ministere-culture/comparia-votes", "ministere-culture/comparia-reactions"):
+                if repository not in self.raw_preferences and (self.raw_data is None or repository in self.raw_data):
+                    self._add_raw_preferences(repository, self._load(repository))
+        if not self.raw_preferences:
+            return decode_model_names(
+                self.model_statistics().select("model_name", *PREFERENCES, "total_prefs", "positive_prefs_ratio")
+            )
+        return combine_preferences(*self.raw_preferences.values())
+
+    def _add_raw_preferences(self, repository: str, data: pl.LazyFrame) -> None:
+        if repository in self.raw_preferences:
+            return
+        preferences = (
+            get_votes_preferences if repository == "ministere-culture/comparia-votes" else get_reactions_preferences
+        )
+        self.raw_preferences[repository] = self._collect(preferences(data))
+
+    def _add_frugality(self, scores: pl.DataFrame) -> pl.DataFrame:
+        """
+        Join frugality data to bootstrap scores, on encoded model names.
+
+        Args:
+            scores (pl.DataFrame): Bootstrap scores.
+
+        Returns:
+            pl.DataFrame: Bootstrap scores with frugality data, with decoded model names.
+        """
+        frugality = self.model_statistics().select(
+            "model_name",
+            "total_output_tokens",
+            "conso_all_conv",
+            "n_match",
+            "mean_conso_per_match",
+            "mean_conso_per_token",
+        )
+        scores = scores.with_columns(pl.col("model_name").cast(self.model_dtype)).join(
+            frugality, on="model_name", how="left"
+        )
+        return decode_model_names(scores)
 
     def run(self) -> pl.DataFrame:
         """
@@ -66,27 +275,130 @@ class RankingPipeline:
         Returns:
             pl.DataFrame: Bootstrap scores.
         """
+        self.run_id = new_run_id()
         matches = self.match_list()
-        scores = self.ranker.compute_bootstrap_scores(matches)
+        scores = self._bootstrap(matches, ALL, statistics=True)
+        scores = self._add_frugality(scores)
 
-        n_match = get_n_match(self.matches)
+        self._record(scores, ALL)
+        self._export(scores)
+        if self.method == "elo_ordered" and self.export_path is not None:
+            self.rating_trajectories().write_csv(
+                file=self.export_path / f"{self.method}_trajectories.csv", separator=";"
+            )
+        return scores
 
-        frugality = calculate_frugality_score(self.matches, n_match=n_match)
-        scores = scores.join(frugality, on="model_name")
+    def rating_trajectories(self, category: str | list[str] | None = None, every: str = "1d") -> pl.DataFrame:
+        """
+        Elo score trajectory of each model when replaying matches in conversation order, with one
+        point per period in which the model played, see `elo.rating_trajectories`.
 
-        self._export(scores)
+        Args:
+            category (str | list[str] | None): Optional category, or list of categories to keep
+                matches having any of them.
+            every (str): Period of the trajectory points, as a polars interval (e.g. "1d", "1w").
+
+        Returns:
+            pl.DataFrame: Columns "period_start", "model_name", "score" and "n_match".
+        """
+        matches = self.matches if category is None else self.matches.filter(has_categories(category))
+        ranker = self.ranker if isinstance(self.ranker, ELORanker) else None
+        return decode_model_names(rating_trajectories(matches, every=every, ranker=ranker))
+
+    def _bootstrap(self, matches: list[Match], category: str, statistics: bool = False) -> pl.DataFrame:
+        """
+        Compute bootstrap scores, checkpointed in `checkpoint_dir` under a hash of the configuration
+        and of the matches, so that a run invoked again resumes unfinished computations and reuses finished ones.
+
+        Args:
+            matches (list[Match]): List of matches.
+            category (str): Category of the matches, "all" for all matches.
+            statistics (bool): Whether to also resample the statistics of the matches into `statistics_replicates`.
+
+        Returns:
+            pl.DataFrame: Bootstrap scores.
+        """
+        if self.checkpoint_dir is None:
+            # drawn here rather than by the ranker, so that statistics are resampled along with scores
+            seed = self.seed if self.seed is not None else int(np.random.SeedSequence().entropy)  # type: ignore
+            scores = self.ranker.compute_bootstrap_scores(matches, seed=seed, queue=self.bootstrap_queue)
+        else:
+            digest = hashlib.sha256(json.dumps(self._config(), sort_keys=True).encode()).hexdigest()[:16]
+            checkpoint = BootstrapCheckpoint(self.checkpoint_dir / digest / category)
+            seed = checkpoint.resolve_seed(self.seed)
+            finished = checkpoint.load_result()
+            if finished is not None:
+                print(f"Reusing finished bootstrap scores from {checkpoint.directory}.")
+                scores, self.ranker.bootstrap_replicates = finished
+            else:
+                scores = self.ranker.compute_bootstrap_scores(
+                    matches, seed=seed, queue=self.bootstrap_queue, checkpoint=checkpoint
+                )
+                checkpoint.save_result(scores, self.ranker.bootstrap_replicates)
+
+        if not statistics:
+            return scores
+        # statistics of the same samples as scores, for confidence intervals on every leaderboard column
+        match_frame = self._match_frame(None if category == ALL else category)
+        replicates = self.ranker.bootstrap_replicates
+        samples = (
+            self.ranker.bootstrap_indices(len(match_frame), replicate, seed) for replicate in range(len(replicates))
+        )
+        self.statistics_replicates = bootstrap_statistics(match_frame, samples).join(
+            mean_win_probabilities(replicates, scale=self.ranker.scale), on=["replicate", "model_name"], how="left"
+        )
         return scores
 
+    def _config(self) -> dict:
+        return {
+            "method": self.method,
+            "sources": self.sources,
+            "bootstrap_samples": self.bootstrap_samples,
+            "mean_how": self.mean_how,
+            "solver": self.solver,
+            "split_components": self.split_components,
+            "seed": self.seed,
+            "n_matches": len(self.matches),
+            "matches_digest": self.matches_digest,
+        }
+
+    def _record(self, scores: pl.DataFrame, category: str) -> None:
+        if self.history is None:
+            return
+        self.history.append(
+            scores,
+            method=self.method,
+            category=category,
+            replicates=self.ranker.bootstrap_replicates,
+            config=self._config(),
+            run_id=self.run_id,
+        )
+
     def _export(self, scores: pl.DataFrame) -> None:
         if self.export_path is None:
             return
+        # plotting dependencies are only imported when exporting
+        from rank_comparia.plot import (
+            draw_frugality_chart,
+            format_matches_for_heatmap,
+            format_matches_for_winrate_count,
+            format_scores_for_mean_win_proba,
+            plot_elo_against_frugal_elo,
+            plot_match_counts,
+            plot_score_mean_win_proba,
+            plot_scores_with_confidence,
+            plot_winrate_count,
+            plot_winrate_heatmap,
+        )
+
         # plot
         self.export_path.mkdir(parents=True, exist_ok=True)
         scores.write_csv(file=self.export_path / f"{self.method}_scores.csv", separator=";")
         scores.write_json(file=self.export_path / f"{self.method}_scores.json")
+        self.ranker.bootstrap_replicates.write_parquet(self.export_path / f"{self.method}_replicates.parquet")
 
         plot_scores_with_confidence(scores).save(self.export_path / f"{self.method}_scores_confidence.png", ppi=300)
-        heatmap_data = format_matches_for_heatmap(self.matches)
+        heatmap_data = decode_model_names(format_matches_for_heatmap(self.matches))
         plot_match_counts(heatmap_data).save(self.export_path / f"{self.method}_count_heatmap.png", ppi=300)
         plot_winrate_heatmap(heatmap_data).save(self.export_path / f"{self.method}_winrate_heatmap.png", ppi=300)
 
@@ -97,12 +409,15 @@ class RankingPipeline:
             fp=self.export_path / f"{self.method}_scores_vs_mean_win_proba.html", format="html"
         )
 
-        draw_frugality_chart(scores, self.mean_how, log=True).save(
+        registry = model_registry(self.models_data)
+        draw_frugality_chart(scores, self.mean_how, log=True, registry=registry).save(
             fp=self.export_path / f"{self.method}_elo_score_conso.html", format="html"
         )
 
         plot_elo_against_frugal_elo(
-            frugal_log_score=get_normalized_log_cost(scores, mean=self.mean_how), bootstraped_scores=scores
+            frugal_log_score=get_normalized_log_cost(scores, mean=self.mean_how),
+            bootstraped_scores=scores,
+            registry=registry,
         ).save(fp=self.export_path / f"{self.method}_elo_frugal.html", format="html")
 
         # classic winrate
@@ -111,14 +426,15 @@ class RankingPipeline:
         plot_winrate_count(winrate_count_data).save(self.export_path / f"{self.method}_winrate_count.svg")
 
         # preferences
-        preferences_data = get_preferences_data()
-        preferences_data.write_json(file=self.export_path / f"preferences.json")
+        preferences_data = self.preferences()
+        preferences_data.write_json(file=self.export_path / "preferences.json")
 
-        # Merge score + winrate + mean win proba + preferences
+        # Merge score + winrate + mean win proba + preferences, with confidence intervals
         final_data = (
             scores.join(mean_win_proba.select("model_name", "mean_win_prob"), on="model_name", how="left")
             .join(winrate_count_data.select("model_name", "win_rate"), on="model_name", how="left")
             .join(preferences_data, on="model_name", how="left")
+            .join(summarize_statistics(self.statistics_replicates), on="model_name", how="left")
             .sort("median", descending=True)
         )
         final_path = self.export_path / f"{self.method}_final_data.json"
@@ -144,26 +460,31 @@ class RankingPipeline:
         Returns:
             pl.DataFrame: Bootstrap scores for the provided category.
         """
+        self.run_id = new_run_id()
+        return self._run_category(category)
+
+    def _run_category(self, category: str) -> pl.DataFrame:
         # filter matches
         matches = self.match_list(category=category)
 
-        scores = self.ranker.compute_bootstrap_scores(matches)
-
-        n_match = get_n_match(self.matches)
-
-        frugality = calculate_frugality_score(self.matches, n_match=n_match)
-        scores = scores.join(frugality, on="model_name")
+        scores = self._bootstrap(matches, category)
+        scores = self._add_frugality(scores)
 
+        self._record(scores, category)
         if self.export_path is not None:
+            # named by method, so that the leaderboards of several methods can share a directory
             self.export_path.mkdir(parents=True, exist_ok=True)
-            scores.write_csv(file=self.export_path / f"{category}_scores.csv", separator=";")
+            scores.write_csv(file=self.export_path / f"{self.method}_{category}_scores.csv", separator=";")
+            self.ranker.bootstrap_replicates.write_parquet(
+                self.export_path / f"{self.method}_{category}_replicates.parquet"
+            )
 
         return scores
 
     def run_all_categories(self, min_matches: int = 5000) -> dict[str, pl.DataFrame]:
         """
         Run bootstrap score computation for a all conversation topics with
-        more than `min_matches` matches.
+        more than `min_matches` matches, exported as by `run_category`.
 
         Args:
             min_matches (int): Threshold on the number of matches to compute scores.
@@ -171,43 +492,163 @@ class RankingPipeline:
         Returns:
             dict[str, pl.DataFrame]: Bootstrap scores by category.
         """
+        # all categories are recorded as a single run
+        self.run_id = new_run_id()
         results = {}
         for category in categories:
-            matches = self.match_list(category=category)
-            if len(matches) < min_matches:
-                print(f"Skipping {category} which has less than 1000 matches.")
+            if len(self.category_index[category]) < min_matches:
+                print(f"Skipping {category} which has less than {min_matches} matches.")
                 continue
-            results[category] = self.ranker.compute_bootstrap_scores(matches=matches)
+            results[category] = self._run_category(category)
+
+        return results
+
+    def run_temporal(self, every: str = "1mo", window_days: int | None = None) -> pl.DataFrame:
+        """
+        Compute Bradley-Terry scores on successive time windows.
+
+        Pairwise counts are computed once per day and prefix-summed, so that each window
+        only costs one (warm-started) fit.
+
+        Args:
+            every (str): Period between two leaderboards, as a polars interval (e.g. "1mo", "1w").
+            window_days (int | None): Length of rolling windows in days, None for leaderboards
+                computed on all matches played before the end of each period.
+
+        Returns:
+            pl.DataFrame: Scores by window with columns "window_start", "window_end", "model_name",
+                "score", "n_match" and "rank".
+        """
+        cube = build_count_cube(self.matches)
+        windows = period_windows(cube, every=every, window_days=window_days)
+        scores = rank_windows(cube, windows, scale=self.ranker.scale, default_score=self.ranker.default_score)
 
+        if self.export_path is not None:
+            self.export_path.mkdir(parents=True, exist_ok=True)
+            suffix = "cumulative" if window_days is None else f"rolling_{window_days}d"
+            scores.write_csv(file=self.export_path / f"temporal_{every}_{suffix}_scores.csv", separator=";")
+
+        return scores
+
+    def evaluate(
+        self,
+        rankers: dict[str, Ranker] | None = None,
+        every: str = "1w",
+        n_splits: int | None = None,
+        window_days: int | None = None,
+    ) -> pl.DataFrame:
+        """
+        Compare the predictions of rankers on future matches with rolling-origin splits, see
+        `evaluation.evaluate_rankers`.
+
+        Args:
+            rankers (dict[str, Ranker] | None): Rankers by name, the rankers of all methods if None.
+            every (str): Length of test periods, as a polars interval (e.g. "1w", "1mo").
+            n_splits (int | None): Only evaluate the last splits, all splits if None.
+            window_days (int | None): Length of training windows in days, None for all previous matches.
+
+        Returns:
+            pl.DataFrame: Metrics, fit time and memory of each ranker and split.
+        """
+        results = evaluate_rankers(self.matches, rankers, every=every, n_splits=n_splits, window_days=window_days)
+        if self.export_path is not None:
+            self.export_path.mkdir(parents=True, exist_ok=True)
+            results.write_csv(file=self.export_path / f"evaluation_{every}.csv", separator=";")
         return results
 
-    def match_list(self, category: str | None = None) -> list[Match]:
+    def compare_methods(
+        self, methods: list[str] | None = None, category: str | list[str] | None = None
+    ) -> pl.DataFrame:
+        """
+        Bootstrap the rankers of several methods on the same samples of the loaded matches, see
+        `comparison.bootstrap_rankers`.
+
+        Args:
+            methods (list[str] | None): Methods ("elo_random", "elo_ordered", "ml",
+                "rank_centrality"), all if None.
+            category (str | list[str] | None): Optional category, or list of categories to keep
+                matches having any of them.
+
+        Returns:
+            pl.DataFrame: Scores and ranks of each method, and paired rank differences between methods.
+        """
+        methods = methods or ["elo_random", "elo_ordered", "ml", "rank_centrality"]
+        # chronological order, replayed by "elo_ordered" and irrelevant to other methods
+        matches = self._match_frame(category).sort("timestamp", "conversation_pair_id")
+        encoded = {
+            "models": np.array(self.model_dtype.categories.to_list()),
+            "model_a": matches["model_a"].to_physical().to_numpy(),
+            "model_b": matches["model_b"].to_physical().to_numpy(),
+            "score": matches["score"].to_numpy(),
+        }
+        comparison = bootstrap_rankers(
+            {method: self._make_ranker(method) for method in methods}, encoded, seed=self.seed
+        )
+        if self.export_path is not None:
+            self.export_path.mkdir(parents=True, exist_ok=True)
+            name = "_".join(methods) if category is None else f"{'_'.join(methods)}_{category}"
+            comparison.write_csv(file=self.export_path / f"comparison_{name}.csv", separator=";")
+        return comparison
+
+    def pair_schedule(
+        self, scheduler: PairScheduler | None = None, category: str | list[str] | None = None
+    ) -> pl.DataFrame:
+        """
+        Sampling distribution over pairs of models reducing the uncertainty of the maximum
+        likelihood ranking the most, see `scheduler.PairScheduler`.
+
+        Args:
+            scheduler (PairScheduler | None): Scheduler, with default settings if None.
+            category (str | list[str] | None): Optional category, or list of categories.
+
+        Returns:
+            pl.DataFrame: Sampling probability of each pair of models.
+        """
+        ranker = MaximumLikelihoodRanker(
+            scale=self.ranker.scale, default_score=self.ranker.default_score, solver="sparse"
+        )
+        return (scheduler or PairScheduler()).schedule(ranker, self.match_list(category))
+
+    def match_list(self, category: str | list[str] | None = None) -> list[Match]:
         """
         Return all matches, or matches for the provided category, as a list of `Match` objects.
 
         Args:
-            category (str | None): Optional category.
+            category (str | list[str] | None): Optional category, or list of categories to keep
+                matches having any of them.
 
         Returns:
             list[Match]: List of matches.
         """
-        if category is None:
-            matches = self.matches
-        else:
-            if category not in categories:
-                raise ValueError(f"Category {category} does not exist in data.")
-            # filter on category name used
-            matches = self.matches.filter(pl.col("categories").list.contains(category))
+        matches = self._match_frame(category)
         # return list of Matches
         return [
             Match(d["model_a"], d["model_b"], MatchScore(d["score"]), d["conversation_pair_id"])
             for d in matches.select(["model_a", "model_b", "score", "conversation_pair_id"]).to_dicts()
         ]
 
+    def _match_frame(self, category: str | list[str] | None = None) -> pl.DataFrame:
+        """
+        Processed matches of `match_list`, in the same order.
+        """
+        if category is None:
+            return self.matches
+        if isinstance(category, str):
+            if category not in categories:
+                raise ValueError(f"Category {category} does not exist in data.")
+            # gather rows from the inverted index
+            return self.matches[self.category_index[category]]
+        # bit test on category masks
+        return self.matches.filter(has_categories(category))
+
     def _process_data(self) -> pl.DataFrame:
         """
         Process raw data.
 
+        Model names are encoded with a single dictionary (`model_dtype`) so that all
+        downstream joins and aggregations run on integers. They are decoded when exporting.
+        Categories are encoded as a bitmask (see `utils.category_bit`).
+
         Returns:
             pl.DataFrame: Formatted data.
         """
@@ -218,7 +659,32 @@ class RankingPipeline:
         if self.include_reactions:
             matches.append(self._process_reactions_data())
 
-        return pl.concat(matches, how="vertical")
+        return encode_model_names(pl.concat(matches, how="vertical")).with_columns(category_mask())
+
+    def _load(
+        self, repository: Literal["ministere-culture/comparia-reactions", "ministere-culture/comparia-votes"]
+    ) -> pl.LazyFrame:
+        """
+        Load raw data lazily, from `raw_data` when set, else scanning local Parquet files when
+        `data_dir` is set.
+
+        Args:
+            repository (Literal[
+                "ministere-culture/comparia-reactions",
+                "ministere-culture/comparia-votes",
+            ]): HF repository name.
+
+        Returns:
+            pl.LazyFrame: Raw data.
+        """
+        if self.raw_data is not None:
+            return self.raw_data[repository].lazy()
+        if self.data_dir is not None:
+            return scan_comparia(repository, self.data_dir)
+        return load_comparia(repository, token=self.token).lazy()
+
+    def _collect(self, data: pl.LazyFrame) -> pl.DataFrame:
+        return collect(data, streaming=self.streaming, memory_budget=self.memory_budget)
 
     def _process_votes_data(self) -> pl.DataFrame:
         """
@@ -227,7 +693,9 @@ class RankingPipeline:
         Returns:
             pl.DataFrame: Formatted votes data.
         """
-        data = load_comparia("ministere-culture/comparia-votes", token=self.token)
+        data = self._load("ministere-culture/comparia-votes")
+        # preferences count all raw votes, including those dropped below
+        self._add_raw_preferences("ministere-culture/comparia-votes", data)
         # drop duplicates
         data = data.unique(subset="conversation_pair_id", keep="first")
         # remove if equal is None and chosen is None
@@ -247,21 +715,26 @@ class RankingPipeline:
         # remove null scores
         data = data.filter(pl.col("score").is_not_null())
 
-        print(f"Final votes dataset contains {len(data)} conversations pairs.")
-
-        return data.select(
-            "conversation_pair_id",
-            pl.col("model_a_name").alias("model_a"),
-            pl.col("model_b_name").alias("model_b"),
-            "score",
-            "categories",
-            "model_a_active_params",
-            "model_b_active_params",
-            "total_conv_a_output_tokens",
-            "total_conv_a_kwh",
-            "total_conv_b_output_tokens",
-            "total_conv_b_kwh",
+        data = self._collect(
+            data.select(
+                "conversation_pair_id",
+                "timestamp",
+                pl.lit("votes").alias("source"),
+                pl.col("model_a_name").alias("model_a"),
+                pl.col("model_b_name").alias("model_b"),
+                "score",
+                "categories",
+                "model_a_active_params",
+                "model_b_active_params",
+                "total_conv_a_output_tokens",
+                "total_conv_a_kwh",
+                "total_conv_b_output_tokens",
+                "total_conv_b_kwh",
+                *votes_preference_counts(),
+            )
         )
+        print(f"Final votes dataset contains {len(data)} conversations pairs.")
+        return data
 
     def _process_reactions_data(self) -> pl.DataFrame:
         """
@@ -271,97 +744,11 @@ class RankingPipeline:
             pl.DataFrame: Formatted reactions data.
         """
         # load data
-        data = load_comparia("ministere-culture/comparia-reactions", token=self.token)
+        data = self._load("ministere-culture/comparia-reactions")
+        self._add_raw_preferences("ministere-culture/comparia-reactions", data)
 
         # aggregate data by conversation pair (~ session)
-        data = data.group_by("conversation_pair_id").agg(
-            [
-                pl.first("model_a_name").alias("model_a"),
-                pl.first("model_a_active_params"),
-                pl.first("total_conv_a_output_tokens"),
-                pl.first("total_conv_a_kwh"),
-                pl.first("model_b_name").alias("model_b"),
-                pl.first("model_b_active_params"),
-                pl.first("total_conv_b_output_tokens"),
-                pl.first("total_conv_b_kwh"),
-                pl.col("model_pos").alias("positions"),
-                pl.col("liked").alias("likes"),
-                pl.col("msg_rank").alias("ranks"),
-                pl.first("categories"),
-            ]
-        )
-
-        # list columns
-        pos = pl.col("positions")
-        liked = pl.col("likes")
-        ranks = pl.col("ranks")
-
-        # safe expressions
-        pos_0 = pos.list.get(0, null_on_oob=True)
-        liked_0 = liked.list.get(0, null_on_oob=True)
-        rank_0 = ranks.list.get(0, null_on_oob=True)
-        pos_1 = pos.list.get(1, null_on_oob=True)
-        liked_1 = liked.list.get(1, null_on_oob=True)
-        rank_1 = ranks.list.get(1, null_on_oob=True)
-
-        # match logic
-        data = data.with_columns(
-            pl.col("model_a"),
-            pl.col("model_b"),
-            # 1 reaction case
-            pl.when(pos.list.len() == 1).then(
-                pl.when(liked_0)
-                .then(pl.when(pos_0 == "a").then(MatchScore.A).otherwise(MatchScore.B))
-                .otherwise(pl.when(pos_0 == "a").then(MatchScore.B).otherwise(MatchScore.A))
-            )
-            # 2 reactions
-            .when(pos.list.len() == 2).then(
-                # 2 likes
-                pl.when(liked_0 & liked_1)
-                .then(
-                    pl.when(pos_0 == pos_1)
-                    .then(pl.when(pos_0 == "a").then(MatchScore.A).otherwise(MatchScore.B))
-                    .when(rank_0 == rank_1)
-                    .then(MatchScore.Draw)
-                    .otherwise(
-                        pl.when(rank_0 < rank_1)
-                        .then(pl.when(pos_0 == "a").then(MatchScore.A).otherwise(MatchScore.B))
-                        .otherwise(pl.when(pos_1 == "a").then(MatchScore.A).otherwise(MatchScore.B))
-                    )
-                )
-                # 2 dislikes
-                .when(~liked_0 & ~liked_1)
-                .then(
-                    pl.when(pos_0 == pos_1)
-                    .then(pl.when(pos_0 == "a").then(MatchScore.B).otherwise(MatchScore.A))
-                    .when(rank_0 == rank_1)
-                    .then(MatchScore.Draw)
-                    .otherwise(
-                        pl.when(rank_0 < rank_1)
-                        .then(pl.when(pos_0 == "a").then(MatchScore.B).otherwise(MatchScore.A))
-                        .otherwise(pl.when(pos_1 == "a").then(MatchScore.B).otherwise(MatchScore.A))
-                    )
-                )
-                # 1 like, 1 dislike
-                .otherwise(
-                    pl.when(pos_0 != pos_1)
-                    .then(
-                        pl.when(liked_0)
-                        .then(pl.when(pos_0 == "a").then(MatchScore.A).otherwise(MatchScore.B))
-                        .otherwise(pl.when(pos_1 == "a").then(MatchScore.A).otherwise(MatchScore.B))
-                    )
-                    .otherwise(
-                        # same model, if like first then the model with reactions wins
-                        # if dislike first it loses
-                        pl.when(pl.when(liked_0).then(rank_0 < rank_1).otherwise(rank_1 < rank_0))
-                        .then(pl.when(pos_0 == "a").then(MatchScore.A).otherwise(MatchScore.B))
-                        .otherwise(pl.when(pos_0 == "a").then(MatchScore.B).otherwise(MatchScore.A))
-                    )
-                )
-            )
-            # for now 3 reactions is not considered
-            .otherwise(pl.lit(None)).alias("score"),
-        )
+        data = self._collect(score_reactions(data))
 
         # remove null scores
         print(f"Reactions data originally contains {len(data)} conversations pairs.")
@@ -371,6 +758,8 @@ class RankingPipeline:
         return data.select(
             [
                 "conversation_pair_id",
+                "timestamp",
+                pl.lit("reactions").alias("source"),
                 "model_a",
                 "model_b",
                 "score",
@@ -381,5 +770,6 @@ class RankingPipeline:
                 "total_conv_a_kwh",
                 "total_conv_b_output_tokens",
                 "total_conv_b_kwh",
+                *[f"{reaction}_{side}" for side in ("a", "b") for reaction in POSITIVE_REACTIONS + NEGATIVE_REACTIONS],
             ]
         )
@@ -5,12 +5,14 @@
 Plot functions.
 """
 
-from pathlib import Path
 from typing import Literal
 
 import altair as alt
 import polars as pl
 
+from rank_comparia.metadata import ModelRegistry, model_registry
+from rank_comparia.ranker import MatchScore
+
 
 def format_matches_for_winrate_count(heatmap_data: pl.DataFrame) -> pl.DataFrame:
     """
@@ -186,7 +188,7 @@ def plot_scores_with_confidence(scores: pl.DataFrame) -> alt.LayerChart:
 def format_matches_for_heatmap(matches: pl.DataFrame) -> pl.DataFrame:
     """
     From a DataFrame of matches with columns "score, "model_a" and "model_b"
-    where score is 2 when B wins, 0 when A wins and 1 if draw,
+    where score is 2 when A wins, 0 when B wins and 1 if draw,
     returned aggregated match data to plot in heatmaps..
 
     Args:
@@ -195,9 +197,9 @@ def format_matches_for_heatmap(matches: pl.DataFrame) -> pl.DataFrame:
         pl.DataFrame: Heatmap.
     """
     df = matches.with_columns(
-        a_wins=pl.when(pl.col("score") == 2).then(1).otherwise(0),
-        b_wins=pl.when(pl.col("score") == 1).then(1).otherwise(0),
-        draws=pl.when(pl.col("score") == 0).then(1).otherwise(0),
+        a_wins=pl.when(pl.col("score") == MatchScore.A.value).then(1).otherwise(0),
+        b_wins=pl.when(pl.col("score") == MatchScore.B.value).then(1).otherwise(0),
+        draws=pl.when(pl.col("score") == MatchScore.Draw.value).then(1).otherwise(0),
     ).select("model_a", "model_b", "a_wins", "b_wins", "draws")
 
     # count of wins by pair of model
@@ -292,23 +294,23 @@ def plot_winrate_heatmap(heatmap_data: pl.DataFrame) -> alt.LayerChart:
     return final_chart.configure_axisX(labelAngle=45)
 
 
-def plot_elo_against_frugal_elo(frugal_log_score: pl.DataFrame, bootstraped_scores: pl.DataFrame) -> alt.Chart:
+def plot_elo_against_frugal_elo(
+    frugal_log_score: pl.DataFrame, bootstraped_scores: pl.DataFrame, registry: ModelRegistry | None = None
+) -> alt.Chart:
     """
     Draw chart displaying Elo scores against Elo score adjusted for frugality.
 
     Args:
         frugal_log_score (pl.DataFrame): DataFrame with frugality score.
         bootstraped_scores (pl.DataFrame): DataFrame with bootstraped scores
+        registry (ModelRegistry | None): Model metadata, the shared registry of `metadata.MODELS_DATA` if None.
 
     Returns:
         alt.Chart: chart displaying Elo scores against Elo score adjusted for frugality.
     """
     # Add infos about models (organization, license, etc)
-    model_infos = pl.read_json(source=Path(".").resolve().parent / "data" / "models_data.json")
-    all_data = (
-        bootstraped_scores.select(["model_name", "median"])
-        .join(frugal_log_score, on="model_name")
-        .join(model_infos, on="model_name")
+    all_data = (registry or model_registry()).join(
+        bootstraped_scores.select(["model_name", "median"]).join(frugal_log_score, on="model_name")
     )
 
     all_data_frugal = all_data.with_columns(frugal=(pl.col("median") - 366 * pl.col("cost")))
@@ -347,6 +349,7 @@ def draw_frugality_chart(
     scale: Literal["match", "token"] | None,
     log: bool = False,
     title: str = "",
+    registry: ModelRegistry | None = None,
 ) -> alt.Chart:
     """
     Draw chart displaying Elo/BT scores against frugality scores.
@@ -356,14 +359,14 @@ def draw_frugality_chart(
         title (str): Chart title.
         scale (Literal) : Select to plot mean_per_token or mean_per_match if mean=True
         log (bool): Whether or not to use a log scale.
+        registry (ModelRegistry | None): Model metadata, the shared registry of `metadata.MODELS_DATA` if None.
 
     Returns:
         alt.Chart: Chart displaying Elo/BT scores against frugality scores.
     """
 
     # Add infos about models (organization, license, etc)
-    model_infos = pl.read_json(source=Path(".").resolve().parent / "data" / "models_data.json")
-    all_data = frugality_infos.join(model_infos, on="model_name")
+    all_data = (registry or model_registry()).join(frugality_infos)
 
     # Dropdown to select models by license (TODO: filter by proprietary/openweights/opensource)
     input_dropdown = alt.binding_select(
@@ -2,7 +2,7 @@ import os
 import operator
 import polars as pl
 
-from rank_comparia.utils import load_comparia
+from rank_comparia.utils import Frame, load_comparia
 
 POSITIVE_REACTIONS = [
     "useful",
@@ -13,17 +13,54 @@ POSITIVE_REACTIONS = [
 NEGATIVE_REACTIONS = ["incorrect", "superficial", "instructions_not_followed"]
 
 
-def compute_total_and_ratio(data: pl.DataFrame) -> pl.DataFrame:
+def votes_preference_counts() -> list[pl.Expr]:
+    """
+    Preference counters of each side of a vote, named "{reaction}_a" and "{reaction}_b".
+
+    Returns:
+        list[pl.Expr]: Expressions on raw votes data.
+    """
+    return [
+        pl.col(f"conv_{reaction}_{side}").fill_null(False).cast(pl.UInt32).alias(f"{reaction}_{side}")
+        for side in ("a", "b")
+        for reaction in POSITIVE_REACTIONS + NEGATIVE_REACTIONS
+    ]
+
+
+def reactions_preference_counts() -> list[pl.Expr]:
+    """
+    Preference counters of each side of a conversation pair, named "{reaction}_a" and "{reaction}_b",
+    aggregating reactions (positive reactions with a like, negative reactions with a dislike).
+
+    Returns:
+        list[pl.Expr]: Aggregation expressions on raw reactions data grouped by conversation pair.
+    """
+    return [
+        (
+            (pl.col("model_pos") == side)
+            & pl.col("liked" if reaction in POSITIVE_REACTIONS else "disliked")
+            & pl.col(reaction)
+        )
+        .sum()
+        .cast(pl.UInt32)
+        .alias(f"{reaction}_{side}")
+        for side in ("a", "b")
+        for reaction in POSITIVE_REACTIONS + NEGATIVE_REACTIONS
+    ]
+
+
+def compute_total_and_ratio(data: Frame) -> Frame:
+    # typed accumulators, so that the planned dtypes match the computed ones on the streaming engine
     data = data.with_columns(
         total_prefs=pl.fold(
-            acc=pl.lit(0),
+            acc=pl.lit(0, dtype=pl.Int64),
             function=operator.add,
             exprs=pl.col(*POSITIVE_REACTIONS, *NEGATIVE_REACTIONS),
         )
     )
     data = data.with_columns(
         positive_prefs_ratio=pl.fold(
-            acc=pl.lit(0),
+            acc=pl.lit(0, dtype=pl.Int64),
             function=operator.add,
             exprs=pl.col(*POSITIVE_REACTIONS),
         )
@@ -33,7 +70,7 @@ def compute_total_and_ratio(data: pl.DataFrame) -> pl.DataFrame:
     return data
 
 
-def get_votes_preferences(data: pl.DataFrame | None = None) -> pl.DataFrame:
+def get_votes_preferences(data: pl.DataFrame | pl.LazyFrame | None = None) -> pl.DataFrame | pl.LazyFrame:
     if data is None:
         data = load_comparia("ministere-culture/comparia-votes", token=None)
 
@@ -65,7 +102,7 @@ def get_votes_preferences(data: pl.DataFrame | None = None) -> pl.DataFrame:
     return compute_total_and_ratio(data)
 
 
-def get_reactions_preferences(data: pl.DataFrame | None = None) -> pl.DataFrame:
+def get_reactions_preferences(data: pl.DataFrame | pl.LazyFrame | None = None) -> pl.DataFrame | pl.LazyFrame:
     if data is None:
         data = load_comparia("ministere-culture/comparia-reactions", token=None)
 
@@ -86,10 +123,20 @@ def get_reactions_preferences(data: pl.DataFrame | None = None) -> pl.DataFrame:
     return compute_total_and_ratio(data)
 
 
-def get_preferences_data(votes_data: pl.DataFrame | None = None, reactions_data: pl.DataFrame | None = None):
-    votes_preferences = get_votes_preferences(votes_data)
-    reactions_preferences = get_reactions_preferences(reactions_data)
+def combine_preferences(*preferences: Frame) -> Frame:
+    """
+    Add up the preferences by model of several datasets.
 
-    return compute_total_and_ratio(
-        pl.concat([votes_preferences, reactions_preferences]).group_by("model_name").sum().sort(by="model_name")
-    )
+    Args:
+        *preferences (pl.DataFrame | pl.LazyFrame): Preferences by model, e.g. of `get_votes_preferences`.
+
+    Returns:
+        pl.DataFrame | pl.LazyFrame: Preferences by model, with totals and ratios of the sums.
+    """
+    return compute_total_and_ratio(pl.concat(preferences).group_by("model_name").sum().sort(by="model_name"))
+
+
+def get_preferences_data(
+    votes_data: pl.DataFrame | pl.LazyFrame | None = None, reactions_data: pl.DataFrame | pl.LazyFrame | None = None
+):
+    return combine_preferences(get_votes_preferences(votes_data), get_reactions_preferences(reactions_data))
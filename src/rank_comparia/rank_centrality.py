@@ -0,0 +1,163 @@
+# SPDX-FileCopyrightText: 2025 Pôle d'Expertise de la Régulation Numérique <contact@peren.gouv.fr>
+#
+# SPDX-License-Identifier: MIT
+
+"""Spectral ranker, from the stationary distribution of a random walk on the comparison graph."""
+
+import warnings
+
+import numpy as np
+
+from rank_comparia.bootstrap import encode_matches
+from rank_comparia.maximum_likelihood import aggregate_pairs
+from rank_comparia.ranker import Match, Ranker
+
+
+def stationary_distribution(
+    pairs: np.ndarray,
+    points: np.ndarray,
+    n_models: int,
+    regularization: float = 0.01,
+    max_iter: int = 10000,
+    tol: float = 1e-10,
+) -> np.ndarray:
+    """
+    Stationary distribution of the Rank Centrality random walk, by power iteration.
+
+    From each model, the walk moves to each opponent with a probability proportional to the share of
+    points the opponent took against it, divided by the maximum number of opponents of a model, and
+    stays put otherwise. Under the Bradley-Terry model, the stationary probability of each model is
+    proportional to its strength. The transition matrix is only stored as its observed pairs, so
+    each iteration is a sparse matrix-vector product.
+
+    Args:
+        pairs (np.ndarray): Pairs of model indices with shape (n_pairs, 2), see `aggregate_pairs`.
+        points (np.ndarray): Points of each model of the pair against the other, same shape as `pairs`.
+        n_models (int): Number of models.
+        regularization (float): Points added to both models of each observed pair, so that models
+            that never scored against an opponent keep a positive probability. It pulls the shares
+            of each pair towards one half, which compresses scores when pairs only have a few
+            matches: it is kept small compared to the 2 points of a match.
+        max_iter (int): Max number of iterations, with a warning if the distribution has not
+            converged by then.
+        tol (float): Tolerance on the L1 change of the distribution.
+
+    Returns:
+        np.ndarray: Stationary probability of each model. Each connected component of the comparison
+            graph keeps the mass of the uniform starting distribution.
+    """
+    distribution = np.full(n_models, 1 / n_models) if n_models else np.zeros(0)
+    if len(pairs) == 0:
+        return distribution
+    first, second = pairs[:, 0], pairs[:, 1]
+    totals = points.sum(axis=1) + 2 * regularization
+    source = np.concatenate([first, second])
+    target = np.concatenate([second, first])
+    # the walk goes from a model to its opponent as often as the opponent beats it
+    degree = np.bincount(source, minlength=n_models).max()
+    transition = np.concatenate([points[:, 1] + regularization, points[:, 0] + regularization]) / (
+        np.concatenate([totals, totals]) * degree
+    )
+    stay = 1 - np.bincount(source, weights=transition, minlength=n_models)
+
+    change = np.inf
+    for _ in range(max_iter):
+        updated = distribution * stay + np.bincount(
+            target, weights=distribution[source] * transition, minlength=n_models
+        )
+        updated /= updated.sum()
+        change = np.abs(updated - distribution).sum()
+        distribution = updated
+        if change < tol:
+            break
+    else:
+        warnings.warn(f"Power iteration did not converge in {max_iter} iterations (L1 change {change:.2e}).")
+    return distribution
+
+
+class RankCentralityRanker(Ranker):
+    """
+    Rank Centrality Ranker, a fast spectral approximation of the maximum likelihood ranker.
+    """
+
+    BASE = 10
+
+    def __init__(
+        self,
+        scale: int = 400,
+        default_score: float = 1000.0,
+        bootstrap_samples: int = 100,
+        regularization: float = 0.01,
+        max_iter: int = 10000,
+    ):
+        """
+        Constructor.
+
+        Args:
+            scale (int): Scale parameter.
+            default_score (float): Base score used.
+            bootstrap_samples (int): Number of bootstrap samples.
+            regularization (float): Points added to both models of each observed pair, see
+                `stationary_distribution`.
+            max_iter (int): Max number of power iterations.
+        """
+        super().__init__(scale, default_score, bootstrap_samples)
+        self.regularization = regularization
+        self.max_iter = max_iter
+        self.scores = {}
+
+    def compute_scores(self, matches: list[Match]) -> dict[str, float]:
+        """
+        Compute scores from a list of matches.
+
+        Args:
+            matches (list[Match]): List of matches.
+
+        Returns:
+            dict[str, float]: Dictionary mapping model names to float scores.
+        """
+        encoded = encode_matches(matches)
+        return self.compute_encoded_scores(
+            encoded["models"].tolist(), encoded["model_a"], encoded["model_b"], encoded["score"]
+        )
+
+    def compute_encoded_scores(
+        self, models: list[str], model_a: np.ndarray, model_b: np.ndarray, score: np.ndarray
+    ) -> dict[str, float]:
+        """
+        Compute scores from encoded matches. Stationary probabilities are mapped on the scale of
+        `MaximumLikelihoodRanker`, the log of the probability ratio of two models giving their score
+        difference.
+
+        Args:
+            models (list[str]): Model names.
+            model_a (np.ndarray): Index in `models` of model a of each match.
+            model_b (np.ndarray): Index in `models` of model b of each match.
+            score (np.ndarray): Score of each match (0 -> b wins, 2 -> a wins, 1 -> draw).
+
+        Returns:
+            dict[str, float]: Dictionary mapping model names to float scores, for models playing
+                at least one match against another model.
+        """
+        keep = model_a != model_b
+        present, codes = np.unique(np.concatenate([model_a[keep], model_b[keep]]), return_inverse=True)
+        n_matches = int(keep.sum())
+        pairs, points = aggregate_pairs(codes[:n_matches], codes[n_matches:], score[keep], len(present))
+        distribution = stationary_distribution(
+            pairs, points, len(present), regularization=self.regularization, max_iter=self.max_iter
+        )
+        coef = np.log(distribution) / np.log(self.BASE)
+
+        self.scores = {
+            models[index]: self.scale * value + self.default_score for index, value in zip(present, coef - coef.mean())
+        }
+        return self.get_scores()
+
+    def get_scores(self) -> dict[str, float]:
+        """
+        Return computed scores.
+
+        Returns:
+            dict[str, float]: Dictionary mapping model names to float scores.
+        """
+        return {model: score for model, score in sorted(self.scores.items(), key=lambda x: -x[1])}
@@ -7,10 +7,16 @@ from abc import ABC, abstractmethod
 from collections import defaultdict
 from dataclasses import dataclass
 from enum import Enum
-from random import choices
+from random import choices, getstate, setstate
+from typing import TYPE_CHECKING
 
+import numpy as np
 import polars as pl
-from tqdm import tqdm
+
+
+if TYPE_CHECKING:
+    from rank_comparia.bootstrap import BootstrapQueue
+    from rank_comparia.checkpoint import BootstrapCheckpoint
 
 
 class MatchScore(int, Enum):
@@ -53,6 +59,8 @@ class Ranker(ABC):
         self.scale = scale
         self.default_score = default_score
         self.bootstrap_samples = bootstrap_samples
+        # scores of the last bootstrap computation, one column per model and one row per sample
+        self.bootstrap_replicates = pl.DataFrame()
 
     @abstractmethod
     def compute_scores(self, matches: list[Match]) -> dict[str, float]:
@@ -77,24 +85,154 @@ class Ranker(ABC):
         """
         raise NotImplementedError()
 
-    def compute_bootstrap_scores(self, matches: list[Match]) -> pl.DataFrame:
+    def compute_encoded_scores(
+        self, models: list[str], model_a: np.ndarray, model_b: np.ndarray, score: np.ndarray
+    ) -> dict[str, float]:
+        """
+        Compute scores from encoded matches, see `bootstrap.encode_matches`. Rankers working on
+        arrays override it to skip building `Match` objects.
+
+        Args:
+            models (list[str]): Model names.
+            model_a (np.ndarray): Index in `models` of model a of each match.
+            model_b (np.ndarray): Index in `models` of model b of each match.
+            score (np.ndarray): Score of each match (0 -> b wins, 2 -> a wins, 1 -> draw).
+
+        Returns:
+            dict[str, float]: Dictionary mapping model names to float scores.
+        """
+        return self.compute_scores(
+            [
+                Match(models[a], models[b], MatchScore(s))
+                for a, b, s in zip(model_a.tolist(), model_b.tolist(), score.tolist())
+            ]
+        )
+
+    def order_sample(self, indices: np.ndarray) -> np.ndarray:
+        """
+        Order the indices of a bootstrap sample before its matches are ranked, kept as drawn by default.
+
+        Args:
+            indices (np.ndarray): Indices of the sampled matches.
+
+        Returns:
+            np.ndarray: Indices in the order the matches are ranked.
+        """
+        return indices
+
+    def bootstrap_indices(self, n_matches: int, replicate: int, seed: int) -> np.ndarray:
+        """
+        Indices of the matches of one bootstrap sample. Each replicate draws its sample from its own
+        random generator derived from (`seed`, `replicate`), so that replicates can be computed in
+        any order or on different machines, and other statistics resampled with the same matches.
+
+        Args:
+            n_matches (int): Number of matches.
+            replicate (int): Replicate index.
+            seed (int): Seed of the bootstrap.
+
+        Returns:
+            np.ndarray: Indices of the sampled matches, see `order_sample`.
+        """
+        return self.order_sample(np.random.default_rng([seed, replicate]).integers(0, n_matches, size=n_matches))
+
+    def bootstrap_replicate(self, matches: list[Match], replicate: int, seed: int) -> dict[str, float]:
+        """
+        Compute scores on one bootstrap sample, see `bootstrap_indices`.
+
+        Args:
+            matches (list[Match]): List of matches.
+            replicate (int): Replicate index.
+            seed (int): Seed of the bootstrap.
+
+        Returns:
+            dict[str, float]: Dictionary mapping model names to float scores.
+        """
+        indices = self.bootstrap_indices(len(matches), replicate, seed)
+        return self.compute_scores([matches[index] for index in indices])
+
+    def resample(self, matches: list[Match]) -> list[Match]:
+        """
+        Draw a bootstrap sample from the global random generator, used by unseeded bootstraps.
+
+        Args:
+            matches (list[Match]): List of matches.
+
+        Returns:
+            list[Match]: Bootstrap sample.
+        """
+        indices = self.order_sample(np.array(choices(range(len(matches)), k=len(matches))))
+        return [matches[index] for index in indices]
+
+    def compute_bootstrap_scores(
+        self,
+        matches: list[Match],
+        seed: int | None = None,
+        queue: "BootstrapQueue | None" = None,
+        checkpoint: "BootstrapCheckpoint | None" = None,
+    ) -> pl.DataFrame:
         """
         Compute bootstrap scores from a list of matches.
 
         Args:
             matches (list[Match]): List of matches.
+            seed (int | None): Seed of the bootstrap samples, see `bootstrap_replicate`. Samples
+                are drawn from the global random generator if None.
+            queue (BootstrapQueue | None): Optional work queue distributing replicates to other
+                processes or machines, with a seed drawn at random if `seed` is None. Replicates
+                are computed in this process if None.
+            checkpoint (BootstrapCheckpoint | None): Optional checkpoint persisting completed
+                replicates (and the global random generator state) in blocks, from which an
+                interrupted computation resumes. Not used with a queue.
 
         Returns:
             pl.DataFrame: DataFrame containing bootstrap scores and confidence intervals.
         """
+        from tqdm import tqdm
+
         # TODO: proper logging
         print(f"Computing bootstrap scores from a sample of {len(matches)} matches.")
-        rows = []
-        all_keys = set()
-        for _ in tqdm(range(self.bootstrap_samples), desc="Processing bootstrap samples"):
-            scores = self.compute_scores(choices(matches, k=len(matches)))
-            rows.append(scores)
-            all_keys.update(scores.keys())
+        if queue is not None:
+            if seed is None:
+                seed = int(np.random.SeedSequence().entropy)  # type: ignore
+            return self.summarize_bootstrap(queue.run(self, matches, seed=seed))
+        rows, block_start = [], 0
+        if checkpoint is not None:
+            rows, random_state = checkpoint.load_rows()
+            block_start = len(rows)
+            if rows:
+                print(f"Resuming from {len(rows)} checkpointed bootstrap samples.")
+                if seed is None:
+                    setstate(random_state)
+        for replicate in tqdm(
+            range(len(rows), self.bootstrap_samples),
+            desc="Processing bootstrap samples",
+            initial=len(rows),
+            total=self.bootstrap_samples,
+        ):
+            if seed is None:
+                rows.append(self.compute_scores(self.resample(matches)))
+            else:
+                rows.append(self.bootstrap_replicate(matches, replicate, seed))
+            if checkpoint is not None and (
+                len(rows) - block_start == checkpoint.every or len(rows) == self.bootstrap_samples
+            ):
+                checkpoint.save_block(rows[block_start:], block_start, getstate())
+                block_start = len(rows)
+        return self.summarize_bootstrap(rows)
+
+    def summarize_bootstrap(self, rows: list[dict[str, float]]) -> pl.DataFrame:
+        """
+        Compute scores and ranks with confidence intervals from the scores of each bootstrap sample.
+
+        Args:
+            rows (list[dict[str, float]]): Scores of each bootstrap sample.
+
+        Returns:
+            pl.DataFrame: DataFrame containing bootstrap scores and confidence intervals.
+        """
+        # sorted so that the summary does not depend on the order in which models were seen
+        all_keys = sorted({key for scores in rows for key in scores})
 
         # fill missing keys with default score
         for d in rows:
@@ -109,8 +247,9 @@ class Ranker(ABC):
 
         # compute boostrap confidence intervals
         results = pl.DataFrame(aggregated)
+        self.bootstrap_replicates = results
 
-        bootstrap_column_names = [f"column_{index}" for index in range(self.bootstrap_samples)]
+        bootstrap_column_names = [f"column_{index}" for index in range(len(rows))]
         # we want to get ranks from 1..N based on score bootstrap estimates
         # and confidence interval at 95% on ranks. For this we compute ranks for each
         # bootstrap sample and derive these confidence intervals from the
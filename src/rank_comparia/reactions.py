@@ -0,0 +1,160 @@
+# SPDX-FileCopyrightText: 2025 Pôle d'Expertise de la Régulation Numérique <contact@peren.gouv.fr>
+#
+# SPDX-License-Identifier: MIT
+
+"""Match scores from reactions data."""
+
+from typing import Literal
+
+import polars as pl
+
+from rank_comparia.preferences import reactions_preference_counts
+from rank_comparia.ranker import MatchScore
+from rank_comparia.utils import Frame
+
+
+def _winner(position: pl.Expr) -> pl.Expr:
+    """Score of a match won by the model at `position`."""
+    return pl.when(position == "a").then(MatchScore.A).otherwise(MatchScore.B)
+
+
+def _loser(position: pl.Expr) -> pl.Expr:
+    """Score of a match lost by the model at `position`."""
+    return pl.when(position == "a").then(MatchScore.B).otherwise(MatchScore.A)
+
+
+def reactions_match_score(
+    n_reactions: pl.Expr,
+    pos_0: pl.Expr,
+    liked_0: pl.Expr,
+    rank_0: pl.Expr,
+    pos_1: pl.Expr,
+    liked_1: pl.Expr,
+    rank_1: pl.Expr,
+) -> pl.Expr:
+    """
+    Match score of a conversation pair from its first two reactions, null with 3 reactions or more.
+
+    The rules are symmetric in the two reactions, so their order does not matter.
+
+    Args:
+        n_reactions (pl.Expr): Number of reactions of the conversation pair.
+        pos_0 (pl.Expr): Position ("a" or "b") of the model of the first reaction.
+        liked_0 (pl.Expr): Whether the first reaction is a like.
+        rank_0 (pl.Expr): Message rank of the first reaction.
+        pos_1 (pl.Expr): Position of the model of the second reaction.
+        liked_1 (pl.Expr): Whether the second reaction is a like.
+        rank_1 (pl.Expr): Message rank of the second reaction.
+
+    Returns:
+        pl.Expr: Score expression.
+    """
+    return (
+        # 1 reaction case
+        pl.when(n_reactions == 1)
+        .then(pl.when(liked_0).then(_winner(pos_0)).otherwise(_loser(pos_0)))
+        # 2 reactions
+        .when(n_reactions == 2)
+        .then(
+            # 2 likes
+            pl.when(liked_0 & liked_1)
+            .then(
+                pl.when(pos_0 == pos_1)
+                .then(_winner(pos_0))
+                .when(rank_0 == rank_1)
+                .then(MatchScore.Draw)
+                .otherwise(pl.when(rank_0 < rank_1).then(_winner(pos_0)).otherwise(_winner(pos_1)))
+            )
+            # 2 dislikes
+            .when(~liked_0 & ~liked_1)
+            .then(
+                pl.when(pos_0 == pos_1)
+                .then(_loser(pos_0))
+                .when(rank_0 == rank_1)
+                .then(MatchScore.Draw)
+                .otherwise(pl.when(rank_0 < rank_1).then(_loser(pos_0)).otherwise(_loser(pos_1)))
+            )
+            # 1 like, 1 dislike
+            .otherwise(
+                pl.when(pos_0 != pos_1)
+                .then(pl.when(liked_0).then(_winner(pos_0)).otherwise(_winner(pos_1)))
+                .otherwise(
+                    # same model, if like first then the model with reactions wins
+                    # if dislike first it loses
+                    pl.when(pl.when(liked_0).then(rank_0 < rank_1).otherwise(rank_1 < rank_0))
+                    .then(_winner(pos_0))
+                    .otherwise(_loser(pos_0))
+                )
+            )
+        )
+        # for now 3 reactions is not considered
+        .otherwise(pl.lit(None))
+    )
+
+
+def _conversation_columns() -> list[pl.Expr]:
+    """
+    Aggregations of the columns shared by all reactions of a conversation pair.
+    """
+    return [
+        pl.min("timestamp"),
+        pl.first("model_a_name").alias("model_a"),
+        pl.first("model_a_active_params"),
+        pl.first("total_conv_a_output_tokens"),
+        pl.first("total_conv_a_kwh"),
+        pl.first("model_b_name").alias("model_b"),
+        pl.first("model_b_active_params"),
+        pl.first("total_conv_b_output_tokens"),
+        pl.first("total_conv_b_kwh"),
+        pl.first("categories"),
+        *reactions_preference_counts(),
+    ]
+
+
+def score_reactions(reactions: Frame, kernel: Literal["flat", "list"] = "flat") -> Frame:
+    """
+    Aggregate raw reactions by conversation pair and compute the match score of each pair.
+
+    The "list" kernel gathers all reactions of a pair in list columns. The "flat" kernel only keeps
+    the number of reactions and the first and last reaction as scalar columns, which is enough since
+    pairs with 3 reactions or more are discarded and the rules are symmetric in the two reactions.
+    It uses much less memory and runs on the streaming engine.
+
+    Args:
+        reactions (pl.DataFrame | pl.LazyFrame): Raw reactions data.
+        kernel (Literal["flat", "list"]): Aggregation kernel.
+
+    Returns:
+        pl.DataFrame | pl.LazyFrame: One row per conversation pair, with a null score for pairs
+            with 3 reactions or more.
+    """
+    if kernel == "list":
+        data = reactions.group_by("conversation_pair_id").agg(
+            *_conversation_columns(),
+            pl.col("model_pos").alias("positions"),
+            pl.col("liked").alias("likes"),
+            pl.col("msg_rank").alias("ranks"),
+        )
+        features = [pl.col("positions").list.len()] + [
+            pl.col(column).list.get(index, null_on_oob=True)
+            for index in (0, 1)
+            for column in ("positions", "likes", "ranks")
+        ]
+        temporary = ["positions", "likes", "ranks"]
+    else:
+        data = reactions.group_by("conversation_pair_id").agg(
+            *_conversation_columns(),
+            pl.len().alias("n_reactions"),
+            *[
+                getattr(pl.col(column), which)().alias(f"{column}_{which}")
+                for which in ("first", "last")
+                for column in ("model_pos", "liked", "msg_rank")
+            ],
+        )
+        temporary = [
+            "n_reactions",
+            *[f"{column}_{which}" for which in ("first", "last") for column in ("model_pos", "liked", "msg_rank")],
+        ]
+        features = [pl.col(column) for column in temporary]
+
+    return data.with_columns(reactions_match_score(*features).alias("score")).drop(temporary)
@@ -0,0 +1,405 @@
+# SPDX-FileCopyrightText: 2025 Pôle d'Expertise de la Régulation Numérique <contact@peren.gouv.fr>
+#
+# SPDX-License-Identifier: MIT
+
+"""Read-only HTTP service answering leaderboard queries from the results of a finished run."""
+
+import argparse
+import json
+import os
+import threading
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import polars as pl
+
+from rank_comparia.utils import categories
+
+
+ALL = "all"  # key of the leaderboard computed on all matches
+LATEST = "LATEST"  # name of the marker file holding the published run directory
+
+
+@dataclass
+class Leaderboard:
+    """
+    Scores of one category indexed by model.
+    """
+
+    rows: list[dict]  # score rows sorted by rank
+    index: dict[str, int]  # position of each model in `rows`
+    replicates: np.ndarray | None  # bootstrap scores, one row per sample and one column per model of `rows`
+
+    @classmethod
+    def load(cls, scores_path: Path, replicates_path: Path) -> "Leaderboard":
+        """
+        Load a leaderboard exported by `RankingPipeline`.
+
+        Args:
+            scores_path (Path): Path to the scores CSV file.
+            replicates_path (Path): Path to the bootstrap replicates parquet file, may not exist.
+
+        Returns:
+            Leaderboard: Leaderboard.
+        """
+        scores = pl.read_csv(scores_path, separator=";").sort("rank")
+        rows = scores.to_dicts()
+        index = {row["model_name"]: position for position, row in enumerate(rows)}
+        replicates = None
+        if replicates_path.exists():
+            replicates_frame = pl.read_parquet(replicates_path)
+            models = [row["model_name"] for row in rows]
+            replicates = replicates_frame.select(
+                [
+                    pl.col(model) if model in replicates_frame.columns else pl.lit(None, dtype=pl.Float64).alias(model)
+                    for model in models
+                ]
+            ).to_numpy()
+        return cls(rows=rows, index=index, replicates=replicates)
+
+
+def table_key(name: str) -> tuple[str | None, str]:
+    """
+    Method and category of a table exported by `RankingPipeline`, from its name without suffix:
+    "{method}" for the overall leaderboard and "{method}_{category}" for a category. Category
+    tables exported before they were named by method give no method.
+
+    Args:
+        name (str): Table name, e.g. "ml" or "ml_Education".
+
+    Returns:
+        tuple[str | None, str]: Method and category, "all" for the overall leaderboard.
+    """
+    if name in categories:
+        return None, name
+    for category in categories:
+        if name.endswith(f"_{category}"):
+            return name.removesuffix(f"_{category}"), category
+    return name, ALL
+
+
+@dataclass
+class LeaderboardStore:
+    """
+    In-memory results of a finished run, as written by `RankingPipeline` in its export directory.
+    """
+
+    run_dir: Path  # run export directory
+    leaderboards: dict[tuple[str, str], Leaderboard]  # leaderboard by method and category, "all" for the overall one
+    cards: dict[str, dict[str, dict]] = field(default_factory=dict)  # extra model data by method, from final data
+    scale: int = 400  # scale parameter of the scores
+
+    @classmethod
+    def load(cls, run_dir: Path, scale: int = 400) -> "LeaderboardStore":
+        """
+        Load all leaderboards of a run directory.
+
+        Args:
+            run_dir (Path): Run export directory.
+            scale (int): Scale parameter of the scores.
+
+        Returns:
+            LeaderboardStore: Store.
+        """
+        tables = {}
+        for scores_path in sorted(run_dir.glob("*_scores.csv")):
+            name = scores_path.name.removesuffix("_scores.csv")
+            if name.startswith("temporal_"):
+                continue
+            tables[table_key(name)] = Leaderboard.load(scores_path, run_dir / f"{name}_replicates.parquet")
+
+        methods = {method for method, _ in tables if method is not None}
+        leaderboards = {}
+        for (method, category), leaderboard in tables.items():
+            if method is None:
+                if len(methods) != 1:
+                    raise ValueError(
+                        f"Cannot tell which of the methods {sorted(methods)} computed the {category} leaderboard."
+                    )
+                method = next(iter(methods))
+            leaderboards.setdefault((method, category), leaderboard)
+
+        cards = {
+            final_path.name.removesuffix("_final_data.json"): {
+                model["model_name"]: model for model in json.loads(final_path.read_text())["models"]
+            }
+            for final_path in run_dir.glob("*_final_data.json")
+        }
+        return cls(run_dir=run_dir, leaderboards=leaderboards, cards=cards, scale=scale)
+
+    @property
+    def methods(self) -> list[str]:
+        """
+        Methods with at least one leaderboard.
+
+        Returns:
+            list[str]: Methods.
+        """
+        return sorted({method for method, _ in self.leaderboards})
+
+    def _method(self, method: str | None) -> str:
+        if method is None:
+            if len(self.methods) != 1:
+                raise ValueError(f"The run holds the leaderboards of several methods {self.methods}, pick one.")
+            return self.methods[0]
+        if method not in self.methods:
+            raise KeyError(f"No leaderboard for method {method}.")
+        return method
+
+    def _leaderboard(self, category: str, method: str | None) -> Leaderboard:
+        key = (self._method(method), category)
+        if key not in self.leaderboards:
+            raise KeyError(f"No leaderboard for category {category}.")
+        return self.leaderboards[key]
+
+    def top(self, category: str = ALL, k: int = 10, method: str | None = None) -> list[dict]:
+        """
+        Best models of a category.
+
+        Args:
+            category (str): Category, "all" for the overall leaderboard.
+            k (int): Number of models.
+            method (str | None): Ranking method, may be omitted when the run holds a single one.
+
+        Returns:
+            list[dict]: Score rows of the k best models.
+        """
+        if k < 0:
+            raise ValueError("k must be non-negative.")
+        return self._leaderboard(category, method).rows[:k]
+
+    def pair(self, model_a: str, model_b: str, category: str = ALL, method: str | None = None) -> dict:
+        """
+        Probability that model a beats model b, with a 95% confidence interval over bootstrap samples.
+
+        Args:
+            model_a (str): Name of model a.
+            model_b (str): Name of model b.
+            category (str): Category, "all" for the overall leaderboard.
+            method (str | None): Ranking method, may be omitted when the run holds a single one.
+
+        Returns:
+            dict: Probability ("p") and its bounds ("p2.5", "p97.5").
+        """
+        leaderboard = self._leaderboard(category, method)
+        for model in (model_a, model_b):
+            if model not in leaderboard.index:
+                raise KeyError(f"Unknown model {model} in category {category}.")
+        row_a, row_b = leaderboard.rows[leaderboard.index[model_a]], leaderboard.rows[leaderboard.index[model_b]]
+        result = {
+            "model_a": model_a,
+            "model_b": model_b,
+            "category": category,
+            "p": 1 / (1 + 10 ** ((row_b["median"] - row_a["median"]) / self.scale)),
+        }
+        if leaderboard.replicates is not None:
+            diff = (
+                leaderboard.replicates[:, leaderboard.index[model_b]]
+                - leaderboard.replicates[:, leaderboard.index[model_a]]
+            )
+            probabilities = 1 / (1 + 10 ** (diff[~np.isnan(diff)] / self.scale))
+            if len(probabilities):
+                result["p2.5"], result["p97.5"] = np.quantile(probabilities, [0.025, 0.975]).tolist()
+        return result
+
+    def model_card(self, model: str, method: str | None = None) -> dict:
+        """
+        All data available on a model: overall scores, extra exported data and rank in each category.
+
+        Args:
+            model (str): Model name.
+            method (str | None): Ranking method, may be omitted when the run holds a single one.
+
+        Returns:
+            dict: Model card.
+        """
+        method = self._method(method)
+        card = dict(self.cards.get(method, {}).get(model, {}))
+        for (table_method, category), leaderboard in self.leaderboards.items():
+            if table_method != method or model not in leaderboard.index:
+                continue
+            row = leaderboard.rows[leaderboard.index[model]]
+            if category == ALL:
+                card = {**row, **card}
+            else:
+                card.setdefault("categories", {})[category] = {"rank": row["rank"], "median": row["median"]}
+        if not card:
+            raise KeyError(f"Unknown model {model}.")
+        return card
+
+
+def publish_run(run_dir: Path) -> None:
+    """
+    Atomically mark a finished run as the one served by services watching its parent directory.
+
+    Args:
+        run_dir (Path): Run export directory.
+    """
+    marker = run_dir.parent / LATEST
+    temporary = marker.with_suffix(".tmp")
+    temporary.write_text(run_dir.name)
+    os.replace(temporary, marker)
+
+
+class LeaderboardService:
+    """
+    Holds the store currently served and swaps it when a new run is published.
+    """
+
+    def __init__(self, root: Path, scale: int = 400):
+        """
+        Constructor.
+
+        Args:
+            root (Path): Either a run directory, or a directory of runs with a `LATEST` marker
+                written by `publish_run`.
+            scale (int): Scale parameter of the scores.
+        """
+        self.root = root
+        self.scale = scale
+        self.run_name = self._published_run()
+        self.store = LeaderboardStore.load(
+            self.root if self.run_name is None else self.root / self.run_name, scale=scale
+        )
+
+    def _published_run(self) -> str | None:
+        marker = self.root / LATEST
+        return marker.read_text().strip() if marker.exists() else None
+
+    def refresh(self) -> bool:
+        """
+        Load the published run if it changed. The new store is fully loaded before replacing the
+        current one, so that queries always see a complete run.
+
+        Returns:
+            bool: Whether the served run changed.
+        """
+        run_name = self._published_run()
+        if run_name is None or run_name == self.run_name:
+            return False
+        self.store = LeaderboardStore.load(self.root / run_name, scale=self.scale)
+        self.run_name = run_name
+        print(f"Serving run {self.store.run_dir}.")
+        return True
+
+    def watch(self, interval: float = 5.0) -> threading.Event:
+        """
+        Poll the `LATEST` marker in a background thread.
+
+        Args:
+            interval (float): Polling interval in seconds.
+
+        Returns:
+            threading.Event: Event stopping the watcher when set.
+        """
+        stop = threading.Event()
+
+        def poll() -> None:
+            while not stop.wait(interval):
+                try:
+                    self.refresh()
+                except (OSError, pl.exceptions.PolarsError, KeyError, ValueError) as error:
+                    print(f"Could not load published run: {error}")
+
+        threading.Thread(target=poll, daemon=True).start()
+        return stop
+
+    def query(self, path: str, parameters: dict[str, str]) -> dict | list[dict]:
+        """
+        Answer a query.
+
+        Args:
+            path (str): One of "/top", "/pair", "/model" and "/health".
+            parameters (dict[str, str]): Query parameters, with an optional "method" when the run
+                holds the leaderboards of several methods.
+
+        Returns:
+            dict | list[dict]: JSON serializable answer.
+        """
+        store = self.store
+        category = parameters.get("category", ALL)
+        method = parameters.get("method")
+        if path == "/top":
+            return store.top(category, k=int(parameters.get("k", 10)), method=method)
+        if path == "/pair":
+            return store.pair(parameters["a"], parameters["b"], category, method=method)
+        if path == "/model":
+            return store.model_card(parameters["name"], method=method)
+        if path == "/health":
+            return {
+                "run": str(store.run_dir),
+                "methods": store.methods,
+                "categories": sorted({category for _, category in store.leaderboards}),
+            }
+        raise KeyError(f"Unknown query {path}.")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "LeaderboardServer"
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        parameters = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        try:
+            status, answer = 200, self.server.service.query(url.path, parameters)
+        except KeyError as error:
+            status, answer = 404, {"error": str(error.args[0]) if error.args else "not found"}
+        except ValueError as error:
+            status, answer = 400, {"error": str(error)}
+        body = json.dumps(answer).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        return
+
+
+class LeaderboardServer(ThreadingHTTPServer):
+    """
+    HTTP server exposing a `LeaderboardService`.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, service: LeaderboardService, host: str = "127.0.0.1", port: int = 8000):
+        """
+        Constructor.
+
+        Args:
+            service (LeaderboardService): Service answering queries.
+            host (str): Host to bind.
+            port (int): Port to bind, 0 for any free port.
+        """
+        super().__init__((host, port), _Handler)
+        self.service = service
+
+
+def main(argv: list[str] | None = None) -> None:
+    """
+    Command line entry point.
+
+    Args:
+        argv (list[str] | None): Command line arguments, defaults to `sys.argv`.
+    """
+    parser = argparse.ArgumentParser(description="Serve leaderboard queries from the results of a run.")
+    parser.add_argument("root", type=Path, help="Run directory, or directory of runs with a LATEST marker.")
+    parser.add_argument("--host", default="127.0.0.1", help="Host to bind.")
+    parser.add_argument("-p", "--port", type=int, default=8000, help="Port to bind.")
+    parser.add_argument("--poll", type=float, default=5.0, help="Polling interval of the LATEST marker in seconds.")
+    args = parser.parse_args(argv)
+
+    service = LeaderboardService(args.root)
+    service.watch(args.poll)
+    with LeaderboardServer(service, host=args.host, port=args.port) as server:
+        print(f"Serving {service.store.run_dir} on http://{args.host}:{args.port}.")
+        server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,423 @@
+# SPDX-FileCopyrightText: 2025 Pôle d'Expertise de la Régulation Numérique <contact@peren.gouv.fr>
+#
+# SPDX-License-Identifier: MIT
+
+"""Incremental sync of the comparia datasets into a local store of Parquet shards."""
+
+import hashlib
+import json
+import os
+import uuid
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Protocol
+
+import polars as pl
+
+from rank_comparia.pipeline import RankingPipeline
+from rank_comparia.utils import CONVERSATION_COLUMNS, decode_model_names
+
+
+CONVERSATIONS = "ministere-culture/comparia-conversations"
+VOTES = "ministere-culture/comparia-votes"
+REACTIONS = "ministere-culture/comparia-reactions"
+# column identifying a row of each repository, rows already in the store are never added again
+KEYS = {CONVERSATIONS: "conversation_pair_id", VOTES: "conversation_pair_id", REACTIONS: "id"}
+
+
+class ShardSource(Protocol):
+    """
+    Source of versioned Parquet shards of the comparia repositories.
+    """
+
+    def revision(self, repository: str) -> str: ...
+
+    def shards(self, repository: str) -> dict[str, str]: ...
+
+    def fetch(self, repository: str, shard: str) -> Path: ...
+
+
+@dataclass
+class LocalShards:
+    """
+    Directory of Parquet shards standing in for the hub, with one sub-directory per repository
+    (e.g. `directory/comparia-votes/*.parquet`). The version of a shard is its size and
+    modification time, the revision of a repository is a hash of the versions of its shards.
+    """
+
+    directory: Path  # directory of the repositories
+
+    def shards(self, repository: str) -> dict[str, str]:
+        """
+        Shards of a repository.
+
+        Args:
+            repository (str): HF repository name.
+
+        Returns:
+            dict[str, str]: Version of each shard, by shard name.
+        """
+        return {
+            path.name: f"{path.stat().st_size}-{path.stat().st_mtime_ns}"
+            for path in sorted((self.directory / repository.split("/")[-1]).glob("*.parquet"))
+        }
+
+    def revision(self, repository: str) -> str:
+        """
+        Revision of a repository.
+
+        Args:
+            repository (str): HF repository name.
+
+        Returns:
+            str: Revision.
+        """
+        return hashlib.sha256(json.dumps(self.shards(repository), sort_keys=True).encode()).hexdigest()
+
+    def fetch(self, repository: str, shard: str) -> Path:
+        """
+        Local path of a shard.
+
+        Args:
+            repository (str): HF repository name.
+            shard (str): Shard name.
+
+        Returns:
+            Path: Parquet file.
+        """
+        return self.directory / repository.split("/")[-1] / shard
+
+
+@dataclass
+class HubShards:
+    """
+    Parquet shards of the repositories on the HuggingFace hub, identified by their content hash.
+    """
+
+    token: str | None = None  # token to download datasets from HuggingFace
+    _infos: dict = field(init=False, repr=False, default_factory=dict)
+
+    def _info(self, repository: str):
+        # one metadata request per repository and sync
+        if repository not in self._infos:
+            from huggingface_hub import HfApi
+
+            self._infos[repository] = HfApi(token=self.token).dataset_info(repository, files_metadata=True)
+        return self._infos[repository]
+
+    def revision(self, repository: str) -> str:
+        """
+        Revision of a repository, its last commit.
+
+        Args:
+            repository (str): HF repository name.
+
+        Returns:
+            str: Revision.
+        """
+        return self._info(repository).sha
+
+    def shards(self, repository: str) -> dict[str, str]:
+        """
+        Parquet shards of a repository.
+
+        Args:
+            repository (str): HF repository name.
+
+        Returns:
+            dict[str, str]: Content hash of each shard, by file name in the repository.
+        """
+        return {
+            sibling.rfilename: sibling.lfs.sha256 if sibling.lfs is not None else sibling.blob_id
+            for sibling in self._info(repository).siblings
+            if sibling.rfilename.endswith(".parquet")
+        }
+
+    def fetch(self, repository: str, shard: str) -> Path:
+        """
+        Download a shard, or find it in the HuggingFace cache.
+
+        Args:
+            repository (str): HF repository name.
+            shard (str): File name in the repository.
+
+        Returns:
+            Path: Parquet file.
+        """
+        from huggingface_hub import hf_hub_download
+
+        return Path(
+            hf_hub_download(
+                repository, shard, repo_type="dataset", revision=self.revision(repository), token=self.token
+            )
+        )
+
+
+@dataclass
+class RepositoryState:
+    """
+    What the store holds of a repository after the last sync.
+    """
+
+    revision: str | None = None  # revision of the repository
+    shards: dict[str, str] = field(default_factory=dict)  # version of each synced shard
+    n_rows: int = 0  # number of rows in the store
+    max_timestamp: str | None = None  # latest timestamp of the rows in the store, in ISO format
+    n_syncs: int = 0  # number of syncs that added rows
+
+
+def read_state(store_dir: Path) -> dict[str, RepositoryState]:
+    """
+    Read the sync state of a store.
+
+    Args:
+        store_dir (Path): Store directory.
+
+    Returns:
+        dict[str, RepositoryState]: State by repository.
+    """
+    path = store_dir / "sync_state.json"
+    if not path.exists():
+        return {}
+    return {repository: RepositoryState(**state) for repository, state in json.loads(path.read_text()).items()}
+
+
+def _write_state(store_dir: Path, state: dict[str, RepositoryState]) -> None:
+    _write_json(store_dir / "sync_state.json", {repository: asdict(value) for repository, value in state.items()})
+
+
+def _write_json(path: Path, content: dict) -> None:
+    temporary = path.parent / f".{path.name}.{uuid.uuid4().hex}.tmp"
+    temporary.write_text(json.dumps(content, indent=2))
+    os.replace(temporary, path)
+
+
+def _write_shard(data: pl.DataFrame, directory: Path) -> Path:
+    # numbered after the last shard on disk, shards written by an interrupted sync are never overwritten
+    indices = [int(path.stem.split("-")[-1]) for path in directory.glob("sync-*.parquet")]
+    path = directory / f"sync-{max(indices, default=0) + 1:06d}.parquet"
+    temporary = directory / f".{path.stem}.{uuid.uuid4().hex}.tmp"
+    data.write_parquet(temporary)
+    os.replace(temporary, path)
+    return path
+
+
+def sync_repository(source: ShardSource, repository: str, store_dir: Path, state: RepositoryState) -> pl.DataFrame:
+    """
+    Append the rows of a repository that are not in the store yet, reading only new or changed shards.
+
+    The store keeps one Parquet shard per sync in `store_dir/<repository name>/`, the layout read by
+    `utils.scan_comparia` (and `RankingPipeline(data_dir=store_dir)`). Shards are numbered after the
+    last one in the directory, so that a sync interrupted before writing its state is completed,
+    not overwritten, by the next one.
+
+    Args:
+        source (ShardSource): Source of the repository shards.
+        repository (str): HF repository name.
+        store_dir (Path): Store directory.
+        state (RepositoryState): State of the repository, updated in place.
+
+    Returns:
+        pl.DataFrame: New rows, empty if the repository did not change.
+    """
+    revision = source.revision(repository)
+    if revision == state.revision:
+        return pl.DataFrame()
+    shards = source.shards(repository)
+    changed = [shard for shard, version in shards.items() if state.shards.get(shard) != version]
+    directory = store_dir / repository.split("/")[-1]
+    key = KEYS[repository]
+
+    delta = pl.DataFrame()
+    if changed:
+        new = pl.concat([pl.scan_parquet(source.fetch(repository, shard)) for shard in changed], how="diagonal_relaxed")
+        if repository == CONVERSATIONS:
+            new = new.select(CONVERSATION_COLUMNS)
+        new = new.unique(subset=key, keep="first", maintain_order=True)
+        stored = list(directory.glob("*.parquet"))
+        if stored:
+            new = new.join(pl.scan_parquet(stored).select(key), on=key, how="anti")
+        delta = new.collect()
+
+    if not delta.is_empty():
+        directory.mkdir(parents=True, exist_ok=True)
+        _write_shard(delta, directory)
+    # read from disk, which also holds the rows of a sync interrupted before its state was written
+    stored = sorted(directory.glob("sync-*.parquet"))
+    if stored:
+        rows = pl.scan_parquet(stored)
+        state.n_syncs = len(stored)
+        state.n_rows = rows.select(pl.len()).collect().item()
+        if "timestamp" in rows.collect_schema():
+            state.max_timestamp = rows.select(pl.col("timestamp").max()).collect().item().isoformat()
+    state.revision = revision
+    state.shards = shards
+    return delta
+
+
+def sync_comparia(
+    source: ShardSource, store_dir: Path, repositories: list[str] | None = None
+) -> dict[str, pl.DataFrame]:
+    """
+    Sync comparia repositories, and `comparia-conversations`, into a local store.
+
+    Args:
+        source (ShardSource): Source of the repository shards, `HubShards` or `LocalShards`.
+        store_dir (Path): Store directory, see `sync_repository`.
+        repositories (list[str] | None): Votes and/or reactions repositories, both if None.
+
+    Returns:
+        dict[str, pl.DataFrame]: Rows of each repository that are new to the processing, with the
+            fields coming from `comparia-conversations` as in `utils.load_comparia`: rows added by
+            this sync whose conversation is in the store, and rows stored earlier whose conversation
+            was only added by this sync. Each row is thus returned exactly once.
+    """
+    repositories = repositories or [VOTES, REACTIONS]
+    store_dir.mkdir(parents=True, exist_ok=True)
+    state = read_state(store_dir)
+    deltas = {}
+    for repository in [CONVERSATIONS, *repositories]:
+        deltas[repository] = sync_repository(
+            source, repository, store_dir, state.setdefault(repository, RepositoryState())
+        )
+        print(f"Synced {len(deltas[repository])} new rows of {repository}.")
+    # the state is only written once all repositories are in the store
+    _write_state(store_dir, state)
+
+    new_conversations = deltas.pop(CONVERSATIONS)
+    if new_conversations.is_empty() and all(delta.is_empty() for delta in deltas.values()):
+        return {}
+    conversations = pl.scan_parquet(store_dir / "comparia-conversations" / "*.parquet")
+    new_ids = new_conversations.get_column("conversation_pair_id").to_list() if len(new_conversations) else []
+    pending = {}
+    for repository, delta in deltas.items():
+        stored = list((store_dir / repository.split("/")[-1]).glob("*.parquet"))
+        if not stored:
+            continue
+        key = KEYS[repository]
+        new_keys = delta.get_column(key).to_list() if len(delta) else []
+        rows = (
+            pl.scan_parquet(stored)
+            .filter(pl.col(key).is_in(new_keys) | pl.col("conversation_pair_id").is_in(new_ids))
+            .join(conversations, on="conversation_pair_id")
+            .collect()
+        )
+        if not rows.is_empty():
+            pending[repository] = rows
+    return pending
+
+
+def _pair_ids(paths: list[Path]) -> list[str]:
+    if not paths:
+        return []
+    return pl.scan_parquet(paths).select("conversation_pair_id").collect()["conversation_pair_id"].to_list()
+
+
+def read_processed(store_dir: Path) -> dict[str, list[str]]:
+    """
+    Read the store shards already processed into matches.
+
+    Args:
+        store_dir (Path): Store directory.
+
+    Returns:
+        dict[str, list[str]]: Names of the processed shards, by repository.
+    """
+    path = store_dir / "matches_state.json"
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text())
+
+
+def sync_matches(
+    source: ShardSource, store_dir: Path, include_votes: bool = True, include_reactions: bool = True
+) -> pl.DataFrame:
+    """
+    Sync comparia repositories into a local store, process their new rows into matches, and add
+    them to the processed matches of the store (`store_dir/matches/*.parquet`).
+
+    Rows to process are read from the store shards that are not recorded in
+    `store_dir/matches_state.json` yet, which is only written once their matches are stored: a sync
+    interrupted at any point is resumed by the next one. Every conversation pair touched by these
+    shards is processed again from all its stored rows, and its new matches replace the earlier
+    ones. Reactions to a pair synced in different runs thus give the same match as a full
+    processing of the store.
+
+    Args:
+        source (ShardSource): Source of the repository shards.
+        store_dir (Path): Store directory.
+        include_votes (bool): Whether to sync votes.
+        include_reactions (bool): Whether to sync reactions.
+
+    Returns:
+        pl.DataFrame: New or updated processed matches, with decoded model names, empty without new
+            rows.
+    """
+    repositories = [repository for repository, used in ((VOTES, include_votes), (REACTIONS, include_reactions)) if used]
+    sync_comparia(source, store_dir, repositories)
+    processed = read_processed(store_dir)
+    shards = {
+        repository: sorted((store_dir / repository.split("/")[-1]).glob("sync-*.parquet"))
+        for repository in [CONVERSATIONS, *repositories]
+    }
+    fresh = {
+        repository: [path for path in paths if path.name not in processed.get(repository, [])]
+        for repository, paths in shards.items()
+    }
+    if not any(fresh.values()):
+        return pl.DataFrame()
+
+    # pairs whose conversation or rows are new, processed again from all their rows
+    raw_data = {}
+    new_ids = _pair_ids(fresh[CONVERSATIONS])
+    for repository in repositories:
+        if not (shards[CONVERSATIONS] and shards[repository]):
+            continue
+        rows = (
+            pl.scan_parquet(shards[repository])
+            .filter(pl.col("conversation_pair_id").is_in(_pair_ids(fresh[repository]) + new_ids))
+            .join(pl.scan_parquet(shards[CONVERSATIONS]), on="conversation_pair_id")
+            .collect()
+        )
+        if not rows.is_empty():
+            raw_data[repository] = rows
+
+    matches = pl.DataFrame()
+    if raw_data:
+        matches = decode_model_names(
+            RankingPipeline(
+                method="ml",
+                include_votes=VOTES in raw_data,
+                include_reactions=REACTIONS in raw_data,
+                bootstrap_samples=0,
+                mean_how="token",
+                raw_data=raw_data,
+            ).matches
+        )
+    directory = store_dir / "matches"
+    directory.mkdir(parents=True, exist_ok=True)
+    earlier = sorted(directory.glob("sync-*.parquet"))
+    if not matches.is_empty():
+        _write_shard(matches, directory)
+    # earlier matches of the processed pairs are replaced, including those of an interrupted sync
+    replaced = [
+        (pl.col("source") == repository.split("-")[-1])
+        & pl.col("conversation_pair_id").is_in(rows["conversation_pair_id"].unique().to_list())
+        for repository, rows in raw_data.items()
+    ]
+    for path in earlier if replaced else []:
+        stored = pl.read_parquet(path)
+        kept = stored.filter(~pl.any_horizontal(replaced))
+        if len(kept) == len(stored):
+            continue
+        if kept.is_empty():
+            path.unlink()
+            continue
+        temporary = directory / f".{path.stem}.{uuid.uuid4().hex}.tmp"
+        kept.write_parquet(temporary)
+        os.replace(temporary, path)
+    _write_json(
+        store_dir / "matches_state.json",
+        {repository: [path.name for path in paths] for repository, paths in shards.items()},
+    )
+    return matches
@@ -0,0 +1,193 @@
+# SPDX-FileCopyrightText: 2025 Pôle d'Expertise de la Régulation Numérique <contact@peren.gouv.fr>
+#
+# SPDX-License-Identifier: MIT
+
+"""Temporal rankings from prefix-summed pairwise counts."""
+
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+import numpy as np
+import polars as pl
+
+from rank_comparia.maximum_likelihood import fit_bradley_terry
+from rank_comparia.utils import encode_model_names
+
+
+@dataclass
+class PairwiseCountCube:
+    """
+    Cumulative pairwise points by day.
+
+    `cumulative[d, i, j]` holds the points (2 per win, 1 per draw) of model i against model j
+    for all matches played strictly before `first_day + d` days, so that the counts of any
+    window of days are a difference of two slices.
+    """
+
+    models: list[str]
+    first_day: date
+    cumulative: np.ndarray
+
+    @property
+    def n_days(self) -> int:
+        """
+        Number of days covered by the cube.
+
+        Returns:
+            int: Number of days.
+        """
+        return self.cumulative.shape[0] - 1
+
+    @property
+    def end_day(self) -> date:
+        """
+        First day after the last day covered by the cube.
+
+        Returns:
+            date: Exclusive end day.
+        """
+        return self.first_day + timedelta(days=self.n_days)
+
+    def _day_index(self, day: date | None, default: int) -> int:
+        if day is None:
+            return default
+        return min(max((day - self.first_day).days, 0), self.n_days)
+
+    def window(self, start: date | None = None, end: date | None = None) -> np.ndarray:
+        """
+        Pairwise points for matches played in [start, end).
+
+        Args:
+            start (date | None): First day of the window, None for the beginning of the data.
+            end (date | None): Exclusive last day of the window, None for the end of the data.
+
+        Returns:
+            np.ndarray: Square matrix of pairwise points.
+        """
+        start_index = self._day_index(start, default=0)
+        end_index = self._day_index(end, default=self.n_days)
+        return self.cumulative[max(end_index, start_index)] - self.cumulative[start_index]
+
+
+def build_count_cube(matches: pl.DataFrame) -> PairwiseCountCube:
+    """
+    Build cumulative per-day pairwise counts from processed matches.
+
+    Args:
+        matches (pl.DataFrame): Matches with columns "model_a", "model_b", "score" and "timestamp".
+
+    Returns:
+        PairwiseCountCube: Cumulative counts.
+    """
+    matches = matches.filter(pl.col("model_a") != pl.col("model_b"), pl.col("timestamp").is_not_null())
+    if not isinstance(matches.schema["model_a"], pl.Enum):
+        matches = encode_model_names(matches)
+    models: list[str] = matches.schema["model_a"].categories.to_list()  # type: ignore
+    if matches.is_empty():
+        return PairwiseCountCube(models=models, first_day=date.today(), cumulative=np.zeros((1, 0, 0)))
+    n_models = len(models)
+
+    days = matches["timestamp"].dt.date()
+    first_day: date = days.min()  # type: ignore
+    encoded = matches.select(
+        day=(days - first_day).dt.total_days(),
+        a=pl.col("model_a").to_physical().cast(pl.Int64),
+        b=pl.col("model_b").to_physical().cast(pl.Int64),
+        score=pl.col("score").cast(pl.Int64),
+    )
+    day, a, b, score = (encoded[column].to_numpy() for column in ("day", "a", "b", "score"))
+    n_days = int(day.max()) + 1
+
+    # a's points are the score value (2 for a win, 1 for a draw), b gets the rest
+    cells = np.concatenate([(day * n_models + a) * n_models + b, (day * n_models + b) * n_models + a])
+    points = np.concatenate([score, 2 - score])
+    cumulative = np.zeros((n_days + 1, n_models, n_models))
+    cumulative[1:] = np.bincount(cells, weights=points, minlength=n_days * n_models * n_models).reshape(
+        n_days, n_models, n_models
+    )
+    np.cumsum(cumulative, axis=0, out=cumulative)
+    return PairwiseCountCube(models=models, first_day=first_day, cumulative=cumulative)
+
+
+def period_windows(
+    cube: PairwiseCountCube, every: str = "1mo", window_days: int | None = None
+) -> list[tuple[date | None, date]]:
+    """
+    List windows ending at each period boundary of the data.
+
+    Args:
+        cube (PairwiseCountCube): Cumulative counts.
+        every (str): Period between two leaderboards, as a polars interval (e.g. "1mo", "1w").
+        window_days (int | None): Length of rolling windows in days, None for expanding windows
+            ("leaderboard as of").
+
+    Returns:
+        list[tuple[date | None, date]]: (start, exclusive end) of each window.
+    """
+    boundaries = pl.date_range(
+        pl.lit(cube.first_day).dt.truncate(every).dt.offset_by(every),
+        pl.lit(cube.end_day),
+        interval=every,
+        eager=True,
+    ).to_list()
+    ends = sorted(set(boundaries) | {cube.end_day})
+    return [(None if window_days is None else end - timedelta(days=window_days), end) for end in ends]
+
+
+def rank_windows(
+    cube: PairwiseCountCube,
+    windows: list[tuple[date | None, date]],
+    scale: int = 400,
+    default_score: float = 1000.0,
+    max_iter: int = 300,
+) -> pl.DataFrame:
+    """
+    Fit a Bradley-Terry model on each window, warm-started from the previous window.
+
+    Args:
+        cube (PairwiseCountCube): Cumulative counts.
+        windows (list[tuple[date | None, date]]): (start, exclusive end) of each window.
+        scale (int): Scale parameter.
+        default_score (float): Base score used.
+        max_iter (int): Max number of iterations for the LBFGS optimizer.
+
+    Returns:
+        pl.DataFrame: Scores with columns "window_start", "window_end", "model_name", "score", "n_match" and "rank".
+    """
+    coef = np.zeros(len(cube.models))
+    frames = []
+    for start, end in windows:
+        wins = cube.window(start, end)
+        # number of matches of each model (points are 2 per match)
+        n_match = (wins + wins.T).sum(axis=1) / 2
+        played = np.flatnonzero(n_match)
+        if len(played) == 0:
+            continue
+        coef[played] = fit_bradley_terry(wins[np.ix_(played, played)], init=coef[played], max_iter=max_iter)
+        frames.append(
+            pl.DataFrame(
+                {
+                    "window_start": [start or cube.first_day] * len(played),
+                    "window_end": [end] * len(played),
+                    "model_name": [cube.models[index] for index in played],
+                    "score": scale * coef[played] + default_score,
+                    "n_match": n_match[played].astype(int),
+                }
+            )
+        )
+    if not frames:
+        return pl.DataFrame(
+            schema={
+                "window_start": pl.Date,
+                "window_end": pl.Date,
+                "model_name": pl.String,
+                "score": pl.Float64,
+                "n_match": pl.Int64,
+                "rank": pl.UInt32,
+            }
+        )
+    return (
+        pl.concat(frames)
+        .with_columns(pl.col("score").rank("ordinal", descending=True).over("window_end").alias("rank"))
+        .sort("window_end", "rank")
+    )
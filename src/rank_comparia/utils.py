@@ -2,13 +2,30 @@
 #
 # SPDX-License-Identifier: MIT
 
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Literal
+from typing import Literal, TypeVar
 
-import datasets
+import numpy as np
 import polars as pl
 
 
+# eager or lazy frame, stages accepting both return the same kind of frame
+Frame = TypeVar("Frame", pl.DataFrame, pl.LazyFrame)
+
+# columns of `comparia-conversations` joined to votes and reactions
+CONVERSATION_COLUMNS = [
+    "conversation_pair_id",
+    "categories",
+    "model_a_active_params",
+    "total_conv_a_output_tokens",
+    "total_conv_a_kwh",
+    "model_b_active_params",
+    "total_conv_b_output_tokens",
+    "total_conv_b_kwh",
+]
+
+
 def save_data(data: pl.DataFrame, title: str, save_path: Path) -> None:
     """
     Save polars DataFrame as a csv file.
@@ -21,12 +38,86 @@ def save_data(data: pl.DataFrame, title: str, save_path: Path) -> None:
     data.write_csv(file=save_path / f"{title}.csv", separator=";")
 
 
+def model_enum(matches: pl.DataFrame) -> pl.Enum:
+    """
+    Build the dictionary of model names found in processed matches, as a polars Enum
+    sorted alphabetically.
+
+    Args:
+        matches (pl.DataFrame): Matches with columns "model_a" and "model_b".
+
+    Returns:
+        pl.Enum: Model names data type.
+    """
+    names = pl.concat([matches["model_a"].cast(pl.String), matches["model_b"].cast(pl.String)])
+    return pl.Enum(names.drop_nulls().unique().sort())
+
+
+def encode_model_names(matches: pl.DataFrame, dtype: pl.Enum | None = None) -> pl.DataFrame:
+    """
+    Encode "model_a" and "model_b" columns with a model names Enum.
+
+    Args:
+        matches (pl.DataFrame): Matches with columns "model_a" and "model_b".
+        dtype (pl.Enum | None): Model names data type, built from the matches if None.
+
+    Returns:
+        pl.DataFrame: Matches with encoded model names.
+    """
+    if dtype is None:
+        dtype = model_enum(matches)
+    return matches.with_columns(pl.col("model_a", "model_b").cast(pl.String).cast(dtype))
+
+
+def decode_model_names(data: pl.DataFrame) -> pl.DataFrame:
+    """
+    Decode all Enum columns back to strings, before exporting data or joining it with external data.
+
+    Args:
+        data (pl.DataFrame): Data with Enum encoded model names.
+
+    Returns:
+        pl.DataFrame: Data with string model names.
+    """
+    return data.with_columns(pl.col(pl.Enum).cast(pl.String))
+
+
+def _fetch_dataset(
+    repository: str, token: str | None, local_dir: Path | None, columns: list[str] | None, **kwargs
+) -> pl.DataFrame:
+    """
+    Fetch or prepare one dataset with `datasets.load_dataset`, and wrap the Arrow table backing its
+    memory-mapped cache files without copying it.
+
+    Args:
+        repository (str): HF repository name.
+        token (str | None): Token to download datasets from HuggingFace.
+        local_dir (Path | None): Directory holding one sub-directory of data files per repository,
+            loaded instead of the hub if set.
+        columns (list[str] | None): Columns to keep, all if None.
+
+    Returns:
+        pl.DataFrame: Dataset.
+    """
+    # imported here since `datasets` is slow to import and only needed to fetch data
+    import datasets
+
+    path = repository if local_dir is None else str(local_dir / repository.split("/")[-1])
+    dataset = datasets.load_dataset(path, split="train", token=token, **kwargs)
+    if columns is not None:
+        # dropping columns only changes the schema of the table, before any conversion
+        dataset = dataset.select_columns(columns)  # type: ignore
+    # slices of the memory-mapped table, converted without copy where polars shares the Arrow layout
+    return pl.from_arrow(dataset.with_format("arrow")[:], rechunk=False)  # type: ignore
+
+
 def load_comparia(
     repository: Literal[
         "ministere-culture/comparia-reactions",
         "ministere-culture/comparia-votes",
     ],
     token: str | None,
+    local_dir: Path | None = None,
     **kwargs,
 ) -> pl.DataFrame:
     """
@@ -34,45 +125,81 @@ def load_comparia(
     with a category field coming from `comparia-conversations`.
     Extra keyword arguments will be forwarded to `datasets.load_dataset`.
 
+    Both datasets are fetched (or prepared from the local cache) concurrently.
+
     Args:
         repository (Literal[
             "ministere-culture/comparia-reactions",
             "ministere-culture/comparia-votes",
         ]): HF repository name.
+        token (str | None): Token to download datasets from HuggingFace.
+        local_dir (Path | None): Directory holding a copy of the repositories, one sub-directory of
+            data files per repository (e.g. `local_dir/comparia-votes/*.parquet`), loaded instead of
+            the hub if set.
 
     Returns:
         pl.DataFrame: Dataset.
     """
     # environment variable HF_HOME must be set
     # and authentication to the hub is necessary
-    data: pl.DataFrame = datasets.load_dataset(
-        repository,
-        split="train",
-        token=token,
-        **kwargs,
-    ).to_polars()  # type: ignore
-
-    print(**kwargs)
-
-    # add categories column
-    conversations: pl.DataFrame = datasets.load_dataset(
-        "ministere-culture/comparia-conversations", split="train", token=token, **kwargs
-    ).to_polars()  # type: ignore
-    conversations = conversations.select(
-        [
-            "conversation_pair_id",
-            "categories",
-            "model_a_active_params",
-            "total_conv_a_output_tokens",
-            "total_conv_a_kwh",
-            "model_b_active_params",
-            "total_conv_b_output_tokens",
-            "total_conv_b_kwh",
-        ]
-    )
-    data = data.join(conversations, on="conversation_pair_id")
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        data = executor.submit(_fetch_dataset, repository, token, local_dir, None, **kwargs)
+        conversations = executor.submit(
+            _fetch_dataset, "ministere-culture/comparia-conversations", token, local_dir, CONVERSATION_COLUMNS, **kwargs
+        )
+        # add categories column
+        return data.result().join(conversations.result(), on="conversation_pair_id")
 
-    return data
+
+def scan_comparia(
+    repository: Literal[
+        "ministere-culture/comparia-reactions",
+        "ministere-culture/comparia-votes",
+    ],
+    data_dir: Path,
+) -> pl.LazyFrame:
+    """
+    Lazily scan a local Parquet copy of `comparia-reactions` or `comparia-votes`, with the
+    fields coming from `comparia-conversations`. Each dataset is a sub-directory of `data_dir`
+    named after its repository (e.g. `data_dir/comparia-votes/*.parquet`).
+
+    Args:
+        repository (Literal[
+            "ministere-culture/comparia-reactions",
+            "ministere-culture/comparia-votes",
+        ]): HF repository name.
+        data_dir (Path): Directory holding the Parquet files.
+
+    Returns:
+        pl.LazyFrame: Dataset.
+    """
+    data = pl.scan_parquet(data_dir / repository.split("/")[-1] / "*.parquet")
+    conversations = pl.scan_parquet(data_dir / "comparia-conversations" / "*.parquet").select(CONVERSATION_COLUMNS)
+    return data.join(conversations, on="conversation_pair_id")
+
+
+def collect(frame: pl.LazyFrame, streaming: bool = False, memory_budget: int | None = None) -> pl.DataFrame:
+    """
+    Collect a lazy frame, either in memory or with the streaming engine.
+
+    Args:
+        frame (pl.LazyFrame): Lazy frame.
+        streaming (bool): Whether to use the streaming engine.
+        memory_budget (int | None): Approximate memory in bytes that the streaming engine may hold
+            at once, used to size its chunks. Polars default chunk size if None.
+
+    Returns:
+        pl.DataFrame: Collected frame.
+    """
+    if not streaming:
+        return frame.collect()
+    if memory_budget is None:
+        return frame.collect(engine="streaming")
+    # rough row width: 8 bytes for numbers, 32 bytes for strings and nested values
+    row_size = sum(8 if dtype.is_numeric() else 32 for dtype in frame.collect_schema().dtypes())
+    chunk_size = max(1_000, memory_budget // (max(row_size, 1) * pl.thread_pool_size()))
+    with pl.Config(streaming_chunk_size=chunk_size):
+        return frame.collect(engine="streaming")
 
 
 # List of categories in the `comparia-conversation` dataset (column "categories")
@@ -131,3 +258,95 @@ categories: list[str] = [
     "Engineering",
     "Ethics",
 ]
+
+# Bit of each category in the "category_mask" column of processed matches
+category_bit: dict[str, int] = {category: 1 << index for index, category in enumerate(categories)}
+
+
+def category_bits(selected: str | list[str]) -> int:
+    """
+    Bitmask of one or several categories.
+
+    Args:
+        selected (str | list[str]): Category or list of categories.
+
+    Returns:
+        int: Bitmask, matches having any of the selected categories have a non-zero
+            intersection with it.
+    """
+    if isinstance(selected, str):
+        selected = [selected]
+    unknown = [category for category in selected if category not in category_bit]
+    if unknown:
+        raise ValueError(f"Categories {unknown} do not exist in data.")
+    mask = 0
+    for category in selected:
+        mask |= category_bit[category]
+    return mask
+
+
+def category_mask(column: str = "categories") -> pl.Expr:
+    """
+    Expression encoding a list of categories as a u64 bitmask using the `categories` vocabulary.
+    Categories outside of the vocabulary are ignored.
+
+    Args:
+        column (str): Name of the list of categories column.
+
+    Returns:
+        pl.Expr: Bitmask expression.
+    """
+    return (
+        pl.col(column)
+        .list.eval(pl.element().replace_strict(category_bit, default=0, return_dtype=pl.UInt64).bitwise_or())
+        .list.first()
+        .fill_null(0)
+        .alias("category_mask")
+    )
+
+
+def has_categories(selected: str | list[str]) -> pl.Expr:
+    """
+    Filter expression keeping matches having any of the selected categories.
+
+    Args:
+        selected (str | list[str]): Category or list of categories.
+
+    Returns:
+        pl.Expr: Boolean expression on the "category_mask" column.
+    """
+    return (pl.col("category_mask") & pl.lit(category_bits(selected), dtype=pl.UInt64)) != 0
+
+
+def mask_categories(column: str = "category_mask") -> pl.Expr:
+    """
+    Expression decoding a u64 bitmask back to the list of its categories, in vocabulary order.
+
+    Args:
+        column (str): Name of the bitmask column.
+
+    Returns:
+        pl.Expr: List of categories expression, aliased "categories".
+    """
+    return (
+        pl.concat_list(
+            pl.when((pl.col(column) & pl.lit(bit, dtype=pl.UInt64)) != 0).then(pl.lit(category))
+            for category, bit in category_bit.items()
+        )
+        .list.drop_nulls()
+        .alias("categories")
+    )
+
+
+def build_category_index(mask: np.ndarray) -> dict[str, np.ndarray]:
+    """
+    Build an inverted index from categories to row indices.
+
+    Args:
+        mask (np.ndarray): Category bitmasks of each row.
+
+    Returns:
+        dict[str, np.ndarray]: Row indices of each category.
+    """
+    mask = mask.astype(np.uint64)
+    return {category: np.flatnonzero(mask & np.uint64(bit)) for category, bit in category_bit.items()}
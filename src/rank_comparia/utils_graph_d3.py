@@ -3,11 +3,15 @@
 # SPDX-License-Identifier: MIT
 
 import json
-from typing import Literal
+from typing import TYPE_CHECKING, Literal
 
-import networkx as nx
 import polars as pl
-from networkx.readwrite import json_graph
+
+from rank_comparia.metadata import MODELS_DATA_AUGMENTED, ModelRegistry, model_registry
+
+
+if TYPE_CHECKING:
+    import networkx as nx
 
 
 def get_df_source_sink_timestamp(df: pl.DataFrame, year: Literal[2024, 2025] | None) -> pl.DataFrame:
@@ -70,7 +74,9 @@ def get_df_source_sink_timestamp(df: pl.DataFrame, year: Literal[2024, 2025] | N
     return df
 
 
-def create_graph(df: pl.DataFrame, var_1_source: str, var_2_sink: str) -> nx.Graph:
+def create_graph(
+    df: pl.DataFrame, var_1_source: str, var_2_sink: str, registry: ModelRegistry | None = None
+) -> "nx.Graph":
     """
     Creates a graph, where the models in ComparIA are nodes and a link from
     model A to model B means that model A won a match (received a vote from
@@ -81,23 +87,27 @@ def create_graph(df: pl.DataFrame, var_1_source: str, var_2_sink: str) -> nx.Gra
         "sink_node_model_winner","source_node_model_loser", "month", "day", "year".
         var_1_source (str): column name with source node.
         var_2_sink (str): column name with sink node.
+        registry (ModelRegistry | None): Model metadata, the shared registry of
+        `metadata.MODELS_DATA_AUGMENTED` if None.
     Returns:
         G: Networkx graph object. Nodes and links have attributes: start_date
         (timestamp of the match) and end_date (max of timestamps).
     """
+    import networkx as nx
+
     unique_model_a = df[var_2_sink].unique().to_list()
     unique_model_b = df[var_1_source].unique().to_list()
     all_models = list(set(unique_model_a + unique_model_b))
     end_date = df["timestamp_iso"].max()
     G = nx.DiGraph()
-    editors = pl.read_json("../data/models_data_augmented.json")
+    registry = registry or model_registry(MODELS_DATA_AUGMENTED)
 
     for model in all_models:
         source_timestamps = df.filter(pl.col(var_1_source) == model).select(pl.col("timestamp_iso"))
         a = source_timestamps.min().item() if not source_timestamps.is_empty() else None
         b = source_timestamps.max().item() if not source_timestamps.is_empty() else None
-        if model in editors["model_name"].unique().to_list():
-            editor = editors.filter(pl.col("model_name") == model)["organization"].item()
+        metadata = registry.get(model)
+        editor = metadata["organization"] if metadata is not None else None
 
         G.add_node(model, start_date=min(a, b), end_date=end_date, model=model, editor=editor)  # type: ignore
 
@@ -134,6 +144,8 @@ def create_graph_json(df: pl.DataFrame, title: str, var1: str, var2: str):
     Returns:
         json file with nodes and edges.
     """
+    from networkx.readwrite import json_graph
+
     G = create_graph(df=df, var_1_source=var1, var_2_sink=var2)
 
     rencontres_comparIA_graph = json_graph.node_link_data(G)
@@ -5,9 +5,34 @@
 # This file is automatically imported by all tests.
 # Add your global fixtures here
 
+from unittest.mock import patch
+
+import polars as pl
 import pytest
 
 
+@pytest.fixture(name="conversations")
+def fixture_conversations():
+    return pl.read_parquet("tests/data/sample_comparia_conversations.parquet")
+
+
+@pytest.fixture(name="mock_load_comparia")
+def fixture_load_comparia(conversations):
+    """
+    Serve the sample datasets, joined with their conversations, in place of `load_comparia`.
+    """
+    datasets = {
+        f"ministere-culture/comparia-{name}": pl.read_parquet(f"tests/data/sample_comparia_{name}.parquet")
+        for name in ("votes", "reactions")
+    }
+
+    def _side_effect(repository, token=None):
+        return datasets[repository].join(conversations, on="conversation_pair_id", coalesce=True)
+
+    with patch("rank_comparia.pipeline.load_comparia", side_effect=_side_effect) as mock_fn:
+        yield mock_fn
+
+
 def pytest_sessionfinish(session: pytest.Session, exitstatus: int) -> None:
     """
     Remove errors when no tests where collected.
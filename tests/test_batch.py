@@ -0,0 +1,78 @@
+# SPDX-FileCopyrightText: 2025 Pôle d'Expertise de la Régulation Numérique <contact@peren.gouv.fr>
+#
+# SPDX-License-Identifier: MIT
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest.mock import patch
+
+import altair as alt
+import polars as pl
+import pytest
+from polars.testing import assert_frame_equal
+
+from rank_comparia.batch import BatchJob, load_jobs, run_batch
+from rank_comparia.preferences import get_preferences_data
+
+
+def test_load_jobs(tmp_path: Path):
+    config = tmp_path / "config.json"
+    config.write_text(
+        json.dumps(
+            {"jobs": [{"method": "ml"}, {"method": "elo_random", "include_reactions": False, "category": "Arts"}]}
+        )
+    )
+    jobs = load_jobs(config)
+    assert [job.directory_name for job in jobs] == ["ml_votes_reactions_all", "elo_random_votes_Arts"]
+
+    config.write_text(json.dumps([{"method": "ml"}, {"method": "ml"}]))
+    with pytest.raises(ValueError):
+        load_jobs(config)
+
+
+def test_run_batch_loads_data_once(mock_load_comparia, tmp_path: Path):
+    jobs = [
+        BatchJob(method="ml", include_reactions=False, bootstrap_samples=2),
+        BatchJob(method="elo_random", bootstrap_samples=2),
+        BatchJob(method="elo_random", include_reactions=False, category="Law & Justice", bootstrap_samples=2),
+    ]
+    results = run_batch(jobs, output_dir=tmp_path, max_workers=2, export_plots=False)
+
+    # each dataset is loaded once for all jobs
+    assert mock_load_comparia.call_count == 2
+    assert set(results) == {job.directory_name for job in jobs}
+    assert (tmp_path / "ml_votes_all" / "ml_scores.csv").exists()
+    assert (tmp_path / "elo_random_votes_reactions_all" / "elo_random_scores.csv").exists()
+    assert (tmp_path / "elo_random_votes_Law & Justice" / "elo_random_Law & Justice_scores.csv").exists()
+    assert json.loads((tmp_path / "ml_votes_all" / "job.json").read_text())["method"] == "ml"
+
+
+def test_run_batch_exports_without_loading_data_again(mock_load_comparia, conversations, tmp_path: Path):
+    jobs = [
+        BatchJob(method="ml", include_reactions=False, bootstrap_samples=2),
+        BatchJob(method="elo_random", bootstrap_samples=2),
+    ]
+    # jobs run in threads so that they see the mock, and charts are not rendered
+    with (
+        patch("rank_comparia.batch.ProcessPoolExecutor", lambda max_workers, mp_context: ThreadPoolExecutor()),
+        patch.object(alt.TopLevelMixin, "save"),
+    ):
+        run_batch(jobs, output_dir=tmp_path, export_plots=True)
+
+    assert sorted(call.args[0] for call in mock_load_comparia.call_args_list) == [
+        "ministere-culture/comparia-reactions",
+        "ministere-culture/comparia-votes",
+    ]
+    # reaction preferences are exported by the votes only job too, NaN ratios are null in JSON
+    expected = get_preferences_data(
+        *(
+            pl.read_parquet(f"tests/data/sample_comparia_{name}.parquet").join(
+                conversations, on="conversation_pair_id", coalesce=True
+            )
+            for name in ("votes", "reactions")
+        )
+    ).fill_nan(None)
+    for job in jobs:
+        preferences = pl.read_json(tmp_path / job.directory_name / "preferences.json")
+        assert_frame_equal(preferences, expected, check_dtypes=False)
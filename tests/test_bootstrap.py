@@ -0,0 +1,104 @@
+# SPDX-FileCopyrightText: 2025 Pôle d'Expertise de la Régulation Numérique <contact@peren.gouv.fr>
+#
+# SPDX-License-Identifier: MIT
+
+import threading
+
+import numpy as np
+import pytest
+from polars.testing import assert_frame_equal
+
+from rank_comparia.bootstrap import BootstrapQueue, decode_matches, encode_matches, run_worker
+from rank_comparia.elo import ELORanker
+from rank_comparia.maximum_likelihood import MaximumLikelihoodRanker
+from rank_comparia.ranker import Match, MatchScore
+
+
+@pytest.fixture(name="matches")
+def fixture_matches():
+    rng = np.random.default_rng(0)
+    strengths = rng.normal(0, 0.5, 6)
+    matches = []
+    for _ in range(300):
+        a, b = rng.choice(6, 2, replace=False)
+        score = MatchScore.A if rng.random() < 1 / (1 + 10 ** (strengths[b] - strengths[a])) else MatchScore.B
+        matches.append(Match(model_a=f"model_{a}", model_b=f"model_{b}", score=score))
+    return matches
+
+
+def test_encode_matches(matches):
+    assert decode_matches(encode_matches(matches)) == matches
+
+
+def test_seeded_bootstrap_is_reproducible(matches):
+    ranker = ELORanker(bootstrap_samples=5)
+    assert_frame_equal(
+        ranker.compute_bootstrap_scores(matches, seed=1), ranker.compute_bootstrap_scores(matches, seed=1)
+    )
+    assert not ranker.compute_bootstrap_scores(matches, seed=2).equals(ranker.compute_bootstrap_scores(matches, seed=1))
+
+
+@pytest.mark.parametrize("ranker", [ELORanker(bootstrap_samples=7), MaximumLikelihoodRanker(bootstrap_samples=7)])
+def test_local_workers_match_single_node(ranker, matches, tmp_path):
+    expected = ranker.compute_bootstrap_scores(matches, seed=3)
+    queue = BootstrapQueue(tmp_path, n_workers=2, block_size=3, poll_interval=0.05)
+    assert_frame_equal(ranker.compute_bootstrap_scores(matches, seed=3, queue=queue), expected)
+    # merged jobs are removed from the queue
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_external_worker(matches, tmp_path):
+    ranker = ELORanker(bootstrap_samples=4)
+    expected = ranker.compute_bootstrap_scores(matches, seed=0)
+
+    results = {}
+    coordinator = threading.Thread(
+        target=lambda: results.update(
+            scores=ranker.compute_bootstrap_scores(matches, seed=0, queue=BootstrapQueue(tmp_path, poll_interval=0.05))
+        )
+    )
+    coordinator.start()
+    while coordinator.is_alive():
+        run_worker(tmp_path)
+        coordinator.join(timeout=0.05)
+    assert_frame_equal(results["scores"], expected)
+
+
+def test_unseeded_queued_runs_draw_different_samples(matches, tmp_path):
+    ranker = ELORanker(bootstrap_samples=4)
+    replicates = []
+    for _ in range(2):
+        coordinator = threading.Thread(
+            target=ranker.compute_bootstrap_scores, args=(matches,), kwargs={"queue": BootstrapQueue(tmp_path)}
+        )
+        coordinator.start()
+        while coordinator.is_alive():
+            run_worker(tmp_path)
+            coordinator.join(timeout=0.05)
+        replicates.append(ranker.bootstrap_replicates)
+    assert not replicates[0].equals(replicates[1])
+
+
+def test_queue_recovers_dead_workers(matches, tmp_path):
+    ranker = ELORanker(bootstrap_samples=4)
+    queue = BootstrapQueue(tmp_path, block_size=2, poll_interval=0.01, stale_after=0.1)
+    results = {}
+    coordinator = threading.Thread(target=lambda: results.update(scores=queue.run(ranker, matches, seed=0)))
+    coordinator.start()
+    while not any(path.is_dir() and not path.name.startswith(".") for path in tmp_path.iterdir()):
+        coordinator.join(timeout=0.01)
+    # a worker claims an item and dies
+    job_dir = next(path for path in tmp_path.iterdir() if not path.name.startswith("."))
+    item = sorted((job_dir / "queue").iterdir())[0]
+    item.rename(job_dir / "claimed" / item.name)
+    while coordinator.is_alive():
+        run_worker(tmp_path)
+        coordinator.join(timeout=0.05)
+    assert len(results["scores"]) == 4
+
+
+def test_queue_times_out_without_workers(matches, tmp_path):
+    queue = BootstrapQueue(tmp_path, poll_interval=0.01, timeout=0.1)
+    with pytest.raises(TimeoutError):
+        queue.run(ELORanker(bootstrap_samples=4), matches, seed=0)
+    assert list(tmp_path.iterdir()) == []
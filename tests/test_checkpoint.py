@@ -0,0 +1,133 @@
+# SPDX-FileCopyrightText: 2025 Pôle d'Expertise de la Régulation Numérique <contact@peren.gouv.fr>
+#
+# SPDX-License-Identifier: MIT
+
+import random
+from unittest.mock import patch
+
+import numpy as np
+import polars as pl
+import pytest
+from polars.testing import assert_frame_equal
+
+from rank_comparia.checkpoint import BootstrapCheckpoint
+from rank_comparia.elo import ELORanker, OrderedELORanker
+from rank_comparia.pipeline import RankingPipeline
+from rank_comparia.ranker import Match, MatchScore
+
+
+class Interrupted(Exception):
+    pass
+
+
+def interrupt_after(ranker: ELORanker, n_calls: int) -> ELORanker:
+    """
+    Make a ranker fail after a number of score computations, like a killed job.
+    """
+    compute_scores = ranker.compute_scores
+
+    def _compute_scores(matches):
+        nonlocal n_calls
+        if n_calls == 0:
+            raise Interrupted
+        n_calls -= 1
+        return compute_scores(matches)
+
+    ranker.compute_scores = _compute_scores  # type: ignore
+    return ranker
+
+
+@pytest.fixture(name="matches")
+def fixture_matches():
+    rng = np.random.default_rng(0)
+    matches = []
+    for _ in range(200):
+        a, b = rng.choice(5, 2, replace=False)
+        matches.append(Match(f"model_{a}", f"model_{b}", MatchScore(int(rng.choice([0, 1, 2])))))
+    return matches
+
+
+@pytest.mark.parametrize("ranker_class", [ELORanker, OrderedELORanker])
+@pytest.mark.parametrize("seed", [1, None])
+def test_interrupted_bootstrap_resumes(tmp_path, matches, ranker_class, seed):
+    checkpoint = BootstrapCheckpoint(tmp_path, every=3)
+    random.seed(0)
+    expected = ranker_class(bootstrap_samples=10).compute_bootstrap_scores(matches, seed=seed)
+
+    random.seed(0)
+    with pytest.raises(Interrupted):
+        interrupt_after(ranker_class(bootstrap_samples=10), 7).compute_bootstrap_scores(
+            matches, seed=seed, checkpoint=checkpoint
+        )
+    rows, _ = checkpoint.load_rows()
+    assert len(rows) == 6
+
+    # the global random generator moved on, its state is restored from the checkpoint
+    random.seed(1)
+    resumed = ranker_class(bootstrap_samples=10)
+    assert_frame_equal(resumed.compute_bootstrap_scores(matches, seed=seed, checkpoint=checkpoint), expected)
+
+
+def test_finished_result_round_trip(tmp_path):
+    checkpoint = BootstrapCheckpoint(tmp_path)
+    assert checkpoint.load_result() is None
+    checkpoint.save_block([{"a": 1.0}, {"a": 2.0, "b": 3.0}], 0, None)
+    scores = pl.DataFrame({"model_name": ["a"], "median": [1.5]})
+    replicates = pl.DataFrame({"replicate": [0, 1], "model_name": ["a", "a"], "score": [1.0, 2.0]})
+    checkpoint.save_result(scores, replicates)
+    assert_frame_equal(checkpoint.load_result()[0], scores)  # type: ignore
+    assert_frame_equal(checkpoint.load_result()[1], replicates)  # type: ignore
+    # blocks are dropped once the result is persisted
+    assert checkpoint.load_rows() == ([], None)
+    assert not list(tmp_path.glob("block-*"))
+
+
+def test_pipeline_reuses_finished_categories(mock_load_comparia, tmp_path):
+    pipeline = RankingPipeline(
+        method="elo_random",
+        include_votes=True,
+        include_reactions=False,
+        bootstrap_samples=4,
+        mean_how="match",
+        seed=0,
+        checkpoint_dir=tmp_path,
+    )
+    first = pipeline.run_all_categories(min_matches=1)
+    assert first
+
+    with patch.object(ELORanker, "compute_scores", side_effect=AssertionError("recomputed")):
+        again = RankingPipeline(
+            method="elo_random",
+            include_votes=True,
+            include_reactions=False,
+            bootstrap_samples=4,
+            mean_how="match",
+            seed=0,
+            checkpoint_dir=tmp_path,
+            processed_matches=pipeline.matches,
+        ).run_all_categories(min_matches=1)
+    assert again.keys() == first.keys()
+    for category, scores in first.items():
+        assert_frame_equal(again[category], scores)
+
+
+def test_pipeline_checkpoint_keyed_by_matches(mock_load_comparia, tmp_path):
+    settings = dict(
+        method="elo_random",
+        include_votes=True,
+        include_reactions=False,
+        bootstrap_samples=4,
+        mean_how="match",
+        seed=0,
+        checkpoint_dir=tmp_path,
+    )
+    pipeline = RankingPipeline(**settings)
+    pipeline.run()
+
+    # as many matches, with other outcomes
+    flipped = pipeline.matches.with_columns(score=2 - pl.col("score"))
+    other = RankingPipeline(**settings, processed_matches=flipped)
+    assert other.matches_digest != pipeline.matches_digest
+    with patch.object(ELORanker, "compute_scores", side_effect=AssertionError("recomputed")):
+        with pytest.raises(AssertionError, match="recomputed"):
+            other.run()
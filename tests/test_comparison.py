@@ -0,0 +1,98 @@
+# SPDX-FileCopyrightText: 2025 Pôle d'Expertise de la Régulation Numérique <contact@peren.gouv.fr>
+#
+# SPDX-License-Identifier: MIT
+
+
+import numpy as np
+import pytest
+from polars.testing import assert_frame_equal
+
+from rank_comparia.bootstrap import encode_matches
+from rank_comparia.comparison import bootstrap_rankers
+from rank_comparia.elo import ELORanker, OrderedELORanker
+from rank_comparia.maximum_likelihood import MaximumLikelihoodRanker
+from rank_comparia.pipeline import RankingPipeline
+from rank_comparia.ranker import Match, MatchScore
+
+
+@pytest.fixture(name="matches")
+def fixture_matches():
+    rng = np.random.default_rng(0)
+    strengths = rng.normal(0, 0.5, 6)
+    matches = []
+    for _ in range(300):
+        a, b = rng.choice(6, 2, replace=False)
+        score = MatchScore.A if rng.random() < 1 / (1 + 10 ** (strengths[b] - strengths[a])) else MatchScore.B
+        matches.append(Match(model_a=f"model_{a}", model_b=f"model_{b}", score=score))
+    return matches
+
+
+@pytest.mark.parametrize(
+    "ranker",
+    [ELORanker(), OrderedELORanker(), MaximumLikelihoodRanker(), MaximumLikelihoodRanker(solver="sparse")],
+    ids=["elo_random", "elo_ordered", "ml", "ml_sparse"],
+)
+def test_encoded_scores_match_scores(matches, ranker):
+    encoded = encode_matches(matches)
+    expected = ranker.compute_scores(matches)
+    scores = ranker.compute_encoded_scores(
+        encoded["models"].tolist(), encoded["model_a"], encoded["model_b"], encoded["score"]
+    )
+    assert scores.keys() == expected.keys()
+    assert np.allclose([scores[model] for model in expected], list(expected.values()), atol=0.1)
+
+
+def test_rankers_share_samples(matches):
+    comparison = bootstrap_rankers(
+        {"first": ELORanker(bootstrap_samples=10), "second": ELORanker(bootstrap_samples=10)}, matches, seed=3
+    )
+    # identical rankers on identical samples rank models identically
+    assert (comparison["rank_diff_first_second"] == 0).all()
+    assert (comparison["rank_diff_first_second_p2.5"] == 0).all()
+    assert (comparison["rank_diff_first_second_p97.5"] == 0).all()
+
+    # samples are those of a seeded bootstrap of each ranker
+    ordered = OrderedELORanker(bootstrap_samples=10)
+    bootstrap_rankers({"elo": ELORanker(bootstrap_samples=10), "ordered": ordered}, matches, seed=3)
+    shared = ordered.bootstrap_replicates
+    ordered.compute_bootstrap_scores(matches, seed=3)
+    assert_frame_equal(shared, ordered.bootstrap_replicates)
+
+
+def test_paired_rank_differences(matches):
+    comparison = bootstrap_rankers(
+        {"elo": ELORanker(bootstrap_samples=20), "ml": MaximumLikelihoodRanker(bootstrap_samples=20)}, matches, seed=0
+    )
+    assert comparison.columns == [
+        "model_name",
+        *[
+            f"{name}_{column}"
+            for name in ("elo", "ml")
+            for column in ("median", "p2.5", "p97.5", "rank", "rank_p2.5", "rank_p97.5")
+        ],
+        "rank_diff_elo_ml",
+        "rank_diff_elo_ml_p2.5",
+        "rank_diff_elo_ml_p97.5",
+    ]
+    assert comparison["elo_rank"].to_list() == list(range(1, 7))
+    assert (comparison["rank_diff_elo_ml_p2.5"] <= comparison["rank_diff_elo_ml"]).all()
+    assert (comparison["rank_diff_elo_ml"] <= comparison["rank_diff_elo_ml_p97.5"]).all()
+
+    with pytest.raises(ValueError):
+        bootstrap_rankers({"elo": ELORanker(bootstrap_samples=5), "ml": MaximumLikelihoodRanker()}, matches)
+
+
+def test_pipeline_compare_methods(mock_load_comparia, tmp_path):
+    pipeline = RankingPipeline(
+        method="ml",
+        include_votes=True,
+        include_reactions=False,
+        bootstrap_samples=3,
+        mean_how="match",
+        seed=0,
+        export_path=tmp_path,
+    )
+    comparison = pipeline.compare_methods(["elo_ordered", "ml"])
+    assert "rank_diff_elo_ordered_ml" in comparison.columns
+    assert comparison["model_name"].n_unique() == len(comparison)
+    assert (tmp_path / "comparison_elo_ordered_ml.csv").exists()
@@ -0,0 +1,104 @@
+# SPDX-FileCopyrightText: 2025 Pôle d'Expertise de la Régulation Numérique <contact@peren.gouv.fr>
+#
+# SPDX-License-Identifier: MIT
+
+from datetime import date
+
+import polars as pl
+import pytest
+from polars.testing import assert_frame_equal
+
+from rank_comparia.cube import build_cube, expand_cube, scan_cube, write_cube
+from rank_comparia.model_statistics import get_model_statistics
+from rank_comparia.pipeline import RankingPipeline
+from rank_comparia.utils import decode_model_names, has_categories
+
+
+@pytest.fixture(name="pipeline")
+def fixture_pipeline(mock_load_comparia):
+    return RankingPipeline(
+        method="ml", include_votes=True, include_reactions=True, bootstrap_samples=2, mean_how="match"
+    )
+
+
+def test_cube_round_trip(tmp_path, pipeline):
+    cube = pipeline.materialize_cube(tmp_path / "cube.parquet")
+    assert cube.select(pl.sum_horizontal("a_wins", "b_wins", "draws").sum()).item() == len(pipeline.matches)
+    assert_frame_equal(scan_cube(tmp_path / "cube.parquet").collect(), cube)
+    # a cube of the expanded matches is the same cube, with float sums spread over its rows
+    assert_frame_equal(build_cube(expand_cube(cube)), cube, check_dtypes=False)
+
+
+def test_expand_cube_preserves_statistics(pipeline):
+    matches = decode_model_names(pipeline.matches)
+    expanded = expand_cube(build_cube(pipeline.matches))
+    assert (
+        expanded.drop("conversation_pair_id", "timestamp").columns
+        == matches.drop("conversation_pair_id", "timestamp").columns
+    )
+    for by_category in (False, True):
+        assert_frame_equal(
+            get_model_statistics(expanded, by_category=by_category),
+            get_model_statistics(matches, by_category=by_category),
+            check_row_order=False,
+            check_dtypes=False,
+        )
+    # every match of a cell carries the same share of its sums
+    keys = ["timestamp", "source", "category_mask", "model_a", "model_b"]
+    assert (expanded.group_by(keys).agg(pl.col("total_conv_a_kwh").n_unique())["total_conv_a_kwh"] == 1).all()
+
+
+def test_pipeline_from_cube(tmp_path, pipeline):
+    pipeline.materialize_cube(tmp_path / "cube.parquet")
+    from_cube = RankingPipeline.from_cube(
+        tmp_path / "cube.parquet",
+        method="ml",
+        include_votes=True,
+        include_reactions=False,
+        bootstrap_samples=2,
+        mean_how="match",
+    )
+    assert len(from_cube.matches) == pipeline.matches["source"].eq("votes").sum()
+    votes = RankingPipeline(
+        method="ml",
+        include_votes=True,
+        include_reactions=False,
+        bootstrap_samples=2,
+        mean_how="match",
+        processed_matches=pipeline.matches,
+    )
+    # same matches up to their order and identifiers
+    key = lambda match: (match.model_a, match.model_b, match.score.value)  # noqa: E731
+    assert sorted(map(key, from_cube.match_list())) == sorted(map(key, votes.match_list()))
+
+    # a category slice only expands the cells of that category
+    category = "Law & Justice"
+    law = RankingPipeline.from_cube(
+        tmp_path / "cube.parquet",
+        categories=category,
+        method="ml",
+        include_votes=True,
+        include_reactions=False,
+        bootstrap_samples=2,
+        mean_how="match",
+    )
+    assert sorted(map(key, law.match_list())) == sorted(map(key, votes.match_list(category=category)))
+    assert len(law.matches) < len(from_cube.matches)
+
+
+def test_scan_cube_slices(tmp_path, pipeline):
+    cube = build_cube(pipeline.matches)
+    write_cube(cube, tmp_path / "cube.parquet")
+    day = cube["day"].min()
+    assert_frame_equal(
+        scan_cube(tmp_path / "cube.parquet", start=day, end=date.fromordinal(day.toordinal() + 1)).collect(),
+        cube.filter(pl.col("day") == day),
+    )
+    assert_frame_equal(
+        scan_cube(tmp_path / "cube.parquet", sources=["reactions"]).collect(),
+        cube.filter(pl.col("source") == "reactions"),
+    )
+    category = pipeline.matches["categories"].explode().drop_nulls()[0]
+    n_matches = pipeline.matches.filter(has_categories(category)).height
+    sliced = scan_cube(tmp_path / "cube.parquet", categories=category).collect()
+    assert sliced.select(pl.sum_horizontal("a_wins", "b_wins", "draws").sum()).item() == n_matches
@@ -2,7 +2,13 @@
 #
 # SPDX-License-Identifier: MIT
 
-from rank_comparia.elo import ELORanker
+from datetime import datetime
+
+import numpy as np
+import polars as pl
+import pytest
+
+from rank_comparia.elo import ELORanker, OrderedELORanker, rating_trajectories, reciprocal_function, sweep_elo
 from rank_comparia.ranker import Match, MatchScore
 
 
@@ -67,3 +73,99 @@ def test_players_with_many_parties():
     elo_ranking.add_players(PLAYERS)
     scores = elo_ranking.compute_scores([MATCHES[0]] * 50)
     assert scores["alice"] > 1000
+
+
+def test_ordered_elo_matches_sequential_updates():
+    matches = MATCHES + NEW_MATCHES + [Match(model_a="eve", model_b="alice", score=MatchScore.A)] * 40
+    expected = ELORanker().compute_scores(matches)
+    ranker = OrderedELORanker()
+    assert ranker.compute_scores(matches) == pytest.approx(expected)
+    assert ranker.player_number_of_matches("eve") == 42
+
+
+def test_ordered_elo_bootstrap_is_seeded():
+    ranker = OrderedELORanker(bootstrap_samples=5)
+    scores = ranker.compute_bootstrap_scores(MATCHES * 4, seed=3)
+    assert scores.equals(ranker.compute_bootstrap_scores(MATCHES * 4, seed=3))
+
+
+def test_rating_trajectories():
+    dtype = pl.Enum(PLAYERS)
+    matches = pl.DataFrame(
+        {
+            "conversation_pair_id": [str(index) for index in range(len(MATCHES))],
+            "timestamp": [
+                datetime(2025, 1, 2),
+                datetime(2025, 1, 1),
+                datetime(2025, 1, 1, 12),
+                *[datetime(2025, 1, 3)] * 2,
+            ],
+            "model_a": [match.model_a for match in MATCHES],
+            "model_b": [match.model_b for match in MATCHES],
+            "score": [match.score.value for match in MATCHES],
+        },
+        schema_overrides={"model_a": dtype, "model_b": dtype},
+    )
+    trajectories = rating_trajectories(matches)
+    # one point per model and day played
+    assert trajectories.height == 6
+    chronological = [MATCHES[1], MATCHES[2], MATCHES[0], *MATCHES[3:]]
+    final = trajectories.group_by("model_name", maintain_order=True).agg(pl.col("score").last(), pl.sum("n_match"))
+    expected = ELORanker().compute_scores(chronological)
+    for row in final.to_dicts():
+        assert row["score"] == pytest.approx(expected[row["model_name"]])
+    assert dict(final.select("model_name", "n_match").iter_rows()) == {"alice": 3, "bob": 5, "eve": 2}
+
+
+def encoded_matches(matches: list[Match]) -> pl.DataFrame:
+    dtype = pl.Enum(PLAYERS)
+    return pl.DataFrame(
+        {
+            "conversation_pair_id": [f"{index:04d}" for index in range(len(matches))],
+            "timestamp": [datetime(2025, 1, 1 + index // 10) for index in range(len(matches))],
+            "model_a": [match.model_a for match in matches],
+            "model_b": [match.model_b for match in matches],
+            "score": [match.score.value for match in matches],
+        },
+        schema_overrides={"model_a": dtype, "model_b": dtype},
+    )
+
+
+def test_elo_settings():
+    ranker = ELORanker(scale=200, high_score=1010, experienced_matches=1)
+    scores = ranker.compute_scores(MATCHES * 3)
+    ordered = OrderedELORanker(scale=200, high_score=1010, experienced_matches=1)
+    assert ordered.compute_scores(MATCHES * 3) == pytest.approx(scores)
+    assert scores != pytest.approx(ELORanker().compute_scores(MATCHES * 3))
+
+
+def test_sweep_elo():
+    rng = np.random.default_rng(0)
+    strength = {"alice": 2.0, "bob": 0.0, "eve": -1.0}
+    matches = []
+    for _ in range(300):
+        model_a, model_b = rng.choice(PLAYERS, size=2, replace=False)
+        p = 1 / (1 + np.exp(strength[model_b] - strength[model_a]))
+        matches.append(Match(str(model_a), str(model_b), MatchScore.A if rng.random() < p else MatchScore.B))
+    grid = {"K": [4, 16, 64], "scale": [200, 400], "experienced_matches": [10, 30]}
+    results = sweep_elo(encoded_matches(matches), grid, holdout_fraction=0.25)
+    assert results.height == 12
+    assert results["log_loss"].is_sorted()
+    assert (results["n_train"] == 225).all() and (results["n_holdout"] == 75).all()
+
+    # each column of the grid is the serial replay of its setting
+    row = results.row(5, named=True)
+    settings = {name: row[name] for name in ("K", "scale", "high_score", "experienced_matches")}
+    scores = OrderedELORanker(**settings).compute_scores(matches[:225])
+    holdout = matches[225:]
+    probabilities = np.array(
+        [reciprocal_function(scores[match.model_a] - scores[match.model_b], row["scale"]) for match in holdout]
+    )
+    outcomes = np.array([match.score.value / 2 for match in holdout])
+    assert row["brier"] == pytest.approx(((probabilities - outcomes) ** 2).mean())
+    assert row["log_loss"] == pytest.approx(
+        -(outcomes * np.log(probabilities) + (1 - outcomes) * np.log(1 - probabilities)).mean()
+    )
+
+    with pytest.raises(ValueError):
+        sweep_elo(encoded_matches(matches), {"k": [1]})
@@ -0,0 +1,85 @@
+# SPDX-FileCopyrightText: 2025 Pôle d'Expertise de la Régulation Numérique <contact@peren.gouv.fr>
+#
+# SPDX-License-Identifier: MIT
+
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import polars as pl
+import pytest
+
+from rank_comparia.elo import ELORanker, OrderedELORanker
+from rank_comparia.evaluation import (
+    evaluate_rankers,
+    prediction_metrics,
+    rolling_origin_splits,
+    summarize_evaluation,
+    win_probabilities,
+)
+from rank_comparia.maximum_likelihood import MaximumLikelihoodRanker
+
+
+@pytest.fixture(name="matches")
+def fixture_matches():
+    rng = np.random.default_rng(0)
+    strength = np.array([1.5, 0.5, 0.0, -1.0])
+    n_matches = 600
+    model_a = rng.integers(0, 4, n_matches)
+    model_b = (model_a + rng.integers(1, 4, n_matches)) % 4
+    p = 1 / (1 + np.exp(strength[model_b] - strength[model_a]))
+    draws = rng.random(n_matches) < 0.1
+    score = np.where(draws, 1, np.where(rng.random(n_matches) < p, 2, 0))
+    names = np.array(["alice", "bob", "carol", "dave"])
+    return pl.DataFrame(
+        {
+            "conversation_pair_id": [f"{index:04d}" for index in range(n_matches)],
+            "timestamp": [datetime(2025, 1, 1) + timedelta(hours=index) for index in range(n_matches)],
+            "model_a": names[model_a],
+            "model_b": names[model_b],
+            "score": score,
+        }
+    )
+
+
+def test_rolling_origin_splits(matches):
+    splits = rolling_origin_splits(matches, every="1w")
+    # 600 hours from Wednesday 2025-01-01, test periods start on Mondays
+    assert [origin for _, origin, _ in splits] == [date(2025, 1, 6), date(2025, 1, 13), date(2025, 1, 20)]
+    assert splits[-1][2] == date(2025, 1, 26)
+    assert all(train_start is None for train_start, _, _ in splits)
+    assert rolling_origin_splits(matches, every="1w", n_splits=1, window_days=7) == [
+        (date(2025, 1, 13), date(2025, 1, 20), date(2025, 1, 26))
+    ]
+
+
+def test_prediction_metrics():
+    probabilities = np.array([0.8, 0.3, 0.5])
+    score = np.array([2, 0, 1])
+    metrics = prediction_metrics(probabilities, score)
+    assert metrics["brier"] == pytest.approx((0.2**2 + 0.3**2 + 0) / 3)
+    assert metrics["log_loss"] == pytest.approx(-(np.log(0.8) + np.log(0.7) + np.log(0.5)) / 3)
+    assert metrics["accuracy"] == 1
+    # one column per predictor
+    stacked = prediction_metrics(np.stack([probabilities, 1 - probabilities], axis=1), score)
+    assert stacked["brier"][0] == pytest.approx(metrics["brier"])
+    assert stacked["accuracy"].tolist() == [1, 0]
+
+
+def test_win_probabilities():
+    probabilities = win_probabilities({"a": 1400, "b": 1000}, ["a", "b", "c"], np.array([0, 2]), np.array([1, 1]))
+    assert probabilities == pytest.approx([10 / 11, 0.5])
+
+
+def test_evaluate_rankers(matches):
+    rankers = {"elo": OrderedELORanker(), "ml": MaximumLikelihoodRanker(), "flat": ELORanker(K=0)}
+    results = evaluate_rankers(matches, rankers, every="1w", window_days=14)
+    assert results.height == 3 * 3
+    assert (results["n_train"] > 0).all() and (results["fit_seconds"] > 0).all()
+    assert (results["peak_memory_mb"] > 0).all()
+    # constant scores predict 0.5 everywhere
+    flat = results.filter(pl.col("ranker") == "flat")
+    assert flat["log_loss"].to_list() == pytest.approx([np.log(2)] * 3)
+
+    summary = summarize_evaluation(results)
+    assert summary["ranker"].to_list()[-1] == "flat"
+    assert summary["n_test"].to_list() == [results["n_test"].sum() // 3] * 3
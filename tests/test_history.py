@@ -0,0 +1,95 @@
+# SPDX-FileCopyrightText: 2025 Pôle d'Expertise de la Régulation Numérique <contact@peren.gouv.fr>
+#
+# SPDX-License-Identifier: MIT
+
+from datetime import date
+from unittest.mock import patch
+
+import polars as pl
+import pytest
+
+from rank_comparia.history import RunHistory
+
+
+def scores(medians: dict[str, float]) -> pl.DataFrame:
+    models = sorted(medians, key=lambda model: -medians[model])
+    return pl.DataFrame(
+        {
+            "model_name": models,
+            "median": [medians[model] for model in models],
+            "p2.5": [medians[model] - 10 for model in models],
+            "p97.5": [medians[model] + 10 for model in models],
+            "rank": list(range(1, len(models) + 1)),
+        }
+    )
+
+
+@pytest.fixture(name="history")
+def fixture_history(tmp_path):
+    history = RunHistory(tmp_path)
+    history.append(
+        scores({"alice": 1100.0, "bob": 1000.0}),
+        method="ml",
+        replicates=pl.DataFrame({"alice": [1090.0, 1110.0], "bob": [990.0, 1010.0]}),
+        config={"bootstrap_samples": 2},
+        run_id="run_1",
+        run_date=date(2025, 1, 1),
+    )
+    history.append(
+        scores({"alice": 1000.0, "bob": 1050.0, "eve": 900.0}).with_columns(component=pl.lit(0)),
+        method="ml",
+        run_id="run_2",
+        run_date=date(2025, 2, 1),
+    )
+    history.append(scores({"bob": 1000.0}), method="ml", category="Food & Drink & Cooking", run_id="run_2")
+    history.append(scores({"bob": 1000.0}), method="elo_random", run_id="run_3", run_date=date(2025, 2, 1))
+    return history
+
+
+def test_append_only(history):
+    with pytest.raises(FileExistsError):
+        history.append(scores({"bob": 1000.0}), method="ml", run_id="run_1", run_date=date(2025, 1, 1))
+
+
+def test_failed_append_leaves_no_partial_run(history):
+    replicates = pl.DataFrame({"bob": [990.0, 1010.0]})
+    write_parquet = pl.DataFrame.write_parquet
+    written = []
+
+    def fail_second_table(frame, path, *args, **kwargs):
+        if written:
+            raise OSError("disk full")
+        written.append(path)
+        return write_parquet(frame, path, *args, **kwargs)
+
+    with patch.object(pl.DataFrame, "write_parquet", fail_second_table), pytest.raises(OSError):
+        history.append(scores({"bob": 1000.0}), method="ml", replicates=replicates, run_id="run_4")
+    assert "run_4" not in history.runs()["run_id"].to_list()
+    assert history.scan(run_ids=["run_4"]).collect().is_empty()
+    assert not list(history.root.rglob("*.tmp"))
+    # the run can then be stored
+    history.append(scores({"bob": 1000.0}), method="ml", replicates=replicates, run_id="run_4")
+    assert "run_4" in history.runs()["run_id"].to_list()
+
+
+def test_scan_partitions(history):
+    assert history.scan(method="ml").select("run_id").unique().collect()["run_id"].sort().to_list() == [
+        "run_1",
+        "run_2",
+    ]
+    food = history.scan(category="Food & Drink & Cooking").collect()
+    assert food["category"].unique().to_list() == ["Food & Drink & Cooking"]
+    assert len(history.scan(start=date(2025, 1, 15), end=date(2025, 2, 1)).collect()) == 4
+    assert history.scan("replicates").collect()["score"].to_list() == [1090.0, 1110.0, 990.0, 1010.0]
+    assert history.runs(method="ml", category="all")["config"].to_list() == ['{"bootstrap_samples": 2}', "{}"]
+
+
+def test_trend_and_diff(history):
+    trend = history.trend("ml", models=["alice"])
+    assert trend["run_id"].to_list() == ["run_1", "run_2"]
+    assert trend["rank"].to_list() == [1, 2]
+
+    diff = history.diff("run_1", "run_2", method="ml")
+    assert diff["model_name"].to_list() == ["bob", "alice", "eve"]
+    assert diff["rank_change"].to_list() == [1, -1, None]
+    assert diff["median_change"].to_list() == [50.0, -100.0, None]
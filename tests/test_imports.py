@@ -0,0 +1,48 @@
+# SPDX-FileCopyrightText: 2025 Pôle d'Expertise de la Régulation Numérique <contact@peren.gouv.fr>
+#
+# SPDX-License-Identifier: MIT
+
+import json
+import subprocess
+import sys
+
+import pytest
+
+
+HEAVY_MODULES = ["altair", "datasets", "sklearn", "scipy", "networkx", "pandas", "tqdm"]
+
+
+def imported_modules(statement: str) -> set[str]:
+    """
+    Run an import statement in a fresh interpreter and list the heavy modules it loaded.
+    """
+    code = f"import json, sys; {statement}; print(json.dumps(sorted(set(m.split('.')[0] for m in sys.modules))))"
+    output = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout
+    return set(json.loads(output.splitlines()[-1])) & set(HEAVY_MODULES)
+
+
+@pytest.mark.parametrize(
+    "module",
+    [
+        "rank_comparia.bootstrap",
+        "rank_comparia.pipeline",
+        "rank_comparia.rank_centrality",
+        "rank_comparia.ranker",
+        "rank_comparia.scheduler",
+        "rank_comparia.elo",
+        "rank_comparia.evaluation",
+        "rank_comparia.maximum_likelihood",
+        "rank_comparia.metadata",
+        "rank_comparia.service",
+        "rank_comparia.sync",
+        "rank_comparia.temporal",
+        "rank_comparia.utils",
+        "rank_comparia.utils_graph_d3",
+    ],
+)
+def test_import_does_not_load_heavy_dependencies(module):
+    assert imported_modules(f"import {module}") == set()
+
+
+def test_plot_loads_altair():
+    assert "altair" in imported_modules("import rank_comparia.plot")
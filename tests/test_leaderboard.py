@@ -0,0 +1,135 @@
+# SPDX-FileCopyrightText: 2025 Pôle d'Expertise de la Régulation Numérique <contact@peren.gouv.fr>
+#
+# SPDX-License-Identifier: MIT
+
+
+import numpy as np
+import polars as pl
+import pytest
+from polars.testing import assert_frame_equal
+
+from rank_comparia.leaderboard import STATISTICS, bootstrap_statistics, mean_win_probabilities, summarize_statistics
+from rank_comparia.model_statistics import PREFERENCES, get_model_statistics
+from rank_comparia.pipeline import RankingPipeline
+from rank_comparia.plot import (
+    format_matches_for_heatmap,
+    format_matches_for_winrate_count,
+    format_scores_for_mean_win_proba,
+)
+from rank_comparia.utils import decode_model_names
+
+
+@pytest.fixture(name="pipeline")
+def fixture_pipeline(mock_load_comparia):
+    return RankingPipeline(
+        method="elo_random",
+        include_votes=True,
+        include_reactions=True,
+        bootstrap_samples=20,
+        mean_how="match",
+        seed=0,
+    )
+
+
+def test_full_sample_gives_point_statistics(pipeline):
+    matches = pipeline.matches
+    statistics = bootstrap_statistics(matches, [np.arange(len(matches))]).drop("replicate")
+    expected = decode_model_names(get_model_statistics(matches)).select(
+        "model_name",
+        "n_match",
+        "total_output_tokens",
+        "conso_all_conv",
+        *PREFERENCES,
+        "mean_conso_per_match",
+        "mean_conso_per_token",
+        "total_prefs",
+        "positive_prefs_ratio",
+    )
+    assert_frame_equal(
+        statistics.drop("win_rate").sort("model_name"), expected.sort("model_name"), check_dtypes=False, rtol=1e-9
+    )
+
+    # pairwise win ratios are rounded to 2 digits in `format_matches_for_winrate_count`
+    win_rate = format_matches_for_winrate_count(decode_model_names(format_matches_for_heatmap(matches)))
+    compared = statistics.join(win_rate, on="model_name", suffix="_point")
+    assert len(compared) == len(win_rate)
+    assert np.allclose(compared["win_rate"], compared["win_rate_point"], atol=0.01)
+
+
+def test_resampled_matches_count_twice(pipeline):
+    matches = pipeline.matches
+    rng = np.random.default_rng(0)
+    samples = [rng.integers(0, len(matches), size=len(matches)) for _ in range(3)]
+    statistics = bootstrap_statistics(matches, samples)
+    assert (
+        statistics.group_by("replicate").agg(pl.sum("n_match")).sort("replicate")["n_match"].to_list()
+        == [2 * len(matches)] * 3
+    )
+    assert_frame_equal(
+        bootstrap_statistics(matches, [samples[1]]).drop("replicate"),
+        statistics.filter(pl.col("replicate") == 1).drop("replicate"),
+    )
+
+
+def test_mean_win_probabilities():
+    replicates = pl.DataFrame({"a": [1100.0, 1000.0], "b": [1000.0, 1000.0], "c": [900.0, 1200.0]})
+    probabilities = mean_win_probabilities(replicates)
+    for replicate in range(2):
+        scores = replicates.row(replicate, named=True)
+        expected = format_scores_for_mean_win_proba(
+            pl.DataFrame({"model_name": list(scores), "median": list(scores.values())})
+        )
+        compared = probabilities.filter(pl.col("replicate") == replicate).join(
+            expected, on="model_name", suffix="_point"
+        )
+        assert np.allclose(compared["mean_win_prob"], compared["mean_win_prob_point"])
+
+
+def test_mean_win_probabilities_scale():
+    replicates = pl.DataFrame({"a": [1100.0], "b": [1000.0]})
+    probabilities = mean_win_probabilities(replicates, scale=200).sort("model_name")
+    expected = 1 / (1 + 10 ** (-100 / 200))
+    assert np.allclose(probabilities["mean_win_prob"], [expected, 1 - expected])
+
+
+def test_pipeline_win_probabilities_use_ranker_scale(pipeline):
+    pipeline.ranker.scale = 200
+    pipeline.run()
+    expected = mean_win_probabilities(pipeline.ranker.bootstrap_replicates, scale=200)
+    compared = pipeline.statistics_replicates.join(
+        expected, on=["replicate", "model_name"], suffix="_expected", how="left"
+    )
+    assert np.allclose(compared["mean_win_prob"], compared["mean_win_prob_expected"])
+
+
+def test_category_runs_skip_statistics(pipeline):
+    pipeline.run_category("Law & Justice")
+    assert pipeline.statistics_replicates.is_empty()
+
+
+def test_pipeline_resamples_statistics_with_scores(pipeline):
+    pipeline.run()
+    replicates = pipeline.statistics_replicates
+    assert replicates.columns == ["replicate", "model_name", *STATISTICS]
+    assert replicates["replicate"].n_unique() == 20
+    # the same samples give the same statistics
+    matches = pipeline.matches
+    sample = pipeline.ranker.bootstrap_indices(len(matches), 3, 0)
+    assert_frame_equal(
+        bootstrap_statistics(matches, [sample]).drop("replicate"),
+        replicates.filter(pl.col("replicate") == 3).drop("replicate", "mean_win_prob"),
+    )
+
+    intervals = summarize_statistics(replicates)
+    for statistic in STATISTICS:
+        assert (intervals[f"{statistic}_p2.5"] <= intervals[f"{statistic}_p97.5"]).all()
+
+
+def test_format_matches_for_heatmap_scores():
+    # score is 2 when model a wins, 0 when model b wins and 1 for a draw
+    matches = pl.DataFrame(
+        {"model_a": ["x", "x", "x", "x", "y"], "model_b": ["y", "y", "y", "y", "x"], "score": [2, 0, 0, 1, 2]}
+    )
+    heatmap = format_matches_for_heatmap(matches).sort("model_a")
+    assert heatmap.select("a_wins", "b_wins", "draws", "count").rows() == [(1, 3, 1, 5), (3, 1, 1, 5)]
+    assert heatmap["a_win_ratio"].to_list() == [0.25, 0.75]
@@ -2,33 +2,21 @@
 #
 # SPDX-License-Identifier: MIT
 
-from unittest.mock import patch
 
+import numpy as np
 import polars as pl
 import pytest
 
-from rank_comparia.maximum_likelihood import MaximumLikelihoodRanker
+from rank_comparia.maximum_likelihood import (
+    MaximumLikelihoodRanker,
+    aggregate_pairs,
+    comparison_components,
+    fit_bradley_terry,
+    fit_bradley_terry_sparse,
+    prune_pairs,
+)
 from rank_comparia.pipeline import RankingPipeline
-
-
-@pytest.fixture(name="conversations")
-def fixture_conversations():
-    return pl.read_parquet("tests/data/sample_comparia_conversations.parquet")
-
-
-@pytest.fixture(name="mock_load_comparia")
-def fixture_load_comparia(conversations):
-    sample_votes = pl.read_parquet("tests/data/sample_comparia_votes.parquet")
-    sample_reactions = pl.read_parquet("tests/data/sample_comparia_reactions.parquet")
-
-    def _side_effect(arg):
-        if arg == "ministere-culture/comparia-votes":
-            return sample_votes.join(conversations, on="conversation_pair_id", coalesce=True)
-        elif arg == "ministere-culture/comparia-reactions":
-            return sample_reactions.join(conversations, on="conversation_pair_id", coalesce=True)
-
-    with patch("rank_comparia.pipeline.load_comparia", side_effect=_side_effect) as mock_fn:
-        yield mock_fn
+from rank_comparia.ranker import Match, MatchScore
 
 
 @pytest.fixture(name="votes_match_list")
@@ -60,3 +48,75 @@ def test_compute_scores_returns_dict(votes_match_list):
     scores = ranker.compute_scores(votes_match_list)
     assert isinstance(scores, dict)
     assert len(scores) == 15
+
+
+def test_sparse_solver_matches_dense():
+    rng = np.random.default_rng(0)
+    strengths = rng.normal(0, 0.5, 8)
+    matches = []
+    for _ in range(1000):
+        a, b = rng.choice(8, 2, replace=False)
+        proba = 1 / (1 + 10 ** (strengths[b] - strengths[a]))
+        score = rng.choice([2, 1, 0], p=[0.8 * proba, 0.2, 0.8 * (1 - proba)])
+        matches.append(Match(model_a=f"model_{a}", model_b=f"model_{b}", score=MatchScore(score)))
+
+    dense = MaximumLikelihoodRanker().compute_scores(matches)
+    sparse = MaximumLikelihoodRanker(solver="sparse").compute_scores(matches)
+    assert list(sparse) == list(dense)
+    for model, score in dense.items():
+        assert sparse[model] == pytest.approx(score, abs=1e-2)
+
+    # the LBFGS iteration budget does not cap Newton iterations
+    assert MaximumLikelihoodRanker(solver="sparse", max_iter=1).compute_scores(matches) == pytest.approx(sparse)
+    capped = MaximumLikelihoodRanker(solver="sparse", max_newton_iter=1).compute_scores(matches)
+    assert capped != pytest.approx(sparse)
+
+
+def test_fit_bradley_terry_sparse():
+    rng = np.random.default_rng(1)
+    n_models, n_matches = 300, 20000
+    strengths = rng.normal(0, 0.5, n_models)
+    model_a = rng.integers(n_models, size=n_matches)
+    model_b = (model_a + rng.integers(1, n_models, size=n_matches)) % n_models
+    win_proba = 1 / (1 + 10 ** (strengths[model_b] - strengths[model_a]))
+    score = np.where(rng.random(n_matches) < win_proba, 2, 0)
+
+    pairs, points = aggregate_pairs(model_a, model_b, score, n_models)
+    assert (pairs[:, 0] < pairs[:, 1]).all()
+    assert points.sum() == 2 * n_matches
+
+    wins = np.zeros((n_models, n_models))
+    wins[pairs[:, 0], pairs[:, 1]] = points[:, 0]
+    wins[pairs[:, 1], pairs[:, 0]] = points[:, 1]
+    coef = fit_bradley_terry_sparse(pairs, points, n_models)
+    assert coef == pytest.approx(fit_bradley_terry(wins, max_iter=1000, tol=1e-9), abs=1e-3)
+
+
+def test_comparison_components():
+    # 0 and 1 beat each other, 2 only loses against them, 3 and 4 only play each other
+    pairs = np.array([[0, 1], [0, 2], [1, 2], [3, 4]])
+    points = np.array([[3, 1], [4, 0], [2, 0], [1, 1]])
+    weak, strong = comparison_components(pairs, points, 5)
+    assert weak.tolist() == [0, 0, 0, 1, 1]
+    assert strong.tolist() == [0, 0, 2, 1, 1]
+
+    pruned_pairs, _ = prune_pairs(pairs, points, min_matches=2)
+    assert pruned_pairs.tolist() == [[0, 1], [0, 2]]
+
+
+def test_split_components(votes_match_list):
+    ranker = MaximumLikelihoodRanker(bootstrap_samples=2, split_components=True)
+    scores = ranker.compute_scores(votes_match_list)
+    assert set(scores) == set(ranker.components)
+    # scores are centered inside each strongly connected component
+    for component in {strong for _, strong in ranker.components.values()}:
+        members = [model for model, (_, strong) in ranker.components.items() if strong == component]
+        assert np.mean([scores[model] for model in members]) == pytest.approx(1000.0)
+
+    sparse = MaximumLikelihoodRanker(solver="sparse", split_components=True).compute_scores(votes_match_list)
+    for model, score in scores.items():
+        assert sparse[model] == pytest.approx(score, abs=1e-2)
+
+    bootstrap = ranker.compute_bootstrap_scores(votes_match_list)
+    assert {"component", "strong_component"} <= set(bootstrap.columns)
+    assert bootstrap["strong_component"].null_count() == 0
@@ -0,0 +1,69 @@
+# SPDX-FileCopyrightText: 2025 Pôle d'Expertise de la Régulation Numérique <contact@peren.gouv.fr>
+#
+# SPDX-License-Identifier: MIT
+
+import json
+import os
+from pathlib import Path
+from unittest.mock import patch
+
+import polars as pl
+import pytest
+
+import rank_comparia
+from rank_comparia.metadata import MODELS_DATA, MODELS_DATA_AUGMENTED, ModelRegistry, model_registry
+
+
+def write_models(path, models):
+    path.write_text(
+        json.dumps([{"name": m.upper(), "model_name": m, "organization": f"{m}-org", "license": "MIT"} for m in models])
+    )
+
+
+def test_registry_reads_once_and_reloads_on_change(tmp_path):
+    path = tmp_path / "models.json"
+    write_models(path, ["a", "b"])
+    registry = ModelRegistry(path)
+    with patch("rank_comparia.metadata.pl.read_json", wraps=pl.read_json) as read_json:
+        assert registry.get("a")["organization"] == "a-org"
+        assert "b" in registry and "c" not in registry
+        assert registry.frame.height == 2
+        assert read_json.call_count == 1
+
+        write_models(path, ["a", "b", "c"])
+        mtime = path.stat().st_mtime_ns
+        os.utime(path, ns=(mtime + 10**9, mtime + 10**9))
+        assert "c" in registry
+        assert read_json.call_count == 2
+
+
+def test_registry_join(tmp_path):
+    path = tmp_path / "models.json"
+    write_models(path, ["a", "b"])
+    scores = pl.DataFrame({"model_name": ["a", "c"], "median": [1000.0, 900.0]})
+    registry = ModelRegistry(path)
+    assert registry.join(scores)["organization"].to_list() == ["a-org"]
+    assert registry.join(scores, how="left")["organization"].to_list() == ["a-org", None]
+
+
+def test_registry_validation(tmp_path):
+    path = tmp_path / "models.json"
+    write_models(path, ["a", "a"])
+    with pytest.raises(ValueError, match="duplicated"):
+        ModelRegistry(path).frame
+    path.write_text(json.dumps([{"model_name": "a"}]))
+    with pytest.raises(ValueError, match="missing columns"):
+        ModelRegistry(path).frame
+
+
+def test_shared_registries():
+    assert model_registry() is model_registry(MODELS_DATA)
+    assert model_registry(MODELS_DATA_AUGMENTED) is not model_registry()
+    assert model_registry().frame.height > 0
+    assert model_registry(MODELS_DATA_AUGMENTED).frame.height > 0
+
+
+def test_models_data_ship_with_the_package():
+    package = Path(rank_comparia.__file__).parent
+    assert MODELS_DATA.is_relative_to(package) and MODELS_DATA.is_file()
+    assert MODELS_DATA_AUGMENTED.is_relative_to(package) and MODELS_DATA_AUGMENTED.is_file()
@@ -0,0 +1,55 @@
+# SPDX-FileCopyrightText: 2025 Pôle d'Expertise de la Régulation Numérique <contact@peren.gouv.fr>
+#
+# SPDX-License-Identifier: MIT
+
+import polars as pl
+import pytest
+
+from rank_comparia.frugality import calculate_frugality_score, get_n_match
+from rank_comparia.model_statistics import PREFERENCES, get_model_statistics
+from rank_comparia.preferences import get_votes_preferences, votes_preference_counts
+
+
+@pytest.fixture(name="votes")
+def fixture_votes():
+    conversations = pl.read_parquet("tests/data/sample_comparia_conversations.parquet")
+    return pl.read_parquet("tests/data/sample_comparia_votes.parquet").join(conversations, on="conversation_pair_id")
+
+
+@pytest.fixture(name="matches")
+def fixture_matches(votes):
+    return votes.select(
+        "categories",
+        pl.col("model_a_name").alias("model_a"),
+        pl.col("model_b_name").alias("model_b"),
+        "model_a_active_params",
+        "model_b_active_params",
+        "total_conv_a_output_tokens",
+        "total_conv_a_kwh",
+        "total_conv_b_output_tokens",
+        "total_conv_b_kwh",
+        *votes_preference_counts(),
+    )
+
+
+def test_statistics_match_frugality(matches):
+    statistics = get_model_statistics(matches)
+    frugality = calculate_frugality_score(matches, n_match=get_n_match(matches))
+    joined = frugality.join(statistics, on="model_name", suffix="_stats")
+    assert len(joined) == len(frugality)
+    for column in ["n_match", "total_output_tokens", "conso_all_conv", "mean_conso_per_match", "mean_conso_per_token"]:
+        assert joined[column].to_list() == pytest.approx(joined[f"{column}_stats"].to_list())
+
+
+def test_statistics_preferences(votes, matches):
+    statistics = get_model_statistics(matches)
+    preferences = get_votes_preferences(votes).join(statistics, on="model_name", suffix="_stats")
+    for column in PREFERENCES + ["total_prefs"]:
+        assert preferences[column].to_list() == preferences[f"{column}_stats"].to_list()
+
+
+def test_statistics_by_category(matches):
+    statistics = get_model_statistics(matches, by_category=True)
+    assert statistics.columns[:2] == ["category", "model_name"]
+    n_categories = matches.select(pl.col("categories").list.len().sum()).item()
+    assert statistics["n_match"].sum() == 2 * n_categories
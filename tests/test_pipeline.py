@@ -2,32 +2,14 @@
 #
 # SPDX-License-Identifier: MIT
 
-from unittest.mock import patch
-
 import polars as pl
 import pytest
+from polars.testing import assert_frame_equal
 
+from rank_comparia.history import RunHistory
 from rank_comparia.pipeline import Match, RankingPipeline
-
-
-@pytest.fixture(name="conversations")
-def fixture_conversations():
-    return pl.read_parquet("tests/data/sample_comparia_conversations.parquet")
-
-
-@pytest.fixture(name="mock_load_comparia")
-def fixture_load_comparia(conversations):
-    sample_votes = pl.read_parquet("tests/data/sample_comparia_votes.parquet")
-    sample_reactions = pl.read_parquet("tests/data/sample_comparia_reactions.parquet")
-
-    def _side_effect(arg):
-        if arg == "ministere-culture/comparia-votes":
-            return sample_votes.join(conversations, on="conversation_pair_id", coalesce=True)
-        elif arg == "ministere-culture/comparia-reactions":
-            return sample_reactions.join(conversations, on="conversation_pair_id", coalesce=True)
-
-    with patch("rank_comparia.pipeline.load_comparia", side_effect=_side_effect) as mock_fn:
-        yield mock_fn
+from rank_comparia.preferences import combine_preferences, get_preferences_data, get_votes_preferences
+from rank_comparia.service import LeaderboardStore
 
 
 def test_init_pipeline_with_votes_only(mock_load_comparia):
@@ -42,7 +24,7 @@ def test_init_pipeline_with_votes_only(mock_load_comparia):
     # matches should come from mocked sample_df
     assert isinstance(pipeline.matches, pl.DataFrame)
     assert not pipeline.matches.is_empty()
-    mock_load_comparia.assert_called_once_with("ministere-culture/comparia-votes")
+    mock_load_comparia.assert_called_once_with("ministere-culture/comparia-votes", token=None)
 
 
 def test_init_pipeline_with_reactions_only(mock_load_comparia):
@@ -56,7 +38,7 @@ def test_init_pipeline_with_reactions_only(mock_load_comparia):
     )
     assert isinstance(pipeline.matches, pl.DataFrame)
     assert not pipeline.matches.is_empty()
-    mock_load_comparia.assert_called_once_with("ministere-culture/comparia-reactions")
+    mock_load_comparia.assert_called_once_with("ministere-culture/comparia-reactions", token=None)
 
 
 def test_run_returns_dataframe(mock_load_comparia):
@@ -100,6 +82,21 @@ def test_run_all_categories_skips_if_too_few_matches(mock_load_comparia):
     assert results == {}
 
 
+def test_run_all_categories_exports_category_tables(mock_load_comparia, tmp_path):
+    pipeline = RankingPipeline(
+        method="elo_random",
+        include_votes=True,
+        include_reactions=False,
+        bootstrap_samples=2,
+        mean_how="match",
+        export_path=tmp_path,
+    )
+    results = pipeline.run_all_categories(min_matches=1)
+    assert results
+    store = LeaderboardStore.load(tmp_path)
+    assert set(store.leaderboards) == {("elo_random", category) for category in results}
+
+
 def test_process_reactions_data(mock_load_comparia):
     pipeline = RankingPipeline(
         method="ml",
@@ -140,3 +137,183 @@ def test_votes_match_list(mock_load_comparia):
     assert isinstance(matches, list)
     assert isinstance(matches[0], Match)
     assert len(matches) == 10
+
+
+def test_run_temporal(mock_load_comparia):
+    pipeline = RankingPipeline(
+        method="ml",
+        include_votes=True,
+        include_reactions=True,
+        bootstrap_samples=2,
+        mean_how="match",
+    )
+    scores = pipeline.run_temporal(every="1mo")
+    assert isinstance(scores, pl.DataFrame)
+    assert {"window_start", "window_end", "model_name", "score", "n_match", "rank"} <= set(scores.columns)
+    # last leaderboard covers all matches
+    last = scores.filter(pl.col("window_end") == pl.col("window_end").max())
+    assert last["n_match"].sum() == 2 * len(pipeline.matches.filter(pl.col("model_a") != pl.col("model_b")))
+
+
+def test_model_names_are_encoded(mock_load_comparia):
+    pipeline = RankingPipeline(
+        method="ml",
+        include_votes=True,
+        include_reactions=True,
+        bootstrap_samples=2,
+        mean_how="match",
+    )
+    assert isinstance(pipeline.model_dtype, pl.Enum)
+    assert pipeline.matches.schema["model_b"] == pipeline.model_dtype
+    # model names are decoded in outputs
+    scores = pipeline.run()
+    assert scores.schema["model_name"] == pl.String
+    assert set(scores["model_name"]) <= set(pipeline.model_dtype.categories)
+
+
+def test_category_match_list(mock_load_comparia):
+    pipeline = RankingPipeline(
+        method="ml",
+        include_votes=True,
+        include_reactions=True,
+        bootstrap_samples=2,
+        mean_how="match",
+    )
+    for category in ["Law & Justice", "Education", "History"]:
+        expected = pipeline.matches.filter(pl.col("categories").list.contains(category))
+        assert [m.id for m in pipeline.match_list(category=category)] == expected["conversation_pair_id"].to_list()
+
+    either = pipeline.match_list(category=["Education", "History"])
+    expected = pipeline.matches.filter(
+        pl.col("categories").list.contains("Education") | pl.col("categories").list.contains("History")
+    )
+    assert len(either) == len(expected)
+
+    with pytest.raises(ValueError):
+        pipeline.match_list(category="Unknown")
+
+
+def test_runs_are_recorded_in_history(mock_load_comparia, tmp_path):
+    pipeline = RankingPipeline(
+        method="elo_random",
+        include_votes=True,
+        include_reactions=False,
+        bootstrap_samples=3,
+        mean_how="match",
+        history=RunHistory(tmp_path),
+    )
+    scores = pipeline.run_category("Law & Justice")
+    runs = pipeline.history.runs()
+    assert runs["run_id"].to_list() == [pipeline.run_id]
+    assert runs["category"].to_list() == ["Law & Justice"]
+    trend = pipeline.history.trend("elo_random", category="Law & Justice")
+    assert trend["model_name"].to_list() == scores.sort("rank")["model_name"].to_list()
+    assert len(pipeline.history.scan("replicates").collect()) == 3 * len(scores)
+
+
+def test_repeated_runs_get_their_own_id(mock_load_comparia, tmp_path):
+    pipeline = RankingPipeline(
+        method="elo_random",
+        include_votes=True,
+        include_reactions=False,
+        bootstrap_samples=2,
+        mean_how="match",
+        history=RunHistory(tmp_path),
+    )
+    pipeline.run()
+    first = pipeline.run_id
+    pipeline.run()
+    pipeline.run_category("Law & Justice")
+    pipeline.run_all_categories(min_matches=1)
+    runs = pipeline.history.runs()
+    assert runs["run_id"].n_unique() == 4
+    assert first in runs["run_id"].to_list()
+    # categories of `run_all_categories` share one run
+    assert runs.filter(pl.col("run_id") == pipeline.run_id).height > 1
+
+
+def test_elo_ordered(mock_load_comparia):
+    pipeline = RankingPipeline(
+        method="elo_ordered",
+        include_votes=True,
+        include_reactions=True,
+        bootstrap_samples=3,
+        mean_how="match",
+        seed=0,
+    )
+    assert pipeline.matches["timestamp"].is_sorted()
+    scores = pipeline.run()
+    assert scores["rank"].min() == 1
+    trajectories = pipeline.rating_trajectories()
+    final = dict(trajectories.group_by("model_name", maintain_order=True).agg(pl.col("score").last()).iter_rows())
+    assert final == pytest.approx(pipeline.ranker.compute_scores(pipeline.match_list()))
+    assert trajectories["n_match"].sum() == 2 * len(pipeline.matches)
+
+
+def test_pair_schedule(mock_load_comparia):
+    pipeline = RankingPipeline(
+        method="ml", include_votes=True, include_reactions=True, bootstrap_samples=3, mean_how="match"
+    )
+    schedule = pipeline.pair_schedule()
+    n_models = len(set(pipeline.matches["model_a"]) | set(pipeline.matches["model_b"]))
+    assert schedule.height == n_models * (n_models - 1) // 2
+    assert schedule["probability"].sum() == pytest.approx(1)
+
+
+def test_preferences_count_all_raw_data(mock_load_comparia, conversations):
+    votes = pl.read_parquet("tests/data/sample_comparia_votes.parquet")
+    reactions = pl.read_parquet("tests/data/sample_comparia_reactions.parquet")
+    pipeline = RankingPipeline(
+        method="ml",
+        include_votes=True,
+        include_reactions=False,
+        bootstrap_samples=5,
+        mean_how="match",
+    )
+    # reaction preferences are exported even when only votes are scored
+    expected = get_preferences_data(
+        votes.join(conversations, on="conversation_pair_id", coalesce=True),
+        reactions.join(conversations, on="conversation_pair_id", coalesce=True),
+    )
+    assert_frame_equal(pipeline.preferences(), expected)
+    pipeline.preferences()
+    assert mock_load_comparia.call_count == 2
+
+    # pipelines on processed matches use the preferences they are given, and never load raw data
+    shared = RankingPipeline(
+        method="elo_random",
+        include_votes=True,
+        include_reactions=False,
+        bootstrap_samples=5,
+        mean_how="match",
+        raw_preferences=pipeline.raw_preferences,
+        processed_matches=pipeline.matches,
+    )
+    assert_frame_equal(shared.preferences(), expected)
+    matches_only = RankingPipeline(
+        method="elo_random",
+        include_votes=True,
+        include_reactions=False,
+        bootstrap_samples=5,
+        mean_how="match",
+        processed_matches=pipeline.matches,
+    )
+    assert matches_only.preferences()["model_name"].to_list() == sorted(
+        pipeline.model_statistics()["model_name"].cast(pl.String)
+    )
+    assert mock_load_comparia.call_count == 2
+
+
+def test_preferences_of_partial_raw_data(conversations):
+    votes = pl.read_parquet("tests/data/sample_comparia_votes.parquet").join(
+        conversations, on="conversation_pair_id", coalesce=True
+    )
+    pipeline = RankingPipeline(
+        method="ml",
+        include_votes=True,
+        include_reactions=False,
+        bootstrap_samples=5,
+        mean_how="match",
+        raw_data={"ministere-culture/comparia-votes": votes},
+    )
+    assert_frame_equal(pipeline.preferences(), combine_preferences(get_votes_preferences(votes)))
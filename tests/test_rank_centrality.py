@@ -0,0 +1,112 @@
+# SPDX-FileCopyrightText: 2025 Pôle d'Expertise de la Régulation Numérique <contact@peren.gouv.fr>
+#
+# SPDX-License-Identifier: MIT
+
+import warnings
+
+import numpy as np
+import pytest
+
+from rank_comparia.maximum_likelihood import MaximumLikelihoodRanker, aggregate_pairs
+from rank_comparia.pipeline import RankingPipeline
+from rank_comparia.rank_centrality import RankCentralityRanker, stationary_distribution
+from rank_comparia.ranker import Match, MatchScore
+
+
+@pytest.fixture(name="matches")
+def fixture_matches():
+    rng = np.random.default_rng(0)
+    strengths = rng.normal(0, 0.5, 8)
+    matches = []
+    for _ in range(5000):
+        a, b = rng.choice(8, 2, replace=False)
+        score = MatchScore.A if rng.random() < 1 / (1 + 10 ** (strengths[b] - strengths[a])) else MatchScore.B
+        matches.append(Match(model_a=f"model_{a}", model_b=f"model_{b}", score=score))
+    return matches
+
+
+def test_stationary_distribution_balances_wins():
+    # model 0 beats model 1 three times out of four, model 1 draws twice with model 2
+    pairs = np.array([[0, 1], [1, 2]])
+    points = np.array([[6.0, 2.0], [2.0, 2.0]])
+    distribution = stationary_distribution(pairs, points, 3, regularization=0)
+    assert distribution.sum() == pytest.approx(1)
+    assert distribution[0] / distribution[1] == pytest.approx(3)
+    assert distribution[1] == pytest.approx(distribution[2])
+
+
+def test_scores_on_maximum_likelihood_scale(matches):
+    scores = RankCentralityRanker().compute_scores(matches)
+    expected = MaximumLikelihoodRanker().compute_scores(matches)
+    assert list(scores) == list(expected)
+    assert np.allclose([scores[model] for model in expected], list(expected.values()), atol=10)
+    assert np.mean(list(scores.values())) == pytest.approx(1000)
+
+    two_models = RankCentralityRanker(regularization=0).compute_scores(
+        [Match("a", "b", MatchScore.A)] * 3 + [Match("a", "b", MatchScore.B)]
+    )
+    assert two_models["a"] - two_models["b"] == pytest.approx(400 * np.log10(3))
+
+
+def test_sparse_graph_keeps_maximum_likelihood_scale():
+    # 200 models and about one match per pair, where a large regularization compresses scores
+    rng = np.random.default_rng(0)
+    n_models, n_matches = 200, 20000
+    strengths = rng.normal(0, 0.5, n_models)
+    model_a = rng.integers(0, n_models, n_matches)
+    model_b = (model_a + rng.integers(1, n_models, n_matches)) % n_models
+    wins = rng.random(n_matches) < 1 / (1 + 10 ** (strengths[model_b] - strengths[model_a]))
+    score = np.where(wins, 2, 0)
+    models = [f"model_{index}" for index in range(n_models)]
+
+    expected = MaximumLikelihoodRanker(solver="sparse").compute_encoded_scores(models, model_a, model_b, score)
+    expected = np.array([expected[model] for model in models])
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        scores = RankCentralityRanker().compute_encoded_scores(models, model_a, model_b, score)
+    scores = np.array([scores[model] for model in models])
+    assert scores.std() / expected.std() == pytest.approx(1, abs=0.05)
+    assert np.sqrt(np.mean((scores - expected) ** 2)) < 40
+
+    compressed = RankCentralityRanker(regularization=1.0).compute_encoded_scores(models, model_a, model_b, score)
+    assert np.std(list(compressed.values())) < 0.5 * expected.std()
+
+
+def test_warns_without_convergence():
+    pairs = np.array([[0, 1], [1, 2]])
+    points = np.array([[6.0, 2.0], [2.0, 2.0]])
+    with pytest.warns(UserWarning, match="did not converge"):
+        stationary_distribution(pairs, points, 3, max_iter=2)
+
+
+def test_unplayed_models_are_left_out():
+    models = ["model_0", "model_1", "absent"]
+    scores = RankCentralityRanker().compute_encoded_scores(
+        models, np.array([0, 0, 2]), np.array([1, 1, 2]), np.array([2, 1, 0])
+    )
+    assert scores.keys() == {"model_0", "model_1"}
+
+    pairs, points = aggregate_pairs(np.array([0, 0]), np.array([1, 1]), np.array([2, 1]), 2)
+    assert stationary_distribution(pairs, points, 2).argmax() == 0
+
+
+def test_bootstrap_scores(matches):
+    ranker = RankCentralityRanker(bootstrap_samples=10)
+    scores = ranker.compute_bootstrap_scores(matches, seed=0)
+    assert scores["model_name"].n_unique() == 8
+    assert (scores["p2.5"] <= scores["median"]).all() and (scores["median"] <= scores["p97.5"]).all()
+    assert ranker.bootstrap_replicates.shape == (10, 8)
+
+
+def test_pipeline_rank_centrality(mock_load_comparia, tmp_path):
+    pipeline = RankingPipeline(
+        method="rank_centrality",
+        include_votes=True,
+        include_reactions=True,
+        bootstrap_samples=3,
+        mean_how="match",
+        seed=0,
+    )
+    assert isinstance(pipeline.ranker, RankCentralityRanker)
+    scores = pipeline.run()
+    assert scores["rank"].to_list() == list(range(1, len(scores) + 1))
@@ -0,0 +1,52 @@
+# SPDX-FileCopyrightText: 2025 Pôle d'Expertise de la Régulation Numérique <contact@peren.gouv.fr>
+#
+# SPDX-License-Identifier: MIT
+
+import itertools
+
+import polars as pl
+import pytest
+from polars.testing import assert_frame_equal
+
+from rank_comparia.ranker import MatchScore
+from rank_comparia.reactions import score_reactions
+
+
+@pytest.fixture(name="reactions")
+def fixture_reactions():
+    sample = pl.read_parquet("tests/data/sample_comparia_reactions.parquet")
+    # every combination of two reactions, a single reaction and three reactions
+    reactions = [(0, 1, 1, "a", True, 0)]
+    reactions += [(1, 1, 3, pos, liked, rank) for pos, liked, rank in [("a", True, 0), ("b", False, 0), ("a", True, 1)]]
+    for pair, (first, second) in enumerate(itertools.product(itertools.product("ab", [True, False], [0, 1]), repeat=2)):
+        reactions += [(pair + 2, 2, 2, *first), (pair + 2, 2, 2, *second)]
+    pair_ids, row_index, _, positions, likes, ranks = zip(*reactions)
+    return (
+        sample.select(pl.all().gather(list(row_index)))
+        .with_columns(
+            conversation_pair_id=pl.Series([f"pair_{pair}" for pair in pair_ids]),
+            model_pos=pl.Series(positions),
+            liked=pl.Series(likes),
+            disliked=~pl.Series(likes),
+            msg_rank=pl.Series(ranks),
+        )
+        .sample(fraction=1.0, shuffle=True, seed=0)
+    )
+
+
+def test_flat_kernel_matches_list_kernel(reactions):
+    expected = score_reactions(reactions, kernel="list").sort("conversation_pair_id")
+    flat = score_reactions(reactions, kernel="flat").sort("conversation_pair_id")
+    assert_frame_equal(flat, expected)
+    assert expected["score"].null_count() == 1
+
+    streaming = score_reactions(reactions.lazy()).collect(engine="streaming").sort("conversation_pair_id")
+    assert_frame_equal(streaming, expected)
+
+
+def test_reaction_scores(reactions):
+    scores = dict(score_reactions(reactions).select("conversation_pair_id", "score").iter_rows())
+    assert scores["pair_0"] == MatchScore.A
+    assert scores["pair_1"] is None
+    # a liked at rank 0 and at rank 1
+    assert scores["pair_3"] == MatchScore.A
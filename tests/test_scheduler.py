@@ -0,0 +1,85 @@
+# SPDX-FileCopyrightText: 2025 Pôle d'Expertise de la Régulation Numérique <contact@peren.gouv.fr>
+#
+# SPDX-License-Identifier: MIT
+
+import numpy as np
+import polars as pl
+import pytest
+
+from rank_comparia.maximum_likelihood import MaximumLikelihoodRanker
+from rank_comparia.ranker import Match, MatchScore
+from rank_comparia.scheduler import (
+    PairScheduler,
+    _vote_information,
+    expected_gains,
+    neighbour_uncertainty,
+    simulate_scheduling,
+    strength_covariance,
+    votes_saved,
+)
+
+
+COEF = np.array([0.5, 0.45, 0.0, -0.8])
+PAIRS = np.array([[0, 1], [0, 2], [1, 2], [2, 3]])
+N_MATCHES = np.array([3.0, 20.0, 5.0, 40.0])
+
+
+def test_expected_gains_match_rank_one_updates():
+    covariance = strength_covariance(COEF, PAIRS, N_MATCHES, prior_variance=1.0)
+    gains = expected_gains(COEF, covariance)
+    assert np.allclose(gains, gains.T)
+    for k, l in [(0, 1), (0, 3), (1, 2)]:
+        u = np.zeros(len(COEF))
+        u[k], u[l] = 1, -1
+        information = np.linalg.inv(covariance) + _vote_information(COEF[k] - COEF[l]) * np.outer(u, u)
+        updated = np.linalg.inv(information)
+        # neighbour weights are kept at their current value
+        _, gaps, variances = neighbour_uncertainty(COEF, covariance)
+        weights = np.exp(-(gaps**2) / (2 * variances))
+        _, _, updated_variances = neighbour_uncertainty(COEF, updated)
+        assert gains[k, l] == pytest.approx((weights * (variances - updated_variances)).sum())
+
+
+def test_scheduler_prefers_close_uncertain_pairs():
+    probabilities = PairScheduler(exploration=0.1).probabilities(COEF, PAIRS, N_MATCHES)
+    assert np.triu(probabilities, k=1).sum() == pytest.approx(1)
+    # models 0 and 1 are close and rarely compared, 2 and 3 are far apart and often compared
+    assert probabilities[0, 1] == probabilities.max()
+    assert probabilities[2, 3] < probabilities[0, 1] / 10
+    uniform = PairScheduler(exploration=1.0).probabilities(COEF, PAIRS, N_MATCHES)
+    assert np.allclose(uniform[np.triu_indices(4, k=1)], 1 / 6)
+
+
+def test_schedule_from_ranker():
+    matches = [
+        Match("a", "b", MatchScore.A),
+        Match("a", "b", MatchScore.B),
+        Match("b", "c", MatchScore.A),
+        Match("a", "c", MatchScore.Draw),
+        Match("c", "d", MatchScore.A),
+    ] * 5
+    schedule = PairScheduler().schedule(MaximumLikelihoodRanker(solver="sparse"), matches)
+    assert schedule.height == 6
+    assert schedule["probability"].sum() == pytest.approx(1)
+    assert schedule["probability"].is_sorted(descending=True)
+    assert schedule.filter((pl.col("model_a") == "a") & (pl.col("model_b") == "b"))["n_match"].item() == 10
+    assert schedule.filter((pl.col("model_a") == "b") & (pl.col("model_b") == "d"))["n_match"].item() == 0
+
+
+def test_simulate_scheduling():
+    coef = np.linspace(1, -1, 12)
+    uniform = simulate_scheduling(coef, n_votes=1000, batch_size=250, seed=1)
+    assert uniform["n_votes"].to_list() == [250, 500, 750, 1000]
+    assert uniform["neighbour_sd"].is_sorted(descending=True)
+    assert uniform.equals(simulate_scheduling(coef, n_votes=1000, batch_size=250, seed=1))
+    # the saving is measured on the posterior standard deviation of neighbours
+    baseline = simulate_scheduling(coef, n_votes=2000, batch_size=250, seed=1)
+    scheduled = simulate_scheduling(coef, n_votes=1000, batch_size=250, scheduler=PairScheduler(), seed=1)
+    saved = votes_saved(baseline, scheduled)
+    assert saved is not None and saved > 0
+
+
+def test_votes_saved():
+    baseline = pl.DataFrame({"n_votes": [100, 200, 300, 400], "neighbour_sd": [0.4, 0.3, 0.2, 0.1]})
+    assert votes_saved(baseline, pl.DataFrame({"n_votes": [100, 200], "neighbour_sd": [0.3, 0.2]})) == 100
+    assert votes_saved(baseline, pl.DataFrame({"n_votes": [100], "neighbour_sd": [0.05]})) is None
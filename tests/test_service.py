@@ -0,0 +1,104 @@
+# SPDX-FileCopyrightText: 2025 Pôle d'Expertise de la Régulation Numérique <contact@peren.gouv.fr>
+#
+# SPDX-License-Identifier: MIT
+
+import json
+import threading
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+import polars as pl
+import pytest
+
+from rank_comparia.service import LeaderboardServer, LeaderboardService, LeaderboardStore, publish_run, table_key
+from rank_comparia.utils import categories
+
+
+def write_run(run_dir, medians, method="ml", names=None):
+    run_dir.mkdir(parents=True, exist_ok=True)
+    for name in names or [method, f"{method}_{categories[0]}"]:
+        scores = pl.DataFrame(
+            {
+                "model_name": list(medians),
+                "median": list(medians.values()),
+                "rank": list(range(1, len(medians) + 1)),
+            }
+        )
+        scores.write_csv(run_dir / f"{name}_scores.csv", separator=";")
+        pl.DataFrame({model: [median - 10, median, median + 10] for model, median in medians.items()}).write_parquet(
+            run_dir / f"{name}_replicates.parquet"
+        )
+    (run_dir / f"{method}_final_data.json").write_text(
+        json.dumps({"models": [{"model_name": model, "win_rate": 0.5} for model in medians]})
+    )
+
+
+@pytest.fixture(name="runs")
+def fixture_runs(tmp_path):
+    write_run(tmp_path / "run_1", {"alice": 1200.0, "bob": 1000.0, "eve": 800.0})
+    publish_run(tmp_path / "run_1")
+    return tmp_path
+
+
+def test_store_queries(runs):
+    store = LeaderboardStore.load(runs / "run_1")
+    assert set(store.leaderboards) == {("ml", "all"), ("ml", categories[0])}
+    assert [row["model_name"] for row in store.top(k=2)] == ["alice", "bob"]
+
+    pair = store.pair("alice", "bob")
+    assert pair["p"] == pytest.approx(1 / (1 + 10 ** (-200 / 400)))
+    assert pair["p2.5"] == pytest.approx(pair["p"])
+
+    card = store.model_card("bob")
+    assert card["win_rate"] == 0.5 and card["rank"] == 2
+    assert card["categories"][categories[0]]["rank"] == 2
+
+    with pytest.raises(KeyError):
+        store.pair("alice", "mallory")
+
+
+def test_table_key():
+    assert table_key("ml") == ("ml", "all")
+    assert table_key(f"elo_random_{categories[1]}") == ("elo_random", categories[1])
+    assert table_key(categories[1]) == (None, categories[1])
+
+
+def test_store_keeps_methods_apart(runs):
+    write_run(runs / "run_1", {"eve": 1100.0, "alice": 900.0}, method="elo_random")
+    store = LeaderboardStore.load(runs / "run_1")
+    assert store.methods == ["elo_random", "ml"]
+    with pytest.raises(ValueError):
+        store.top()
+    assert store.top(method="ml", k=1)[0]["model_name"] == "alice"
+    assert store.top(categories[0], method="elo_random", k=1)[0]["model_name"] == "eve"
+    assert store.model_card("eve", method="elo_random")["rank"] == 1
+    with pytest.raises(KeyError):
+        store.top(method="unknown")
+
+    # category tables not named by method are attributed to the only method of the run, if any
+    write_run(runs / "legacy", {"alice": 1200.0, "bob": 1000.0}, names=["ml", categories[0]])
+    assert set(LeaderboardStore.load(runs / "legacy").leaderboards) == {("ml", "all"), ("ml", categories[0])}
+    write_run(runs / "legacy", {"alice": 1200.0, "bob": 1000.0}, method="elo_random", names=["elo_random"])
+    with pytest.raises(ValueError):
+        LeaderboardStore.load(runs / "legacy")
+
+
+def test_server_hot_swap(runs):
+    service = LeaderboardService(runs)
+    with LeaderboardServer(service, port=0) as server:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+
+        top = json.loads(urlopen(f"{url}/top?k=1").read())
+        assert top[0]["model_name"] == "alice"
+        with pytest.raises(HTTPError) as error:
+            urlopen(f"{url}/top?category=unknown")
+        assert error.value.code == 404
+
+        write_run(runs / "run_2", {"eve": 1100.0, "alice": 900.0})
+        assert not service.refresh()
+        publish_run(runs / "run_2")
+        assert service.refresh()
+        top = json.loads(urlopen(f"{url}/top?k=1").read())
+        assert top[0]["model_name"] == "eve"
+        server.shutdown()
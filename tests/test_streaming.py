@@ -0,0 +1,98 @@
+# SPDX-FileCopyrightText: 2025 Pôle d'Expertise de la Régulation Numérique <contact@peren.gouv.fr>
+#
+# SPDX-License-Identifier: MIT
+
+
+import polars as pl
+import pytest
+from polars.testing import assert_frame_equal
+
+from rank_comparia.data_transformation import get_matches_with_score, get_winners, get_winrates
+from rank_comparia.frugality import calculate_frugality_score, get_model_params, get_models_output_tokens, get_n_match
+from rank_comparia.model_statistics import get_model_statistics
+from rank_comparia.pipeline import RankingPipeline
+from rank_comparia.preferences import get_preferences_data
+from rank_comparia.reactions import score_reactions
+from rank_comparia.utils import collect
+
+
+@pytest.fixture(name="votes")
+def fixture_votes(conversations):
+    return pl.read_parquet("tests/data/sample_comparia_votes.parquet").join(conversations, on="conversation_pair_id")
+
+
+@pytest.fixture(name="reactions")
+def fixture_reactions(conversations):
+    return pl.read_parquet("tests/data/sample_comparia_reactions.parquet").join(
+        conversations, on="conversation_pair_id", coalesce=True
+    )
+
+
+@pytest.fixture(name="matches")
+def fixture_matches(votes):
+    return votes.rename({"model_a_name": "model_a", "model_b_name": "model_b"})
+
+
+def assert_streaming_equal(stage, *frames, sort_by="model_name"):
+    """
+    Check that a stage gives the same result in memory and on the streaming engine.
+    """
+    expected = stage(*frames)
+    lazy = stage(*(frame.lazy() for frame in frames))
+    for memory_budget in (None, 1024**2):
+        streamed = collect(lazy, streaming=True, memory_budget=memory_budget)
+        assert_frame_equal(streamed.sort(sort_by), expected.sort(sort_by), check_row_order=False)
+
+
+def test_frugality_streaming(matches, conversations):
+    assert_streaming_equal(get_n_match, matches)
+    assert_streaming_equal(get_models_output_tokens, matches)
+    assert_streaming_equal(
+        get_model_params, conversations.with_columns(model_a_name=pl.lit("a"), model_b_name=pl.lit("b"))
+    )
+    assert_streaming_equal(lambda data: calculate_frugality_score(data, get_n_match(data)), matches)
+
+
+def test_preferences_streaming(votes, reactions):
+    assert_streaming_equal(get_preferences_data, votes, reactions)
+
+
+def test_data_transformation_streaming(reactions):
+    assert_streaming_equal(get_matches_with_score, reactions, sort_by="conversation_pair_id")
+    assert_streaming_equal(lambda data: get_winrates(get_winners(get_matches_with_score(data))), reactions)
+
+
+def test_reactions_streaming(reactions):
+    assert_streaming_equal(score_reactions, reactions, sort_by="conversation_pair_id")
+
+
+def test_model_statistics_streaming(matches):
+    for by_category in (False, True):
+        assert_frame_equal(
+            get_model_statistics(matches, by_category=by_category, streaming=True),
+            get_model_statistics(matches, by_category=by_category),
+        )
+
+
+def test_pipeline_streaming_from_parquet(mock_load_comparia, tmp_path):
+    for name in ("votes", "reactions", "conversations"):
+        (tmp_path / f"comparia-{name}").mkdir()
+        pl.read_parquet(f"tests/data/sample_comparia_{name}.parquet").write_parquet(
+            tmp_path / f"comparia-{name}" / "part-0.parquet"
+        )
+
+    in_memory = RankingPipeline(
+        method="ml", include_votes=True, include_reactions=True, bootstrap_samples=2, mean_how="match"
+    )
+    streamed = RankingPipeline(
+        method="ml",
+        include_votes=True,
+        include_reactions=True,
+        bootstrap_samples=2,
+        mean_how="match",
+        data_dir=tmp_path,
+        streaming=True,
+        memory_budget=1024**2,
+    )
+    assert_frame_equal(streamed.matches.sort("conversation_pair_id"), in_memory.matches.sort("conversation_pair_id"))
+    assert_frame_equal(streamed.model_statistics(), in_memory.model_statistics())
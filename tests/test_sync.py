@@ -0,0 +1,154 @@
+# SPDX-FileCopyrightText: 2025 Pôle d'Expertise de la Régulation Numérique <contact@peren.gouv.fr>
+#
+# SPDX-License-Identifier: MIT
+
+from unittest.mock import patch
+
+import polars as pl
+import pytest
+from polars.testing import assert_frame_equal
+
+from rank_comparia.pipeline import RankingPipeline
+from rank_comparia.sync import REACTIONS, VOTES, LocalShards, read_processed, read_state, sync_comparia, sync_matches
+from rank_comparia.utils import decode_model_names
+
+
+def write_shard(hub, name: str, shard: str, data: pl.DataFrame) -> None:
+    directory = hub / f"comparia-{name}"
+    directory.mkdir(parents=True, exist_ok=True)
+    data.write_parquet(directory / shard)
+
+
+@pytest.fixture(name="hub")
+def fixture_hub(tmp_path):
+    hub = tmp_path / "hub"
+    # the first shards hold part of the rows, the second ones all rows, overlapping the first
+    for name in ("votes", "reactions", "conversations"):
+        data = pl.read_parquet(f"tests/data/sample_comparia_{name}.parquet")
+        write_shard(hub, name, "shard-0.parquet", data.head(len(data) // 2))
+    return hub
+
+
+def add_shards(hub) -> None:
+    for name in ("votes", "reactions", "conversations"):
+        write_shard(hub, name, "shard-1.parquet", pl.read_parquet(f"tests/data/sample_comparia_{name}.parquet"))
+
+
+def test_sync_returns_only_new_rows(tmp_path, hub):
+    store = tmp_path / "store"
+    source = LocalShards(hub)
+    votes = pl.read_parquet("tests/data/sample_comparia_votes.parquet")
+
+    first = sync_comparia(source, store, [VOTES])
+    assert set(first[VOTES]["conversation_pair_id"]) <= set(votes.head(5)["conversation_pair_id"])
+    # nothing changed since the last run
+    assert sync_comparia(source, store, [VOTES]) == {}
+
+    add_shards(hub)
+    second = sync_comparia(source, store, [VOTES])
+    assert not set(second[VOTES]["conversation_pair_id"]) & set(first[VOTES]["conversation_pair_id"])
+
+    # the store holds each row once, as the hub does
+    stored = pl.read_parquet(store / "comparia-votes" / "*.parquet")
+    assert_frame_equal(stored.sort("conversation_pair_id"), votes.sort("conversation_pair_id"))
+    state = read_state(store)[VOTES]
+    assert state.n_rows == len(votes)
+    assert state.n_syncs == 2
+    assert state.shards.keys() == {"shard-0.parquet", "shard-1.parquet"}
+    assert state.max_timestamp == votes["timestamp"].max().isoformat()  # type: ignore
+
+
+def full_matches(store) -> pl.DataFrame:
+    return decode_model_names(
+        RankingPipeline(
+            method="ml",
+            include_votes=True,
+            include_reactions=True,
+            bootstrap_samples=0,
+            mean_how="token",
+            data_dir=store,
+        ).matches
+    )
+
+
+def assert_same_matches(stored: pl.DataFrame, full: pl.DataFrame) -> None:
+    assert_frame_equal(
+        stored.select(full.columns).sort("source", "conversation_pair_id"),
+        full.sort("source", "conversation_pair_id"),
+        check_dtypes=False,
+    )
+
+
+def test_sync_matches_appends_processed_delta(tmp_path, hub):
+    store = tmp_path / "store"
+    source = LocalShards(hub)
+    first = sync_matches(source, store)
+    add_shards(hub)
+    second = sync_matches(source, store)
+    assert not first.is_empty() and not second.is_empty()
+    assert sync_matches(source, store).is_empty()
+
+    # votes and reactions split across syncs give the matches of a full processing of the store
+    stored = pl.read_parquet(store / "matches" / "*.parquet")
+    assert_same_matches(stored, full_matches(store))
+    assert read_state(store)[REACTIONS].n_rows == len(pl.read_parquet("tests/data/sample_comparia_reactions.parquet"))
+    assert read_processed(store)[VOTES] == ["sync-000001.parquet", "sync-000002.parquet"]
+
+
+def test_sync_matches_resumes_interrupted_sync(tmp_path, hub):
+    store = tmp_path / "store"
+    source = LocalShards(hub)
+    sync_matches(source, store)
+    add_shards(hub)
+
+    # interrupted once the rows are stored, before their matches are
+    with patch("rank_comparia.sync.RankingPipeline", side_effect=KeyboardInterrupt):
+        with pytest.raises(KeyboardInterrupt):
+            sync_matches(source, store)
+    assert not sync_matches(source, store).is_empty()
+    assert_same_matches(pl.read_parquet(store / "matches" / "*.parquet"), full_matches(store))
+
+    # interrupted once the matches are stored, before they are recorded as processed
+    (store / "matches_state.json").unlink()
+    sync_matches(source, store)
+    assert_same_matches(pl.read_parquet(store / "matches" / "*.parquet"), full_matches(store))
+
+
+def test_sync_does_not_overwrite_interrupted_shards(tmp_path, hub):
+    store = tmp_path / "store"
+    source = LocalShards(hub)
+    votes = pl.read_parquet("tests/data/sample_comparia_votes.parquet")
+    sync_comparia(source, store, [VOTES])
+    add_shards(hub)
+
+    # interrupted after storing the new votes, before writing the state
+    with patch("rank_comparia.sync._write_state", side_effect=KeyboardInterrupt):
+        with pytest.raises(KeyboardInterrupt):
+            sync_comparia(source, store, [VOTES])
+    sync_comparia(source, store, [VOTES])
+    stored = pl.read_parquet(store / "comparia-votes" / "*.parquet")
+    assert_frame_equal(stored.sort("conversation_pair_id"), votes.sort("conversation_pair_id"))
+    assert read_state(store)[VOTES].n_rows == len(votes)
+
+
+def test_sync_matches_rescores_reactions_of_a_pair(tmp_path, hub):
+    store = tmp_path / "store"
+    source = LocalShards(hub)
+    add_shards(hub)
+    sync_matches(source, store)
+    scored = pl.read_parquet(store / "matches" / "*.parquet").filter(pl.col("source") == "reactions")
+
+    # another reaction to a pair already processed
+    reaction = (
+        pl.read_parquet(hub / "comparia-reactions" / "shard-1.parquet")
+        .filter(pl.col("conversation_pair_id").is_in(scored["conversation_pair_id"].to_list()))
+        .head(1)
+    )
+    write_shard(hub, "reactions", "shard-2.parquet", reaction.with_columns(id=pl.col("id") + 1))
+    updated = sync_matches(source, store)
+    assert updated["conversation_pair_id"].to_list() == reaction["conversation_pair_id"].to_list()
+
+    # scored from both reactions, in place of the match of the first one
+    stored = pl.read_parquet(store / "matches" / "*.parquet")
+    assert stored.filter(pl.col("conversation_pair_id") == reaction["conversation_pair_id"][0]).height == 1
+    assert_same_matches(stored, full_matches(store))
@@ -0,0 +1,90 @@
+# SPDX-FileCopyrightText: 2025 Pôle d'Expertise de la Régulation Numérique <contact@peren.gouv.fr>
+#
+# SPDX-License-Identifier: MIT
+
+from datetime import date, datetime
+
+import numpy as np
+import polars as pl
+import pytest
+
+from rank_comparia.maximum_likelihood import MaximumLikelihoodRanker, fit_bradley_terry
+from rank_comparia.ranker import Match, MatchScore
+from rank_comparia.temporal import build_count_cube, period_windows, rank_windows
+
+
+@pytest.fixture(name="matches")
+def fixture_matches():
+    return pl.DataFrame(
+        {
+            "timestamp": [
+                datetime(2025, 1, 3, 10),
+                datetime(2025, 1, 20, 12),
+                datetime(2025, 1, 31, 23),
+                datetime(2025, 2, 1, 8),
+                datetime(2025, 2, 14, 9),
+                datetime(2025, 3, 2, 18),
+            ],
+            "model_a": ["alice", "alice", "bob", "eve", "alice", "eve"],
+            "model_b": ["bob", "eve", "eve", "bob", "bob", "alice"],
+            "score": [MatchScore.A, MatchScore.A, MatchScore.Draw, MatchScore.B, MatchScore.B, MatchScore.A],
+        }
+    )
+
+
+def test_window_counts(matches):
+    cube = build_count_cube(matches)
+    assert cube.models == ["alice", "bob", "eve"]
+    assert cube.first_day == date(2025, 1, 3)
+    assert cube.end_day == date(2025, 3, 3)
+
+    january = cube.window(end=date(2025, 2, 1))
+    # alice beat bob and eve, bob and eve drew
+    assert january[0, 1] == 2 and january[1, 0] == 0
+    assert january[0, 2] == 2 and january[2, 0] == 0
+    assert january[1, 2] == 1 and january[2, 1] == 1
+
+    february = cube.window(date(2025, 2, 1), date(2025, 3, 1))
+    assert february.sum() == 4
+    assert february[1, 2] == 2 and february[1, 0] == 2
+    assert np.array_equal(cube.window(), cube.window(end=date(2025, 2, 1)) + cube.window(start=date(2025, 2, 1)))
+
+
+def test_period_windows(matches):
+    cube = build_count_cube(matches)
+    assert period_windows(cube) == [
+        (None, date(2025, 2, 1)),
+        (None, date(2025, 3, 1)),
+        (None, date(2025, 3, 3)),
+    ]
+    assert period_windows(cube, window_days=30)[0] == (date(2025, 1, 2), date(2025, 2, 1))
+
+
+def test_fit_bradley_terry_matches_ranker():
+    rng = np.random.default_rng(0)
+    strengths = rng.normal(0, 0.5, 5)
+    matches = []
+    wins = np.zeros((5, 5))
+    for _ in range(500):
+        a, b = rng.choice(5, 2, replace=False)
+        score = MatchScore.A if rng.random() < 1 / (1 + 10 ** (strengths[b] - strengths[a])) else MatchScore.B
+        matches.append(Match(model_a=str(a), model_b=str(b), score=score))
+        wins[a, b] += score.value
+        wins[b, a] += 2 - score.value
+
+    scores = MaximumLikelihoodRanker().compute_scores(matches)
+    coef = fit_bradley_terry(wins)
+    for model in range(5):
+        assert scores[str(model)] == pytest.approx(400 * coef[model] + 1000, abs=1e-3)
+    # warm start converges to the same solution
+    assert fit_bradley_terry(wins, init=rng.normal(size=5)) == pytest.approx(coef, abs=1e-4)
+
+
+def test_rank_windows(matches):
+    cube = build_count_cube(matches)
+    scores = rank_windows(cube, period_windows(cube))
+    assert scores["window_end"].unique().to_list() == [date(2025, 2, 1), date(2025, 3, 1), date(2025, 3, 3)]
+    january = scores.filter(pl.col("window_end") == date(2025, 2, 1))
+    assert january["model_name"].to_list()[0] == "alice"
+    assert january["n_match"].to_list() == [2, 2, 2]
+    assert january["score"].mean() == pytest.approx(1000.0)
@@ -5,8 +5,20 @@
 from pathlib import Path
 
 import polars as pl
+import pytest
+from polars.testing import assert_frame_equal
 
-from rank_comparia.utils import save_data
+from rank_comparia.utils import (
+    build_category_index,
+    category_bits,
+    category_mask,
+    decode_model_names,
+    encode_model_names,
+    has_categories,
+    load_comparia,
+    model_enum,
+    save_data,
+)
 
 
 def test_save_data_creates_csv(tmp_path: Path):
@@ -24,3 +36,47 @@ def test_save_data_creates_csv(tmp_path: Path):
 
     loaded_df = pl.read_csv(file_path, separator=";")
     assert loaded_df.equals(df)
+
+
+def test_encode_decode_model_names():
+    matches = pl.DataFrame({"model_a": ["bob", "alice"], "model_b": ["eve", "bob"], "score": [0, 2]})
+    dtype = model_enum(matches)
+    assert dtype.categories.to_list() == ["alice", "bob", "eve"]
+
+    encoded = encode_model_names(matches)
+    assert encoded.schema["model_a"] == dtype
+    assert encoded["model_a"].to_physical().to_list() == [1, 0]
+    assert decode_model_names(encoded).equals(matches)
+
+
+def test_category_mask():
+    data = pl.DataFrame({"categories": [["Education", "History"], [], None, ["Arts", "Not a category"]]})
+    data = data.with_columns(category_mask())
+    assert data.schema["category_mask"] == pl.UInt64
+    assert data["category_mask"].to_list() == [category_bits(["Education", "History"]), 0, 0, category_bits("Arts")]
+    assert data.filter(has_categories(["History", "Arts"])).height == 2
+
+    index = build_category_index(data["category_mask"].to_numpy())
+    assert index["Education"].tolist() == [0]
+    assert index["Arts"].tolist() == [3]
+    assert len(index["Sports"]) == 0
+
+    with pytest.raises(ValueError):
+        category_bits("Not a category")
+
+
+def test_load_comparia_from_local_directory(tmp_path: Path):
+    for name in ("votes", "conversations"):
+        (tmp_path / f"comparia-{name}").mkdir()
+        pl.read_parquet(f"tests/data/sample_comparia_{name}.parquet").write_parquet(
+            tmp_path / f"comparia-{name}" / "train.parquet"
+        )
+    data = load_comparia(
+        "ministere-culture/comparia-votes", token=None, local_dir=tmp_path, cache_dir=str(tmp_path / "cache")
+    )
+    conversations = pl.read_parquet("tests/data/sample_comparia_conversations.parquet")
+    expected = pl.read_parquet("tests/data/sample_comparia_votes.parquet").join(
+        conversations, on="conversation_pair_id"
+    )
+    assert data.columns == expected.columns
+    assert_frame_equal(data.sort("id"), expected.sort("id"), check_dtypes=False)